@@ -1,5 +1,4 @@
 import os
-import json
 import Deadline.Events
 
 
@@ -43,20 +42,21 @@ class AvalonJobProgressDelete(Deadline.Events.DeadlineEventListener):
 
         dumpfile = job.GetJobEnvironmentKeyValue("PYBLISH_DUMP_FILE")
 
+        self.load_environment(job)
+        from reveries import dumpfile as dump_format
+
         # Check and load dumps
         if not os.path.isfile(dumpfile):
             raise Exception("Instance dump file not found: %s" % dumpfile)
 
-        with open(dumpfile, "r") as file:
-            instance_dump = json.load(file)
+        instance_dump = dump_format.load(dumpfile)
 
         dumpfile = instance_dump["contextDump"]
 
         if not os.path.isfile(dumpfile):
             raise Exception("Context dump file not found: %s" % dumpfile)
 
-        with open(dumpfile, "r") as file:
-            context_dump = json.load(file)
+        context_dump = dump_format.load(dumpfile)
 
         for instance in context_dump["instances"]:
             if instance["id"] == instance_dump["id"]:
@@ -65,7 +65,6 @@ class AvalonJobProgressDelete(Deadline.Events.DeadlineEventListener):
                     "subset": instance["subset"],
                     "version": instance["version"],
                 }
-                self.load_environment(job)
                 self.clear_progress(data)
                 break
         else:
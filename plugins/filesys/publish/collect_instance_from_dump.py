@@ -1,14 +1,15 @@
 
 import os
-import json
 import pyblish.api
+from reveries import dumpfile
 
 
 class CollectInstancesFromDump(pyblish.api.ContextPlugin):
     """Create instances from context/instance dump file
 
-    Update context and create instances from a JSON format dump file which
-    acquired from `sys.argv[1]`.
+    Update context and create instances from a dump file which acquired
+    from `sys.argv[1]`, either compact format or JSON (see
+    `reveries.dumpfile`).
 
     """
 
@@ -24,7 +25,7 @@ class CollectInstancesFromDump(pyblish.api.ContextPlugin):
 
         dump_file = os.path.basename(dump_path)
 
-        if not dump_file.endswith(".json"):
+        if not dump_file.endswith((dumpfile.EXTENSION, ".json")):
             raise Exception("Invalid file extension: %s" % dump_path)
 
         if dump_file.startswith(".instance."):
@@ -38,9 +39,10 @@ class CollectInstancesFromDump(pyblish.api.ContextPlugin):
 
     def parse_instance(self, context, dump_path):
 
-        with open(dump_path, "r") as file:
-            dump = json.load(file)
-        context = self.parse_context(context, dump["contextDump"])
+        dump = dumpfile.load(dump_path)
+        context = self.parse_context(context,
+                                     dump["contextDump"],
+                                     loaded={dump_path: dump})
 
         instance = next(i for i in context if i.data["dumpId"] == dump["id"])
         children = instance.data["childInstances"]
@@ -58,37 +60,48 @@ class CollectInstancesFromDump(pyblish.api.ContextPlugin):
                 # main instance.
                 instance.data[key] = context.data.pop(key)
 
-    def parse_context(self, context, dump_path):
+    def parse_context(self, context, dump_path, loaded=None):
+        """Create instances from context dump
 
-        with open(dump_path, "r") as file:
-            context_dump = json.load(file)
+        Arguments:
+            context: Pyblish context
+            dump_path (str): Context dump file path
+            loaded (dict, optional): Instance dumps that have been loaded,
+                by file path.
 
-            context.data.update({
-                "user": context_dump["by"],
-                "date": context_dump["date"],
-                "currentMaking": context_dump["from"],
-                "comment": context_dump["comment"],
-            })
+        """
+        loaded = loaded or dict()
+
+        context_dump = dumpfile.load(dump_path)
+
+        context.data.update({
+            "user": context_dump["by"],
+            "date": context_dump["date"],
+            "currentMaking": context_dump["from"],
+            "comment": context_dump["comment"],
+        })
 
         instance_by_id = dict()
 
         for dump in context_dump["instances"]:
-            with open(dump["dump"], "r") as file:
-                dump.update(json.load(file))
+            instance_dump = loaded.get(dump["dump"])
+            if instance_dump is None:
+                instance_dump = dumpfile.load(dump["dump"])
+            dump.update(instance_dump)
 
-                previous_id = dump.pop("id")
-                child_ids = dump.pop("childInstances")
-                version_num = dump.pop("version")
+            previous_id = dump.pop("id")
+            child_ids = dump.pop("childInstances")
+            version_num = dump.pop("version")
 
-                instance = context.create_instance(dump["name"])
-                instance_by_id[previous_id] = instance
+            instance = context.create_instance(dump["name"])
+            instance_by_id[previous_id] = instance
 
-                instance.data.update(dump)
+            instance.data.update(dump)
 
-                instance.data["versionPin"] = version_num
-                instance.data["dumpId"] = previous_id
-                instance.data["childIds"] = child_ids
-                instance.data["childInstances"] = list()
+            instance.data["versionPin"] = version_num
+            instance.data["dumpId"] = previous_id
+            instance.data["childIds"] = child_ids
+            instance.data["childInstances"] = list()
 
         for instance in context:
             children = instance.data["childInstances"]
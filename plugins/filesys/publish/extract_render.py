@@ -1,6 +1,7 @@
 
 import os
 import pyblish.api
+from reveries import sequences
 
 
 class ExtractRender(pyblish.api.InstancePlugin):
@@ -43,16 +44,25 @@ class ExtractRender(pyblish.api.InstancePlugin):
             else:
                 patterns.append(pattern)
 
+        # List each staging dir once instead of checking every frame
+        index = sequences.SequenceIndex(staging_dir)
+        report = index.report(dict(enumerate(patterns)), start, end)
+
         hardlinks = list()
         missing = False
-        for fname in patterns:
-            for frame_num in range(start, end + 1):
-                full_path = os.path.join(staging_dir, fname % frame_num)
-                if os.path.isfile(full_path):
-                    hardlinks.append(fname % frame_num)
-                else:
-                    print("%s not exists, skip." % full_path)
-                    missing = True
+        for key, fname in enumerate(patterns):
+            result = report[key]
+            if result["present"]:
+                hardlinks.append(
+                    sequences.FrameSet.from_frames(fname, result["present"]))
+
+            if result["missing"]:
+                self.log.warning("%s missing frames: %s"
+                                 % (fname, result["missing"]))
+                missing = True
+            if result["unexpected"]:
+                self.log.debug("%s frames out of range: %s"
+                               % (fname, result["unexpected"]))
 
         if missing:
             self.log.warning("Some files missing, sequence may incomplete. "
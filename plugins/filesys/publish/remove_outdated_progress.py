@@ -1,6 +1,8 @@
 
 import os
+import errno
 import pyblish.api
+from reveries import manifest, sequences
 
 
 def parse_src_dst_dirs(instance):
@@ -40,10 +42,10 @@ class RemoveOutdatedProgress(pyblish.api.InstancePlugin):
 
         repr_dirs = parse_src_dst_dirs(instance)
 
-        outdated = set()
+        transfers = list()
         not_matched = set()
 
-        for file in progress:
+        for file in sequences.expand(progress):
             file = file.replace("\\", "/")
             for _, (src, dst) in repr_dirs.items():
                 if not file.startswith(src):
@@ -51,8 +53,7 @@ class RemoveOutdatedProgress(pyblish.api.InstancePlugin):
 
                 tail = os.path.relpath(file, src)
                 old = os.path.join(dst, tail).replace("\\", "/")
-                if os.path.isfile(old):
-                    outdated.add(old)
+                transfers.append((file, old))
 
                 break
 
@@ -70,23 +71,36 @@ class RemoveOutdatedProgress(pyblish.api.InstancePlugin):
 
             raise FileNotFoundError("Progress output file not matched.")
 
-        if outdated:
+        # Look up integrated files from version manifest instead of
+        # checking each file on the file server.
+        frames = manifest.FrameManifest(instance.data["versionDir"]).load()
+
+        integrated = frames.integrated(dst for _, dst in transfers)
+        if integrated:
+            # These frames have been counted into progress
             instance.data["_progressiveStep"] = 0
 
+        # Files that have the same source as integrated are kept and
+        # skipped in integration, others are re-integrated.
+        outdated = frames.outdated(transfers)
+
         # Try Remove
 
         removed = list()
 
         for file in outdated:
-            if os.path.isfile(file):
-                self.log.debug("Removing outdated file: %s" % file)
-                try:
-                    os.remove(file)
-                except Exception as e:
+            self.log.debug("Removing outdated file: %s" % file)
+            try:
+                os.remove(file)
+            except OSError as e:
+                if e.errno != errno.ENOENT:
                     self.log.error("Failed to remove: %s" % file)
                     raise e
-                else:
-                    removed.append(file)
+            removed.append(file)
+
+        if removed:
+            frames.remove(removed)
+            frames.commit()
 
-        self.log.info("Assume %d outdated, removed %d."
-                      % (len(outdated), len(removed)))
+        self.log.info("%d integrated, %d outdated, removed %d."
+                      % (len(integrated), len(outdated), len(removed)))
@@ -0,0 +1,54 @@
+import pyblish.api
+
+
+class ValidateProgressIntegrity(pyblish.api.InstancePlugin):
+    """Progress output files should be completely written
+
+    Files of one progressive publish (e.g. frames rendered by one farm task)
+    are checked before being integrated, so a frame truncated by crashed
+    render node won't be integrated and counted into progress. Frames much
+    smaller than others of the same task are only warned.
+
+    """
+
+    label = "Progress Integrity"
+    order = pyblish.api.ValidatorOrder + 0.15
+    hosts = ["filesys"]
+
+    def process(self, instance):
+        from reveries import integrity, sequences
+
+        progress = instance.data.get("_progressiveOutput")
+        if not progress:
+            return
+
+        progress = sequences.merge(progress)
+        results = integrity.check_files(sequences.expand(progress))
+
+        sizes = dict()
+        failed = list()
+        for path, (size, problem) in sorted(results.items()):
+            if problem:
+                failed.append((path, problem))
+            else:
+                sizes[path] = size
+
+        # Compare size within each sequence
+        for frameset in progress:
+            if not isinstance(frameset, sequences.FrameSet):
+                continue
+            frame_sizes = dict()
+            for frame in frameset.frames():
+                path = frameset.pattern % frame
+                if path in sizes:
+                    frame_sizes[frame] = sizes[path]
+            for frame in integrity.small_frames(frame_sizes):
+                self.log.warning("%s (small)" % (frameset.pattern % frame))
+
+        if failed:
+            for path, problem in failed:
+                self.log.error("%s (%s)" % (path, problem))
+            raise Exception("Incomplete progress output, please re-render "
+                            "them. See log..")
+
+        self.log.info("%d progress output files checked." % len(results))
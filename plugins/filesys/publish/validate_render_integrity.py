@@ -0,0 +1,68 @@
+import pyblish.api
+
+
+class ValidateRenderIntegrity(pyblish.api.InstancePlugin):
+    """Render frames should be completely written
+
+    Empty frames and EXR frames that have chunks out of file (truncated
+    by crashed render node) are not allowed. Missing frames and frames
+    much smaller than their neighbours (may be legit, e.g. mostly empty
+    holdout) are only warned.
+
+    """
+
+    label = "Render Integrity"
+    order = pyblish.api.ValidatorOrder + 0.15
+    hosts = ["filesys"]
+    targets = [
+        "seqparser",
+    ]
+    families = [
+        "reveries.renderlayer"
+    ]
+
+    def process(self, instance):
+        from reveries import integrity
+
+        staging_dir = instance.data["stagingDir"]
+        is_stereo = instance.data["isStereo"]
+
+        patterns = dict()
+        ranges = dict()
+        for aov_name, data in instance.data["sequences"].items():
+            pattern = data["fpattern"]
+            if is_stereo:
+                keys = [(aov_name, "Left"), (aov_name, "Right")]
+                for key in keys:
+                    patterns[key] = pattern.format(stereo=key[1])
+            else:
+                keys = [aov_name]
+                patterns[aov_name] = pattern
+
+            for key in keys:
+                ranges[key] = (data["start"], data["end"])
+
+        failed = False
+        # Group by frame range, so each range is verified in one pass
+        for (start, end) in sorted(set(ranges.values())):
+            group = dict((key, patterns[key]) for key, range_ in
+                         ranges.items() if range_ == (start, end))
+            report = integrity.verify(staging_dir, group, start, end)
+
+            for key, entry in report.items():
+                if entry["missing"]:
+                    self.log.warning("%s missing frames: %s"
+                                     % (group[key], entry["missing"]))
+                if entry["small"]:
+                    self.log.warning("%s frames much smaller than "
+                                     "neighbours: %s"
+                                     % (group[key], entry["small"]))
+                if integrity.bad_frames(entry):
+                    failed = True
+                    for line in integrity.format_report({key: entry},
+                                                        group):
+                        self.log.error(line)
+
+        if failed:
+            raise Exception("Incomplete frames found, please re-render "
+                            "them. See log..")
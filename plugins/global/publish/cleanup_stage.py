@@ -1,8 +1,8 @@
 
 import os
 import re
-import shutil
 import pyblish.api
+from reveries import reclaim
 
 
 class CleanupStage(pyblish.api.ContextPlugin):
@@ -40,8 +40,8 @@ class CleanupStage(pyblish.api.ContextPlugin):
                           and os.path.isdir(value)]
 
             stage_dirs = set([os.path.normpath(path) for path in stage_dirs])
-            for path in stage_dirs:
-                try:
-                    shutil.rmtree(path)
-                except Exception as e:
-                    self.log.warning(e)
+            try:
+                # Renamed into trash and deleted in background
+                reclaim.get_reclaimer().discard(sorted(stage_dirs))
+            except Exception as e:
+                self.log.warning(e)
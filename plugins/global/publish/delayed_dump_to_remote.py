@@ -1,25 +1,9 @@
 import os
 import re
-import json
 import pyblish.api
 import avalon.api
 from avalon import io
-from reveries import lib, filesys
-
-
-class PyblishEncoder(json.JSONEncoder):
-
-    def default(self, obj):
-        if isinstance(obj, set):
-            return list(obj)
-        try:
-            return json.JSONEncoder.default(self, obj)
-        except TypeError:
-            return str(obj)
-
-
-def json_dump(dump, file):
-    json.dump(dump, file, indent=4, sort_keys=True, cls=PyblishEncoder)
+from reveries import lib, filesys, dumpfile
 
 
 class DelayedDumpToRemote(pyblish.api.ContextPlugin):
@@ -41,9 +25,10 @@ class DelayedDumpToRemote(pyblish.api.ContextPlugin):
     order = pyblish.api.ExtractorOrder + 0.491
     label = "Delayed Dump To Remote"
 
-    EXTRACTOR_DUMP = "{stage}/.extractor.json"
-    INSTANCE_DUMP = "{version}/.instance.json"
-    CONTEXT_DUMP = "{filesys}/dumps/.context.{user}.{oid}.json"
+    EXTRACTOR_DUMP = "{stage}/.extractor" + dumpfile.EXTENSION
+    INSTANCE_DUMP = "{version}/.instance" + dumpfile.EXTENSION
+    CONTEXT_DUMP = ("{filesys}/dumps/.context.{user}.{oid}"
+                    + dumpfile.EXTENSION)
 
     def process(self, context):
         # Skip if any error occurred
@@ -94,8 +79,7 @@ class DelayedDumpToRemote(pyblish.api.ContextPlugin):
         for name, (dump_path, dump) in dumps.items():
             dump["contextDump"] = outpath
 
-            with open(dump_path, "w") as file:
-                json_dump(dump, file)
+            dumpfile.dump(dump, dump_path)
             self.log.debug("Instance %s dumped to '%s'" % (name, dump_path))
 
         # Dump context
@@ -129,8 +113,7 @@ class DelayedDumpToRemote(pyblish.api.ContextPlugin):
         if not os.path.isdir(outdir):
             os.makedirs(outdir)
 
-        with open(outpath, "w") as file:
-            json_dump(dump, file)
+        dumpfile.dump(dump, outpath)
         self.log.debug("Context dumped to '%s'" % outpath)
 
     def instance_dump(self, instance, extractors):
@@ -157,8 +140,7 @@ class DelayedDumpToRemote(pyblish.api.ContextPlugin):
             if not os.path.isdir(stage_dir):
                 os.makedirs(stage_dir)
 
-            with open(outpath, "w") as file:
-                json_dump(dump, file)
+            dumpfile.dump(dump, outpath)
 
             instance.data["dumpedExtractors"].append(outpath)
 
@@ -1,9 +1,9 @@
 
 import os
-import shutil
 import pyblish.api
 import avalon.api
 import avalon.io
+from reveries import transfer, doccache, reservation, reclaim, dumpfile
 
 
 class ExtractAssumedDestination(pyblish.api.InstancePlugin):
@@ -12,7 +12,10 @@ class ExtractAssumedDestination(pyblish.api.InstancePlugin):
     label = "Assumed Destination"
     order = pyblish.api.ExtractorOrder - 0.4
 
-    LOCK = ".publish.lock"
+    LOCK = reservation.LOCK
+
+    # Seconds before an abandoned version reservation can be taken
+    reservation_ttl = reservation.DEFAULT_TTL
 
     def process(self, instance):
 
@@ -32,16 +35,16 @@ class ExtractAssumedDestination(pyblish.api.InstancePlugin):
 
         version = None
         version_num = 1  # assume there is no version yet, start at 1
-        version_pinned = "versionPin" in instance.data
+        version_pin = instance.data.get("versionPin")
         is_progressive = context.data.get("_progressivePublishing")
 
-        subset = avalon.io.find_one({
+        subset = doccache.get_cache(context).find_one({
             "type": "subset",
             "parent": instance.data["assetDoc"]["_id"],
             "name": instance.data["subset"],
         })
 
-        if subset is not None and not version_pinned:
+        if subset is not None and version_pin is None:
             filter = {"type": "version", "parent": subset["_id"]}
             version = avalon.io.find_one(filter,
                                          projection={"name": True},
@@ -49,102 +52,155 @@ class ExtractAssumedDestination(pyblish.api.InstancePlugin):
         if version is not None:
             version_num += version["name"]
 
-        if version_pinned:
-            version_num = instance.data["versionPin"]
+        if version_pin is not None:
+            version_num = version_pin
 
         version_template = os.path.dirname(template_publish)
 
-        # Probe version
-
-        def is_version_locked(lock):
-            """Is version locked by other ?"""
-            if os.path.isfile(lock):
-                with open(lock, "r") as f:
-                    return f.read().strip() != context.data["user"]
-            return False
-
-        def lock_version(lock):
-            with open(lock, "w") as f:
-                f.write(context.data["user"])
+        def version_dir_of(num):
+            data = dict(template_data, version=num)
+            return os.path.abspath(os.path.normpath(
+                version_template.format(**data)))
+
+        # Only publish from dump file can be resumed
+        journal_key = context.data.get("_pyblishDumpFile")
+        if journal_key:
+            journal_key = transfer.normpath(journal_key)
+
+        # Reserve version
+
+        key = "/".join([template_data["project"],
+                        str(instance.data["assetDoc"]["_id"]),
+                        instance.data["subset"]])
+        # Reservation of the same dump file can be resumed, others are
+        # owned by this publish only.
+        owner = journal_key
+        if not owner:
+            owner = context.data.get("_reservationOwner")
+        if not owner:
+            owner = reservation.default_owner()
+            context.data["_reservationOwner"] = owner
+
+        if avalon.io._is_installed:
+            collection = avalon.io._database[reservation.COLLECTION]
+            reserver = reservation.DatabaseReservation(
+                collection, key, owner, ttl=self.reservation_ttl)
+        else:
+            reserver = reservation.LockFileReservation(
+                version_dir_of, key, owner, ttl=self.reservation_ttl)
 
         while True:
-            # Format dir
-            template_data["version"] = version_num
-            version_dir = version_template.format(**template_data)
-            version_dir = os.path.abspath(os.path.normpath(version_dir))
-
-            lockfile = version_dir + "/" + self.LOCK
-            if not version_pinned and is_version_locked(lockfile):
-                # Bump version
-                version_num += 1
-                continue
-
-            elif is_progressive:
+            if is_progressive:
                 # In progressive publish mode, publish will be triggered
                 # multiple times with files that only be part of sequence,
                 # so we wouldn't want nor need to clear the version every
                 # time it runs.
                 self.log.info("Progressive publishing, skip cleanup.")
+                version_dir = version_dir_of(version_num)
                 break
 
-            else:
-                if not os.path.isdir(version_dir):
-                    os.makedirs(version_dir)
+            version_num = reserver.reserve(version_num, pin=version_pin)
+            version_dir = version_dir_of(version_num)
 
-                lock_version(lockfile)
+            if not os.path.isdir(version_dir):
+                os.makedirs(version_dir)
 
-                success = self.clean_dir(version_dir)
-                if not success:
-                    if version_pinned:
-                        raise Exception("Version dir cleanup failed: %s"
-                                        % version_dir)
-                    else:
-                        self.log.warning("Version dir cleanup failed, "
-                                         "try next..")
-                        continue
+            # Files that were integrated by previous run of the same
+            # publish (dump) can be kept and skipped in integration.
+            journal = transfer.TransferJournal(
+                os.path.join(version_dir, transfer.JOURNAL),
+                key=journal_key)
 
-                self.log.info("Version %03d will be created for %s" %
-                              (version_num, instance))
-                break
+            integrated = [dst for dst, entry in journal.entries.items()
+                          if journal.is_done(entry["src"], dst)]
+
+            success = self.clean_dir(version_dir, keep=integrated)
+            if not success:
+                if version_pin is not None:
+                    raise Exception("Version dir cleanup failed: %s"
+                                    % version_dir)
+                else:
+                    self.log.warning("Version dir cleanup failed, "
+                                     "try next..")
+                    version_num += 1
+                    continue
+
+            self.log.info("Version %03d will be created for %s" %
+                          (version_num, instance))
+            break
+
+        template_data["version"] = version_num
 
         instance.data["publishPathTemplateData"] = template_data
         instance.data["publishPathTemplate"] = template_publish
 
-        instance.data["_versionlock"] = lockfile
+        instance.data["_versionReservation"] = reserver.data()
+        instance.data["_transferJournal"] = os.path.join(version_dir,
+                                                         transfer.JOURNAL)
+        # Progressive runs of the same dump integrate concurrently into one
+        # version dir, they can not share one journal. Resume is covered
+        # by the version's frame manifest in that mode.
+        instance.data["_transferJournalKey"] = (None if is_progressive
+                                                else journal_key)
         instance.data["versionNext"] = version_num
         instance.data["versionDir"] = version_dir
 
         template_work = project["config"]["template"]["work"]
         instance.data["_sharedStage"] = self.shared_stage(template_work, root)
 
-    def clean_dir(self, path):
-        """Create a clean version dir"""
+    def clean_dir(self, path, keep=None):
+        """Create a clean version dir
+
+        Arguments:
+            path (str): Version dir path
+            keep (iterable, optional): Full path of files to keep, from
+                transfer journal.
+
+        """
         success = True
 
         self.log.info("Cleaning version dir.")
 
-        keep = [
+        keep = set(os.path.normpath(p) for p in keep or [])
+        if keep:
+            self.log.info("Resuming, keeping %d integrated files."
+                          % len(keep))
+            keep.add(os.path.normpath(os.path.join(path, transfer.JOURNAL)))
+
+        preserved = [
             self.LOCK,
             ".instance.json",  # Instance dump file
+            ".instance" + dumpfile.EXTENSION,
+            reclaim.TRASH,  # If not in any project root
         ]
 
-        for item in os.listdir(path):
-            if item in keep:
-                continue
-
-            item_path = os.path.join(path, item)
-
-            try:
-                if os.path.isdir(item_path):
-                    shutil.rmtree(item_path)
-
-                elif os.path.isfile(item_path):
-                    os.remove(item_path)
-
-            except Exception as e:
-                self.log.debug(e)
-
-                return not success
+        def has_kept(dir_path):
+            prefix = dir_path + os.sep
+            return any(p.startswith(prefix) for p in keep)
+
+        def collect(dir_path, top=False):
+            for item in os.listdir(dir_path):
+                if top and item in preserved:
+                    continue
+
+                item_path = os.path.normpath(os.path.join(dir_path, item))
+                if item_path in keep:
+                    continue
+
+                if keep and os.path.isdir(item_path) and has_kept(item_path):
+                    for sub_path in collect(item_path):
+                        yield sub_path
+                else:
+                    yield item_path
+
+        try:
+            discarded = list(collect(os.path.normpath(path), top=True))
+            # Renamed into trash and deleted in background
+            reclaim.get_reclaimer().discard(discarded)
+        except Exception as e:
+            self.log.debug(e)
+
+            return not success
 
         return success
 
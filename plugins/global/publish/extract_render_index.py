@@ -0,0 +1,88 @@
+import os
+import pyblish.api
+
+
+class ExtractRenderIndex(pyblish.api.InstancePlugin):
+    """Index EXR metadata of render layer AOVs
+
+    Reads one frame header of each AOV after render outputs are on disk,
+    writes the index as sidecar file into stage dir to be integrated with
+    other representation files, and puts a summary (channels, resolution,
+    part count) into representation data, so loaders don't need to open
+    image files.
+
+    """
+
+    label = "Index Render Metadata"
+    # After delayed extractions (rendering) done
+    order = pyblish.api.ExtractorOrder + 0.495
+
+    targets = ["localhost"]
+
+    families = [
+        "reveries.renderlayer",
+    ]
+
+    def process(self, instance):
+        from reveries import exrindex
+
+        context = instance.context
+        if not all(result["success"] for result in context.data["results"]):
+            self.log.warning("Atomicity not held, aborting.")
+            return
+
+        template_publish = instance.data["publishPathTemplate"]
+        template_data = instance.data["publishPathTemplateData"]
+        repr_dir = template_publish.format(representation="renderLayer",
+                                           **template_data)
+        published = os.path.join(repr_dir, exrindex.SIDECAR)
+
+        if os.path.isfile(published):
+            # Progressive publish, indexed by previous run
+            index = exrindex.read(published)
+            if index is not None:
+                self.log.info("Render metadata has been indexed.")
+                instance.data["repr.renderLayer.exrIndex"] = \
+                    exrindex.summary(index)
+                return
+
+        stage_dir = instance.data["repr.renderLayer._stage"]
+        sequence = instance.data["repr.renderLayer.sequence"]
+        is_stereo = instance.data.get("repr.renderLayer.stereo")
+
+        patterns = dict()
+        for aov_name, data in sequence.items():
+            fpattern = data["fpattern"]
+            padding = fpattern.count("#")
+            if padding:
+                fpattern = fpattern.replace("#" * padding,
+                                            "%%0%dd" % padding)
+            if is_stereo:
+                fpattern = fpattern.format(stereo="Left")
+            patterns[aov_name] = fpattern
+
+        index = exrindex.build(stage_dir, patterns)
+        if not index:
+            self.log.info("No EXR output to index.")
+            return
+
+        sidecar = os.path.join(stage_dir, exrindex.SIDECAR)
+        # Written via temp file and rename, progressive runs of the same
+        # render may index into this stage dir at the same time.
+        exrindex.write(sidecar, index)
+
+        files = list(instance.data.get("repr.renderLayer._files", []))
+        files.append(exrindex.SIDECAR)
+        instance.data["repr.renderLayer._files"] = files
+
+        progress = instance.data.get("_progressiveOutput")
+        if progress is not None:
+            # Progressive integration only transfers given outputs
+            progress = list(progress)
+            progress.append("%s/%s" % (stage_dir, exrindex.SIDECAR))
+            instance.data["_progressiveOutput"] = progress
+
+        instance.data["repr.renderLayer.exrIndex"] = exrindex.summary(index)
+
+        self.log.info("Indexed %d of %d AOVs: %s"
+                      % (len(index), len(patterns), sidecar))
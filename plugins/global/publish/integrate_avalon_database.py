@@ -1,10 +1,14 @@
-
 import pyblish.api
 from avalon import io
 
 
 class IntegrateAvalonDatabase(pyblish.api.InstancePlugin):
     """寫入本次發佈的相關資料至資料庫
+
+    All writes of one instance are sent in one ordered `bulk_write`, the
+    subset, version and representations are upserted by (parent, name)
+    so running the same publish again will not create duplicates.
+
     """
 
     label = "寫入資料庫"
@@ -13,6 +17,7 @@ class IntegrateAvalonDatabase(pyblish.api.InstancePlugin):
     targets = ["localhost"]
 
     def process(self, instance):
+        from reveries import lib, doccache
 
         context = instance.context
 
@@ -26,58 +31,101 @@ class IntegrateAvalonDatabase(pyblish.api.InstancePlugin):
         asset = instance.data["assetDoc"]
         subset, version, representations = instance.data["toDatabase"]
 
-        # Write subset if not exists
-        filter = {"parent": asset["_id"], "name": subset["name"]}
-        if io.find_one(filter) is None:
-            io.insert_one(subset)
+        existed_version = io.find_one({"type": "version",
+                                       "parent": subset["_id"],
+                                       "name": version["name"]},
+                                      projection={"_id": True})
+
+        requests = self.upsert_subset(asset, subset)
 
-        # Write version if not exists
-        filter = {"parent": subset["_id"], "name": version["name"]}
-        existed_version = io.find_one(filter)
         if existed_version is None:
             # Write version and representations to database
-            version_id = self.write_database(instance,
-                                             version,
-                                             representations)
-            instance.data["insertedVersionId"] = version_id
+            if "pregeneratedVersionId" in instance.data:
+                version["_id"] = instance.data["pregeneratedVersionId"]
+            else:
+                version["_id"] = io.ObjectId()
+            version_id = version["_id"]
 
+            requests += self.write_database(instance,
+                                            version,
+                                            representations)
             # Update dependent
-            self.update_dependent(instance, version_id)
+            requests += self.update_dependent(instance, version_id)
 
         else:
+            version_id = existed_version["_id"]
+
             if context.data.get("_progressivePublishing"):
                 if instance.data.get("_progressiveOutput") is None:
                     pass  # Not given any output, no progress change
 
                 else:
                     self.log.info("Update version publish progress.")
-                    # Update version document "data.time"
-                    filter_ = {"_id": existed_version["_id"]}
-                    update = {"$set": {"data.time": context.data["time"]}}
-                    if "progress" in version["data"]:
-                        # Update version document "progress.current"
-                        progress = version["data"]["progress"]["current"]
-                        update["$inc"] = {"data.progress.current": progress}
-                    else:
-                        pass  # progress == -1, no progress update needed.
-                    io.update_many(filter_, update)
+                    requests += self.update_progress(context,
+                                                     version_id,
+                                                     version)
 
             else:
                 self.log.info("Version existed, representation file has been "
                               "overwritten.")
-                # Update version document "data.time"
-                filter_ = {"_id": existed_version["_id"]}
-                update = {"$set": {"data.time": context.data["time"]}}
-                io.update_many(filter_, update)
-
-                # Update representation documents "data"
-                for representation in representations:
-                    filter_ = {
-                        "name": representation["name"],
-                        "parent": existed_version["_id"],
-                    }
-                    update = {"$set": {"data": representation["data"]}}
-                    io.update_many(filter_, update)
+                requests += self.overwrite_version(context,
+                                                   version_id,
+                                                   representations)
+
+        if not requests:
+            return
+
+        result = self.bulk_write(lib.project_collection(), requests)
+        cache = doccache.get_cache(context)
+        cache.invalidate()
+        self.log.debug("Document cache: %(hits)d hits, %(misses)d misses"
+                       % cache.stats())
+
+        # Subset and version are upserted with pre-generated `_id`, if not
+        # found in upserted ids, they were created by others.
+        upserted = set(result.upserted_ids.values())
+
+        if (instance.data.get("_newSubset")
+                and subset["_id"] not in upserted):
+            self.resolve_subset(asset, subset, version_id)
+
+        if existed_version is None:
+            if version_id not in upserted:
+                self.resolve_version(instance, version_id, version)
+            instance.data["insertedVersionId"] = version_id
+
+    def bulk_write(self, collection, requests):
+        """Write in order, retry once if an upsert lost the race
+
+        Subset and version are unique by (type, parent, name), see
+        `reveries.indexes`. When other publisher inserted the same document
+        between our upsert's lookup and insert, the server rejects ours with
+        duplicate key error. Retrying is safe since all requests are
+        upserts or `$set`, the retried upsert then matches the document of
+        others, which is resolved afterward.
+
+        """
+        from pymongo.errors import BulkWriteError
+
+        try:
+            return collection.bulk_write(requests, ordered=True)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if not errors or any(error["code"] != 11000 for error in errors):
+                raise
+            self.log.warning("Document was written by other publisher, "
+                             "retrying..")
+            return collection.bulk_write(requests, ordered=True)
+
+    def upsert_subset(self, asset, subset):
+        """Write subset if not exists"""
+        from pymongo import UpdateOne
+
+        filter_ = {"type": "subset",
+                   "parent": asset["_id"],
+                   "name": subset["name"]}
+
+        return [UpdateOne(filter_, {"$setOnInsert": subset}, upsert=True)]
 
     def write_database(self, instance, version, representations):
         """Write version and representations to database
@@ -86,33 +134,112 @@ class IntegrateAvalonDatabase(pyblish.api.InstancePlugin):
         without error.
 
         """
+        from pymongo import UpdateOne
+
+        requests = list()
+
         # Write version
         #
         self.log.info("Registering version {} to database ..."
                       "".format(version["name"]))
 
-        if "pregeneratedVersionId" in instance.data:
-            version["_id"] = instance.data["pregeneratedVersionId"]
-
-        version_id = io.insert_one(version).inserted_id
+        filter_ = {"type": "version",
+                   "parent": version["parent"],
+                   "name": version["name"]}
+        requests.append(
+            UpdateOne(filter_, {"$setOnInsert": version}, upsert=True)
+        )
 
         # Write representations
         #
         self.log.info("Registering {} representations ..."
                       "".format(len(representations)))
         for representation in representations:
-            representation["parent"] = version_id
+            representation["parent"] = version["_id"]
+            requests.append(self.upsert_representation(representation))
+
+        return requests
+
+    def upsert_representation(self, representation):
+        from pymongo import UpdateOne
+
+        filter_ = {"type": "representation",
+                   "parent": representation["parent"],
+                   "name": representation["name"]}
+        on_insert = {k: v for k, v in representation.items() if k != "data"}
+        update = {"$setOnInsert": on_insert,
+                  "$set": {"data": representation["data"]}}
+
+        return UpdateOne(filter_, update, upsert=True)
+
+    def update_progress(self, context, version_id, version):
+        from pymongo import UpdateOne
+
+        # Update version document "data.time"
+        update = {"$set": {"data.time": context.data["time"]}}
+        if "progress" in version["data"]:
+            # Update version document "progress.current"
+            #   Increment by this run's step so concurrent runs add up,
+            #   step is zero if the frames were counted before (see
+            #   `RemoveOutdatedProgress`, which looks up the manifest).
+            progress = version["data"]["progress"]["current"]
+            update["$inc"] = {"data.progress.current": progress}
+        else:
+            pass  # progress == -1, no progress update needed.
+
+        return [UpdateOne({"_id": version_id}, update)]
+
+    def overwrite_version(self, context, version_id, representations):
+        from pymongo import UpdateOne
+
+        # Update version document "data.time"
+        update = {"$set": {"data.time": context.data["time"]}}
+        requests = [UpdateOne({"_id": version_id}, update)]
 
-        io.insert_many(representations)
+        # Update representation documents "data", or insert if previous
+        # publish did not complete.
+        for representation in representations:
+            representation["parent"] = version_id
+            requests.append(self.upsert_representation(representation))
 
-        return version_id
+        return requests
 
     def update_dependent(self, instance, version_id):
+        from pymongo import UpdateOne
 
         version_id = str(version_id)
         field = "data.dependents." + version_id
 
-        for version_id_, data in instance.data["dependencies"].items():
-            filter_ = {"_id": io.ObjectId(version_id_)}
-            update = {"$set": {field: {"count": data["count"]}}}
-            io.update_many(filter_, update)
+        return [
+            UpdateOne({"_id": io.ObjectId(version_id_)},
+                      {"$set": {field: {"count": data["count"]}}})
+            for version_id_, data in instance.data["dependencies"].items()
+        ]
+
+    def resolve_subset(self, asset, subset, version_id):
+        """Subset was created by other publisher in the meantime"""
+        existed = io.find_one({"type": "subset",
+                               "parent": asset["_id"],
+                               "name": subset["name"]},
+                              projection={"_id": True})
+        if existed["_id"] == subset["_id"]:
+            return
+
+        self.log.warning("Subset '%s' was created by other publisher, "
+                         "re-parenting version." % subset["name"])
+        io.update_many({"_id": version_id},
+                       {"$set": {"parent": existed["_id"]}})
+
+    def resolve_version(self, instance, version_id, version):
+        """Version was created by other publisher in the meantime"""
+        # Remove representations that were parented to our version
+        io.delete_many({"type": "representation", "parent": version_id})
+        # Remove our version from dependencies' dependents
+        field = "data.dependents." + str(version_id)
+        dependencies = [io.ObjectId(version_id_)
+                        for version_id_ in instance.data["dependencies"]]
+        if dependencies:
+            io.update_many({"_id": {"$in": dependencies}},
+                           {"$unset": {field: ""}})
+        raise Exception("Version %03d has been registered by other "
+                        "publisher, this is a bug." % version["name"])
@@ -1,11 +1,7 @@
 
-import os
-import shutil
-
-import errno
 import pyblish.api
 from avalon import api, io
-from avalon.vendor import filelink
+from reveries import transfer, doccache, manifest, sequences, utils
 
 
 class IntegrateAvalonSubset(pyblish.api.InstancePlugin):
@@ -32,6 +28,9 @@ class IntegrateAvalonSubset(pyblish.api.InstancePlugin):
 
     targets = ["localhost"]
 
+    transfer_workers = 8
+    transfer_retries = 4
+
     def __init__(self, *args, **kwargs):
         super(IntegrateAvalonSubset, self).__init__(*args, **kwargs)
         self.is_progressive = None
@@ -65,7 +64,20 @@ class IntegrateAvalonSubset(pyblish.api.InstancePlugin):
 
         # Integrate representations' files to shareable space
         self.log.info("Integrating representations to shareable space ...")
-        self.integrate()
+        journal = transfer.TransferJournal(
+            instance.data["_transferJournal"],
+            key=instance.data.get("_transferJournalKey"))
+        frames = None
+        if self.is_progressive:
+            frames = manifest.FrameManifest(instance.data["versionDir"])
+            frames.load()
+        try:
+            self.integrate(journal, frames)
+        finally:
+            journal.close()
+
+        if frames is not None:
+            frames.commit(step=max(self.progress, 0))
 
     def register(self, instance):
         context = instance.context
@@ -142,13 +154,16 @@ class IntegrateAvalonSubset(pyblish.api.InstancePlugin):
                 dst = template_publish.format(representation=repr_name,
                                               **template_data)
 
+                # File lists may contain `sequences.FrameSet`
                 self.transfers["files"] += [
                     ("%s/%s" % (src, tail), "%s/%s" % (dst, tail)) for tail in
-                    instance.data.get("repr.%s._files" % repr_name, [])
+                    sequences.expand(
+                        instance.data.get("repr.%s._files" % repr_name))
                 ]
                 self.transfers["hardlinks"] += [
                     ("%s/%s" % (src, tail), "%s/%s" % (dst, tail)) for tail in
-                    instance.data.get("repr.%s._hardlinks" % repr_name, [])
+                    sequences.expand(
+                        instance.data.get("repr.%s._hardlinks" % repr_name))
                 ]
 
             # Filtering representation data
@@ -157,20 +172,25 @@ class IntegrateAvalonSubset(pyblish.api.InstancePlugin):
 
         return subset, version, list(representations.values())
 
-    def integrate(self):
+    def integrate(self, journal, frames=None):
         """Move the files
 
-        Through `self.transfers`
+        Through `self.transfers`, transfers that have been recorded in
+        `journal` are skipped.
+
+        Arguments:
+            journal (TransferJournal): Journal of completed transfers
+            frames (FrameManifest, optional): Manifest of progressive
+                version, integrated files in manifest are skipped and
+                newly integrated files are recorded.
 
         """
         if self.progress_output is None:
             progress_output = None
         else:
-            progress_output = [
-                os.path.abspath(
-                    os.path.normpath(os.path.expandvars(file)))
-                for file in self.progress_output
-            ]
+            progress_output = set(
+                transfer.normpath(file)
+                for file in sequences.expand(self.progress_output))
 
         # Write to disk
         #          _
@@ -183,88 +203,66 @@ class IntegrateAvalonSubset(pyblish.api.InstancePlugin):
         #     \|________|
         #
 
-        transfered = list()
+        plan = transfer.TransferPlan()
 
         for job in self.transfers:
             transfers = self.transfers[job]
 
             for src, dst in transfers:
-                # normpath
-                # self.log.debug("Src. Before: {!r}".format(src))
-                # self.log.debug("Dst. Before: {!r}".format(dst))
-
-                src = os.path.abspath(
-                    os.path.normpath(os.path.expandvars(src)))
-                dst = os.path.abspath(
-                    os.path.normpath(os.path.expandvars(dst)))
-
-                if self.is_progressive:
-                    if os.path.isfile(dst):
+                if frames is not None:
+                    if dst in frames:
                         continue
                     if (progress_output is not None
-                            and src not in progress_output):
+                            and transfer.normpath(src) not in progress_output):
                         continue
 
-                print("Copying {0}: {1} \n"
-                      "          -> {2}".format(job, src, dst))
+                plan.add(job, src, dst)
 
-                if src == dst:
-                    self.log.debug("Source and destination are the same, "
-                                   "will not copy.")
-                    continue
+        resumed = [item for item in plan.items
+                   if journal.is_done(item[1], item[2])]
+        if resumed:
+            self.log.info("Resuming, %d files already integrated."
+                          % len(resumed))
+            if frames is not None:
+                for _, src, dst in resumed:
+                    frames.record(dst, src)
+            resumed = set(resumed)
+            plan.items = [item for item in plan.items if item not in resumed]
 
-                if dst in transfered:
-                    # (TODO) Should not implement like this. This is a hot-fix.
-                    self.log.warning("File transfered: %s" % dst)
-                    continue
+        if plan.skipped:
+            self.log.debug("%d files source and destination are the same, "
+                           "will not copy." % len(plan.skipped))
 
-                if job == "files":
-                    self.copy_file(src, dst)
-                if job == "hardlinks":
-                    self.hardlink_file(src, dst)
+        for job, src, dst in plan.duplicated:
+            self.log.warning("File transfered: %s" % dst)
 
-                transfered.append(dst)
+        self.log.info("Transferring %d files with %d workers .."
+                      % (len(plan), self.transfer_workers))
 
-    def copy_file(self, src, dst):
-        file_dir = os.path.dirname(dst)
-        if not os.path.isdir(file_dir):
-            os.makedirs(file_dir)
-
-        try:
-            shutil.copy2(src, dst)
-        except OSError:
-            msg = "An unexpected error occurred."
-            self.log.critical(msg)
-            raise OSError(msg)
-
-    def hardlink_file(self, src, dst):
-        if os.path.isfile(dst):
-            self.log.warning("File exists, skip creating hardlink: %s" % dst)
-            return
-
-        dirname = os.path.dirname(dst)
-        try:
-            os.makedirs(dirname)
-        except OSError as e:
-            if e.errno == errno.EEXIST:
-                pass
-            else:
-                self.log.critical("An unexpected error occurred.")
-                raise
+        def on_done(job, src, dst):
+            journal.record(job, src, dst)
+            if frames is not None:
+                frames.record(dst, src)
 
-        filelink.create(src, dst, filelink.HARDLINK)
+        engine = transfer.TransferEngine(workers=self.transfer_workers,
+                                         retries=self.transfer_retries,
+                                         log=self.log,
+                                         on_done=on_done)
+        engine.run(plan)
 
     def get_subset(self, instance, families):
 
         asset_id = instance.data["assetDoc"]["_id"]
 
-        subset = io.find_one({"type": "subset",
-                              "parent": asset_id,
-                              "name": instance.data["subset"]})
+        cache = doccache.get_cache(instance.context)
+        subset = cache.find_one({"type": "subset",
+                                 "parent": asset_id,
+                                 "name": instance.data["subset"]})
 
         if subset is None:
             subset_name = instance.data["subset"]
             self.log.info("Subset '%s' not found, creating.." % subset_name)
+            instance.data["_newSubset"] = True
 
             subset = {
                 "_id": io.ObjectId(),  # Pre-generate subset id
@@ -350,6 +348,7 @@ class IntegrateAvalonSubset(pyblish.api.InstancePlugin):
         source = context.data["currentMaking"]
         source = source.replace(api.registered_root(), "{root}")
         source = source.replace("\\", "/")
+        project = api.Session["AVALON_PROJECT"]
 
         work_dir = api.Session.get("AVALON_WORKDIR")
         work_dir = work_dir.replace(api.registered_root(), "{root}")
@@ -360,6 +359,7 @@ class IntegrateAvalonSubset(pyblish.api.InstancePlugin):
             "author": context.data["user"],
             "task": api.Session.get("AVALON_TASK"),
             "source": source,
+            "sourceKey": utils.source_key(source, project),
             "workDir": work_dir,
             "comment": context.data.get("comment"),
             "dependencies": instance.data.get("dependencies", dict()),
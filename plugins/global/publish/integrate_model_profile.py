@@ -0,0 +1,50 @@
+import pyblish.api
+from avalon import io
+
+
+class IntegrateModelProfile(pyblish.api.InstancePlugin):
+    """Write model profile (mesh hashes) into profile collection
+
+    Profile is stored by (version, avalonId) in a dedicated collection, see
+    `reveries.modelprofile`, not in representation data.
+
+    """
+
+    label = "Integrate Model Profile"
+    order = pyblish.api.IntegratorOrder + 0.11
+
+    targets = ["localhost"]
+
+    families = [
+        "reveries.model",
+        "reveries.rig",
+    ]
+
+    def process(self, instance):
+        from reveries import modelprofile
+
+        context = instance.context
+        if not all(result["success"] for result in context.data["results"]):
+            self.log.warning("Atomicity not held, aborting.")
+            return
+
+        profile = instance.data.get("modelProfile")
+        if profile is None:
+            self.log.info("No model profile.")
+            return
+
+        subset, version, _ = instance.data["toDatabase"]
+
+        version_id = instance.data.get("insertedVersionId")
+        if version_id is not None:
+            filter_ = {"_id": version_id}
+        else:
+            # Version existed and has been overwritten
+            filter_ = {"type": "version",
+                       "parent": subset["_id"],
+                       "name": version["name"]}
+
+        version = io.find_one(filter_, projection={"parent": True})
+        modelprofile.write(version["_id"], version["parent"], profile)
+
+        self.log.info("%d mesh profiles written." % len(profile))
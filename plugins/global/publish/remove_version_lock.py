@@ -1,10 +1,12 @@
 
 import os
 import pyblish.api
+import avalon.io
+from reveries import reservation
 
 
 class RemoveVersionLock(pyblish.api.ContextPlugin):
-    """Unlock version directory after subsets have been integrated
+    """Release version reservation after subsets have been integrated
     """
 
     label = "Remove Lock"
@@ -19,9 +21,17 @@ class RemoveVersionLock(pyblish.api.ContextPlugin):
             if not instance.data.get("publish", True):
                 continue
 
-            lockfile = instance.data["_versionlock"]
-            os.remove(lockfile)
-            # (TODO) If publish process stopped by user, version dir will
-            #        remain locked since this plugin may not be executed.
-            #        To solve this, may require pyblish/pyblish-base#352
-            #        be implemented.
+            data = instance.data.get("_versionReservation")
+            if data:
+                collection = None
+                if data["backend"] == reservation.DATABASE:
+                    collection = avalon.io._database[reservation.COLLECTION]
+                reservation.release(data, collection)
+
+            # Publish completed, nothing to resume
+            journal = instance.data.get("_transferJournal")
+            if journal and os.path.isfile(journal):
+                os.remove(journal)
+            # (NOTE) If publish process stopped by user, this plugin may
+            #        not be executed and the version remains reserved until
+            #        the reservation expired, see `reservation.DEFAULT_TTL`.
@@ -1,6 +1,7 @@
 
 import pyblish.api
 import avalon.io
+from reveries import doccache
 
 
 class ValidateAvalonDependencies(pyblish.api.InstancePlugin):
@@ -42,35 +43,75 @@ class ValidateAvalonDependencies(pyblish.api.InstancePlugin):
 
         dependencies = instance.data["dependencies"]
         asset_id = instance.data["assetDoc"]["_id"]
-        subset = avalon.io.find_one({"type": "subset",
-                                     "parent": asset_id,
-                                     "name": instance.data["subset"]})
+        cache = doccache.get_cache(instance.context)
+        subset = cache.find_one({"type": "subset",
+                                 "parent": asset_id,
+                                 "name": instance.data["subset"]})
 
         if subset is None:
             # Never been published
             return
 
         # Ensure Acyclic
-        acyclic = self.is_acyclic(dependencies, subset["_id"])
-        if not acyclic:
+        chain = self.find_cycle(dependencies, subset["_id"], cache)
+        if chain:
+            self.log.error("Dependency chain: %s"
+                           % " -> ".join(self.describe(chain, cache)))
             raise Exception("Cyclic dependency detected, this is invalid.")
 
-    def is_acyclic(self, dependencies, current_subset_id):
-        for version_id in dependencies:
-
-            version_id = avalon.io.ObjectId(version_id)
-            version = avalon.io.find_one({"_id": version_id})
+    def is_acyclic(self, dependencies, current_subset_id, cache):
+        return not self.find_cycle(dependencies, current_subset_id, cache)
 
-            if version is None:
-                continue
+    def find_cycle(self, dependencies, current_subset_id, cache):
+        """Breadth-first search current subset in dependency graph
 
-            if version["parent"] == current_subset_id:
-                # Current subset has been found in dependency chain.
-                # This is not okay. :(
-                return False
+        Each level of versions is fetched in one query, and every version
+        is visited only once, so shared dependencies are not walked again
+        on each path.
 
-            dependencies = version["data"]["dependencies"]
-            if not self.is_acyclic(dependencies, current_subset_id):
-                return False
+        Returns:
+            list: Version documents from direct dependency to the version
+                of current subset, or empty list if acyclic.
 
-        return True
+        """
+        via = dict()  # version id: the version id that depends on it
+        frontier = list()
+        for version_id in dependencies:
+            version_id = avalon.io.ObjectId(version_id)
+            if version_id not in via:
+                via[version_id] = None
+                frontier.append(version_id)
+
+        visited = dict()
+        while frontier:
+            versions = cache.find({"_id": {"$in": frontier},
+                                   "type": "version"})
+            frontier = list()
+
+            for version in versions:
+                visited[version["_id"]] = version
+
+                if version["parent"] == current_subset_id:
+                    # Current subset has been found in dependency chain.
+                    # This is not okay. :(
+                    chain = [version]
+                    while via[chain[0]["_id"]] is not None:
+                        chain.insert(0, visited[via[chain[0]["_id"]]])
+                    return chain
+
+                for version_id in version["data"].get("dependencies", {}):
+                    version_id = avalon.io.ObjectId(version_id)
+                    if version_id not in via:
+                        via[version_id] = version["_id"]
+                        frontier.append(version_id)
+
+        return []
+
+    def describe(self, chain, cache):
+        subset_ids = list(set(version["parent"] for version in chain))
+        subsets = dict((subset["_id"], subset["name"]) for subset in
+                       cache.find({"_id": {"$in": subset_ids}},
+                                  projection={"name": True}))
+        return ["%s v%03d" % (subsets.get(version["parent"], "?"),
+                              version["name"])
+                for version in chain]
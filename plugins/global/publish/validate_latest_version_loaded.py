@@ -14,9 +14,18 @@ class ValidateLatestVersionLoaded(pyblish.api.ContextPlugin):
     label = "Latest Version Loaded"
 
     def process(self, context):
+        from reveries import lib
+
         host = avalon.api.registered_host()
 
-        checked = set()
+        containers = dict()
+        for container in host.ls():
+            representation_id = io.ObjectId(container["representation"])
+            nodes = containers.setdefault(representation_id, list())
+            nodes.append(container["objectName"])
+
+        status = lib.version_status(list(containers))
+
         outdated = dict()
 
         # We may have missing representation due to the limited
@@ -24,34 +33,14 @@ class ValidateLatestVersionLoaded(pyblish.api.ContextPlugin):
         # and the database overthere is incomplete.
         missing = dict()
 
-        for container in host.ls():
-            container_node = container["objectName"]
-            representation_id = io.ObjectId(container["representation"])
-
-            if representation_id in checked:
-                if representation_id in outdated:
-                    outdated[representation_id].append(container_node)
-
-                if representation_id in missing:
-                    missing[representation_id].append(container_node)
-
-                continue
-
-            checked.add(representation_id)
-
-            representation = io.find_one({"_id": representation_id})
-            if representation is None:
-                missing[representation_id] = [container_node]
-
-                continue
+        for representation_id, nodes in containers.items():
+            result = status[representation_id]
 
-            version = io.find_one({"_id": representation["parent"]})
-            highest_version = io.find_one({"type": "version",
-                                           "parent": version["parent"]},
-                                          sort=[("name", -1)])
+            if result["missing"]:
+                missing[representation_id] = nodes
 
-            if version["name"] < highest_version["name"]:
-                outdated[representation_id] = [container_node]
+            elif result["current"] < result["latest"]:
+                outdated[representation_id] = nodes
 
         if outdated:
             nodes = "\n".join(n for x in outdated.values() for n in x)
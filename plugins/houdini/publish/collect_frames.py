@@ -16,6 +16,7 @@ class CollectFrames(pyblish.api.InstancePlugin):
 
     def process(self, instance):
         import hou
+        from reveries import sequences
         from reveries.houdini import lib
 
         start_frame = instance.data.get("startFrame", None)
@@ -41,6 +42,7 @@ class CollectFrames(pyblish.api.InstancePlugin):
             frames.add(output)
 
         instance.data.update({
-            "frameOutputs": sorted(frames),
+            # Collapsed into `sequences.FrameSet`
+            "frameOutputs": sequences.collapse(sorted(frames)),
             "singleOutput": len(frames) == 1,
         })
@@ -42,15 +42,16 @@ class ExtractAlembic(pyblish.api.InstancePlugin):
     def export_abc_seq(self, instance):
         ropnode = instance[0]
 
+        from reveries import sequences
+
         # Get the first frame filename from pre-collected data
-        output = instance.data["frameOutputs"][0]
+        frames = instance.data["frameOutputs"]
+        output = sequences.first(frames)
         # Set custom staging dir
         staging_dir, filename = os.path.split(output)
         repr_root = instance.data["reprRoot"]
 
-        files = list()
-        for path in instance.data["frameOutputs"]:
-            files.append(os.path.basename(path))
+        files = sequences.map_paths(frames, os.path.basename)
 
         instance.data["repr.AlembicSeq._stage"] = staging_dir
         instance.data["repr.AlembicSeq._hardlinks"] = files
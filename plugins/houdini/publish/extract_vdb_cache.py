@@ -12,6 +12,7 @@ class ExtractVDBCache(pyblish.api.InstancePlugin):
     ]
 
     def process(self, instance):
+        from reveries import sequences
         from reveries.houdini import lib
 
         ropnode = instance[0]
@@ -19,10 +20,9 @@ class ExtractVDBCache(pyblish.api.InstancePlugin):
         files = list()
 
         if "frameOutputs" in instance.data:
-            output = instance.data["frameOutputs"][0]
-
-            for path in instance.data["frameOutputs"]:
-                files.append(os.path.basename(path))
+            frames = instance.data["frameOutputs"]
+            output = sequences.first(frames)
+            files = sequences.map_paths(frames, os.path.basename)
 
         else:
             output_parm = lib.get_output_parameter(ropnode)
@@ -16,9 +16,11 @@ class ValidateFrames(pyblish.api.InstancePlugin):
 
     def process(self, instance):
         import hou
+        from reveries import sequences
         from reveries.houdini import lib
 
-        collected_frames = instance.data.get("frameOutputs", [])
+        collected_frames = sorted(
+            sequences.expand(instance.data.get("frameOutputs")))
 
         start_frame = instance.data.get("startFrame", None)
         end_frame = instance.data.get("endFrame", None)
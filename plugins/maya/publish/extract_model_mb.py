@@ -35,7 +35,7 @@ class ExtractModelAsMayaBinary(pyblish.api.InstancePlugin):
         geo_id_and_hash = self.extract_mayabinary(nodes, outpath)
         assert geo_id_and_hash is not None, ("Geometry hash not calculated.")
 
-        instance.data["repr.mayaBinary.modelProfile"] = geo_id_and_hash
+        instance.data["modelProfile"] = geo_id_and_hash
 
     def extract_mayabinary(self, nodes, outpath):
         import maya.cmds as cmds
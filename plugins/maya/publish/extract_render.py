@@ -86,6 +86,7 @@ class ExtractRender(pyblish.api.InstancePlugin):
 
     def compute_outputs(self, instance, camera, staging_dir, stereo=None):
         from maya import cmds
+        from reveries import sequences
         from reveries.maya import utils as maya_utils
 
         renderer = instance.data["renderer"]
@@ -141,8 +142,7 @@ class ExtractRender(pyblish.api.InstancePlugin):
             step = int(instance.data["step"])
 
             fname = pattern.replace(padding_str, frame_str)
-            for frame_num in range(start, end + 1, step):
-                files.append(fname % frame_num)
+            files.append(sequences.FrameSet(fname, [(start, end, step)]))
 
         return outputs, sequence, files
 
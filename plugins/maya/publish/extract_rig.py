@@ -87,7 +87,7 @@ class ExtractRig(pyblish.api.InstancePlugin):
         instance.data["repr.mayaBinary._stage"] = staging_dir
         instance.data["repr.mayaBinary._files"] = [filename]
         instance.data["repr.mayaBinary.entryFileName"] = filename
-        instance.data["repr.mayaBinary.modelProfile"] = geo_id_and_hash
+        instance.data["modelProfile"] = geo_id_and_hash
 
     def hash(self, mesh_nodes):
         from maya import cmds
@@ -3,10 +3,10 @@ import pyblish.api
 from reveries import plugins
 
 
-def _hash(mesh):
+def _hash(mesh, version):
     from reveries.maya import utils
 
-    hasher = utils.MeshHasher()
+    hasher = utils.MeshHasher(version=version)
     hasher.set_mesh(mesh)
     hasher.update_points()
 
@@ -15,34 +15,19 @@ def _hash(mesh):
 
 def get_protected(instance):
     from avalon import io
-
-    protected = dict()
+    from reveries import modelprofile
 
     asset = instance.data["assetDoc"]
     subset = io.find_one({"type": "subset",
                           "parent": asset["_id"],
-                          "name": instance.data["subset"]})
-
-    if subset is not None:
-        versions = io.find({"type": "version", "parent": subset["_id"]},
-                           sort=[("name", -1)])
-
-        for version in versions:
-            repr = io.find_one({"type": "representation",
-                                "parent": version["_id"],
-                                "name": "mayaBinary"})
-
-            lock_list = repr["data"].get("modelProtected")
-            if lock_list is None:
-                continue
+                          "name": instance.data["subset"]},
+                         projection={"_id": True})
 
-            profile = repr["data"].get("modelProfile", dict())
-            for id in lock_list:
-                data = profile[id][0]  # Should have only one mesh per id
-                name = data.pop("hierarchy")
-                protected[name] = data
+    if subset is None:
+        return dict()
 
-    return protected
+    return modelprofile.find_protected(subset["_id"],
+                                       fields=["points", "hashVersion"])
 
 
 class SelectChanged(plugins.MayaSelectInvalidInstanceAction):
@@ -67,6 +52,7 @@ class ValidateModelProtectedUnchanged(pyblish.api.InstancePlugin):
     @classmethod
     def get_invalid_changed(cls, instance, protected=None):
         from maya import cmds
+        from reveries import meshhash
 
         invalid = list()
 
@@ -85,7 +71,9 @@ class ValidateModelProtectedUnchanged(pyblish.api.InstancePlugin):
                 continue
             mesh = mesh[0]
 
-            if not data["points"] == _hash(mesh)["points"]:
+            # Hash in the same digest version as the protected profile
+            version = meshhash.digest_version(data)
+            if not data["points"] == _hash(mesh, version)["points"]:
                 invalid.append(name)
 
         return invalid
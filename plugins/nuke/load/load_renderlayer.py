@@ -72,7 +72,7 @@ class RenderLayerLoader(PackageLoader, avalon.api.Loader):
         return options.get("beauty")
 
     @classmethod
-    def is_singleaov(cls, path, start):
+    def first_frame(cls, path, start):
         import os
 
         path = path % start
@@ -88,13 +88,15 @@ class RenderLayerLoader(PackageLoader, avalon.api.Loader):
                 nuke.critical(message)  # This will pop-up a dialog
                 raise RuntimeError(message)
 
-        try:
-            data = exrheader.read_exr_header(path)
-        except Exception:
+        return path
+
+    @classmethod
+    def is_singleaov(cls, path, header):
+        if isinstance(header, Exception):
             cls.log.warning("EXR header read failed: %s" % path)
             return False
-        return set(data["channels"]) in [{"R", "G", "B", "A"},
-                                         {"R", "G", "B"}]
+        return set(header["channels"]) in [{"R", "G", "B", "A"},
+                                           {"R", "G", "B"}]
 
     @classmethod
     def resolve_path(cls, sequences, root_path):
@@ -121,7 +123,8 @@ class RenderLayerLoader(PackageLoader, avalon.api.Loader):
                         group_name,
                         stamp_name,
                         start,
-                        end):
+                        end,
+                        exr_index=None):
 
         cls.resolve_path(sequences, root_path)
 
@@ -129,9 +132,24 @@ class RenderLayerLoader(PackageLoader, avalon.api.Loader):
         multiaovs = OrderedDict()
         singleaovs = OrderedDict()
 
+        # Use channels indexed at publish, read first frame header of
+        # other AOVs at once
+        headers = dict(exr_index or {})
+        unindexed = [aov_name for aov_name in sequences
+                     if aov_name not in headers]
+        if unindexed:
+            first_frames = dict(
+                (aov_name, cls.first_frame(sequences[aov_name]["_resolved"],
+                                           start))
+                for aov_name in unindexed
+            )
+            read = exrheader.read_exr_headers(set(first_frames.values()))
+            for aov_name, path in first_frames.items():
+                headers[aov_name] = read[path]
+
         for aov_name in sorted(sequences, key=lambda k: k.lower()):
             data = sequences[aov_name]
-            if cls.is_singleaov(data["_resolved"], start):
+            if cls.is_singleaov(data["_resolved"], headers[aov_name]):
                 singleaovs[aov_name] = data
             else:
                 multiaovs[aov_name] = data
@@ -246,7 +264,9 @@ class RenderLayerLoader(PackageLoader, avalon.api.Loader):
                                      group_name=name,
                                      stamp_name=namespace,
                                      start=start,
-                                     end=end,)
+                                     end=end,
+                                     exr_index=representation["data"].get(
+                                         "exrIndex"))
 
         return pipeline.containerise(name=name,
                                      namespace=namespace,
@@ -0,0 +1,249 @@
+"""Read-through Avalon document cache for one publish
+
+Publish plugins query the same subset, version and representation
+documents over and over, this cache lives in `context.data` and serves
+repeated queries from memory.
+
+Documents fetched by `_id` are stored by id, other queries are stored by
+their filter, projection and sort. Only found documents are cached, so a
+document that is created later by other process can still be found.
+Writes done through the cache invalidate the affected entries.
+
+Usage:
+    >> cache = doccache.get_cache(context)
+    >> version = cache.find_one({"_id": version_id})
+    >> cache.hits, cache.misses
+    (12, 3)
+
+"""
+import copy
+import logging
+
+
+log = logging.getLogger(__name__)
+
+
+CONTEXT_KEY = "_documentCache"
+
+
+def _freeze(value):
+    """Return hashable form of a query value"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _project(document, projection):
+    """Apply inclusion projection on cached document, top level keys only
+    """
+    if not projection:
+        return copy.deepcopy(document)
+
+    keys = set(key.split(".", 1)[0]
+               for key, include in projection.items() if include)
+    if not keys:
+        # Exclusion projection
+        excluded = set(key for key, include in projection.items()
+                       if "." not in key)
+        return dict((k, copy.deepcopy(v)) for k, v in document.items()
+                    if k not in excluded)
+
+    keys.add("_id")
+    return dict((k, copy.deepcopy(v)) for k, v in document.items()
+                if k in keys)
+
+
+def _id_of(filter):
+    """Return `_id` if the filter only selects one document by id"""
+    if not isinstance(filter, dict) or "_id" not in filter:
+        return None
+    if set(filter) - set(["_id", "type"]):
+        return None
+    if isinstance(filter["_id"], dict):
+        return None
+    return filter["_id"]
+
+
+def _ids_of(filter):
+    """Return `_id` list if the filter is an `$in` query on id"""
+    if not isinstance(filter, dict) or set(filter) - set(["_id", "type"]):
+        return None
+    value = filter.get("_id")
+    if isinstance(value, dict) and list(value) == ["$in"]:
+        return list(value["$in"])
+    return None
+
+
+class DocumentCache(object):
+    """Read-through cache of `avalon.io` queries
+
+    Arguments:
+        database (optional): Object that provides `find_one`, `find` and
+            write methods like `avalon.io`, default `avalon.io`.
+
+    """
+
+    def __init__(self, database=None):
+        if database is None:
+            import avalon.io as database
+        self.database = database
+
+        self.hits = 0
+        self.misses = 0
+
+        self._by_id = dict()
+        self._queries = dict()
+
+    def clear(self):
+        self._by_id.clear()
+        self._queries.clear()
+
+    def stats(self):
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "documents": len(self._by_id),
+                "queries": len(self._queries)}
+
+    def _store(self, document):
+        self._by_id[document["_id"]] = document
+
+    def _match_type(self, document, filter):
+        return "type" not in filter or document.get("type") == filter["type"]
+
+    def find_one(self, filter, projection=None, sort=None):
+        """Cached `avalon.io.find_one`
+
+        Document fetched by id is stored without projection so it can be
+        served to any later projection.
+
+        """
+        id_ = _id_of(filter)
+        if id_ is not None:
+            document = self._by_id.get(id_)
+            if document is not None:
+                self.hits += 1
+                if not self._match_type(document, filter):
+                    return None
+                return _project(document, projection)
+
+            self.misses += 1
+            document = self.database.find_one(filter)
+            if document is None:
+                return None
+            self._store(document)
+            return _project(document, projection)
+
+        key = (_freeze(filter), _freeze(projection), _freeze(sort))
+        if key in self._queries:
+            self.hits += 1
+            return copy.deepcopy(self._queries[key])
+
+        self.misses += 1
+        document = self.database.find_one(filter,
+                                          projection=projection,
+                                          sort=sort)
+        if document is not None:
+            self._queries[key] = document
+            if not projection:
+                self._store(document)
+
+        return copy.deepcopy(document)
+
+    def find(self, filter, projection=None, sort=None):
+        """Cached `avalon.io.find`, returns a list
+
+        Only `{"_id": {"$in": [...]}}` queries are served from cache, the
+        ids that are not cached yet are fetched in one query. Other queries
+        are passed through and their documents are stored by id.
+
+        """
+        ids = _ids_of(filter)
+        if ids is None:
+            self.misses += 1
+            documents = list(self.database.find(filter,
+                                                projection=projection,
+                                                sort=sort))
+            if not projection:
+                for document in documents:
+                    self._store(document)
+            return copy.deepcopy(documents)
+
+        missing = [id_ for id_ in ids if id_ not in self._by_id]
+        self.hits += len(ids) - len(missing)
+
+        if missing:
+            self.misses += len(missing)
+            query = dict(filter)
+            query["_id"] = {"$in": missing}
+            for document in self.database.find(query):
+                self._store(document)
+
+        documents = list()
+        for id_ in ids:
+            document = self._by_id.get(id_)
+            if document is not None and self._match_type(document, filter):
+                documents.append(_project(document, projection))
+
+        if sort:
+            for field, direction in reversed(sort):
+                documents.sort(key=lambda d: d.get(field),
+                               reverse=direction < 0)
+
+        return documents
+
+    def invalidate(self, filter=None):
+        """Drop cached entries that may be affected by a write
+
+        Entries of the document id in `filter` are dropped, and all
+        non-id queries are dropped since they may match the written
+        document. Drop everything if `filter` is None or not by id.
+
+        """
+        self._queries.clear()
+
+        id_ = _id_of(filter)
+        ids = [id_] if id_ is not None else _ids_of(filter)
+        if ids is None:
+            self._by_id.clear()
+            return
+
+        for id_ in ids:
+            self._by_id.pop(id_, None)
+
+    def insert_one(self, document, *args, **kwargs):
+        self._queries.clear()
+        return self.database.insert_one(document, *args, **kwargs)
+
+    def insert_many(self, documents, *args, **kwargs):
+        self._queries.clear()
+        return self.database.insert_many(documents, *args, **kwargs)
+
+    def update_one(self, filter, update, *args, **kwargs):
+        self.invalidate(filter)
+        return self.database.update_one(filter, update, *args, **kwargs)
+
+    def update_many(self, filter, update, *args, **kwargs):
+        self.invalidate(filter)
+        return self.database.update_many(filter, update, *args, **kwargs)
+
+    def replace_one(self, filter, replacement, *args, **kwargs):
+        self.invalidate(filter)
+        return self.database.replace_one(filter, replacement, *args, **kwargs)
+
+    def delete_one(self, filter, *args, **kwargs):
+        self.invalidate(filter)
+        return self.database.delete_one(filter, *args, **kwargs)
+
+    def delete_many(self, filter, *args, **kwargs):
+        self.invalidate(filter)
+        return self.database.delete_many(filter, *args, **kwargs)
+
+
+def get_cache(context):
+    """Return the document cache of the publish context, create if needed
+    """
+    if CONTEXT_KEY not in context.data:
+        context.data[CONTEXT_KEY] = DocumentCache()
+    return context.data[CONTEXT_KEY]
@@ -0,0 +1,163 @@
+"""Compact publish dump file format
+
+Context, instance and extractor dumps for remote publish are written as
+zlib compressed BSON with a small header, which is a lot smaller and
+faster to encode/decode than indented JSON, and keeps `ObjectId` and
+`datetime` as they are. Sets and `sequences.FrameSet` are tagged and
+restored as they were. Other types that BSON can not hold are stored as
+`str()`, same as the JSON dump did.
+
+File layout:
+    MAGIC (6 bytes) + format version (1 byte) + zlib(BSON)
+
+`load` also reads plain JSON dumps, so dumps written before this format
+can still be published. Use `to_json` and `from_json` (or
+`reveries/scripts/convert_dump.py`) to convert for reading or editing.
+
+"""
+import sys
+import zlib
+import struct
+import datetime
+
+import bson
+from bson import json_util
+
+from .sequences import FrameSet
+
+
+MAGIC = b"RVDUMP"
+FORMAT_VERSION = 1
+
+EXTENSION = ".dump"
+
+COMPRESS_LEVEL = 1  # Speed over size
+
+_SET = "__set__"
+_FRAMESET = "__frameset__"
+
+# Decode datetime as naive UTC, same as BSON
+_json_options = json_util.JSONOptions(tz_aware=False)
+
+if sys.version_info[0] == 2:
+    _string_types = (str, unicode)  # noqa: F821
+    _integer_types = (int, long)  # noqa: F821
+else:
+    _string_types = (str,)
+    _integer_types = (int,)
+
+_native_types = (bool, float, type(None), bytes,
+                 bson.ObjectId, datetime.datetime) + _integer_types
+
+
+def _encode(value):
+    if isinstance(value, _string_types) or isinstance(value, _native_types):
+        return value
+    if isinstance(value, dict):
+        return dict((k if isinstance(k, _string_types) else str(k),
+                     _encode(v))
+                    for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return {_SET: [_encode(v) for v in value]}
+    if isinstance(value, FrameSet):
+        return {_FRAMESET: value.to_data()}
+    return str(value)
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if len(value) == 1 and _SET in value:
+            return set(_decode(v) for v in value[_SET])
+        if len(value) == 1 and _FRAMESET in value:
+            return FrameSet.from_data(value[_FRAMESET])
+        return dict((k, _decode(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+def _bson_encode(document):
+    if hasattr(bson, "encode"):
+        return bson.encode(document)
+    return bson.BSON.encode(document)
+
+
+def _bson_decode(data):
+    if hasattr(bson, "decode"):
+        return bson.decode(data)
+    return bson.BSON(data).decode()
+
+
+def is_compact(data):
+    """Is the dump content (bytes) in compact format ?"""
+    return data[:len(MAGIC)] == MAGIC
+
+
+def dumps(data):
+    """Encode dump data (dict) into bytes"""
+    body = _bson_encode(_encode(data))
+    return (MAGIC
+            + struct.pack("B", FORMAT_VERSION)
+            + zlib.compress(body, COMPRESS_LEVEL))
+
+
+def loads(data):
+    """Decode dump data from bytes, either compact or JSON"""
+    if not is_compact(data):
+        return _decode(json_util.loads(data.decode("utf-8"),
+                                       json_options=_json_options))
+
+    version = struct.unpack("B", data[len(MAGIC):len(MAGIC) + 1])[0]
+    if version != FORMAT_VERSION:
+        raise ValueError("Unsupported dump format version: %d" % version)
+
+    body = zlib.decompress(data[len(MAGIC) + 1:])
+    return _decode(_bson_decode(body))
+
+
+def dump(data, path):
+    """Write dump data to file in compact format"""
+    with open(path, "wb") as file:
+        file.write(dumps(data))
+
+
+def load(path):
+    """Read dump data from file, either compact or JSON"""
+    with open(path, "rb") as file:
+        return loads(file.read())
+
+
+def to_json(data):
+    """Return dump data as readable JSON string
+
+    `ObjectId` and `datetime` are written in MongoDB extended JSON, sets
+    are tagged, so `from_json` restores them.
+
+    """
+    return json_util.dumps(_encode(data),
+                           indent=4,
+                           sort_keys=True)
+
+
+def from_json(text):
+    """Return dump data from JSON string that was made by `to_json`"""
+    return _decode(json_util.loads(text, json_options=_json_options))
+
+
+def convert(src, dst, readable=False):
+    """Convert dump file between compact and JSON format
+
+    Arguments:
+        src (str): Dump file path, either format
+        dst (str): Output file path
+        readable (bool, optional): Write JSON if True, else compact
+
+    """
+    data = load(src)
+    if readable:
+        with open(dst, "w") as file:
+            file.write(to_json(data))
+    else:
+        dump(data, dst)
@@ -0,0 +1,157 @@
+"""EXR metadata index of render layer AOVs
+
+Channels, windows, compression and part layout of each AOV are read from
+one frame at publish time, saved as a sidecar file with representation
+files and summarized in representation data, so loaders do not need to
+open image files to learn them.
+
+Usage:
+    >> index = build(staging_dir, {"beauty": "beauty/beauty.%04d.exr"})
+    >> write(os.path.join(staging_dir, SIDECAR), index)
+    >> summary(index)["beauty"]["channels"]
+    ['A', 'B', 'G', 'R']
+
+"""
+import os
+import json
+import uuid
+
+from .sequences import SequenceIndex
+from .vendor import parse_exr_header as exrheader
+
+
+SIDECAR = "exrindex.json"
+FORMAT_VERSION = 1
+
+
+def _window(box):
+    return [box["xMin"], box["yMin"], box["xMax"], box["yMax"]]
+
+
+def describe(info):
+    """Return index entry of an EXR from `parse_exr_header.read_exr_info`"""
+    parts = list()
+    for header in info["parts"]:
+        channels = header.get("channels") or {}
+        pixel_types = dict(
+            (name, exrheader.EXR_ATTRIBUTES.PIXEL_TYPES[data["pixel_type"]]
+             if 0 <= data["pixel_type"] < 3 else "unknown")
+            for name, data in channels.items()
+        )
+        part = {
+            "channels": sorted(channels),
+            "pixelTypes": pixel_types,
+            "compression": header.get("compression"),
+        }
+        for key in ("dataWindow", "displayWindow"):
+            if header.get(key):
+                part[key] = _window(header[key])
+        for key in ("name", "type", "pixelAspectRatio"):
+            if header.get(key) is not None:
+                part[key] = header[key]
+        parts.append(part)
+
+    entry = dict(parts[0])
+    entry["parts"] = len(parts)
+    entry["deep"] = info["deep"]
+    entry["tiled"] = info["tiled"]
+    if len(parts) > 1:
+        entry["partHeaders"] = parts
+        entry["channels"] = sorted(set(name for part in parts
+                                       for name in part["channels"]))
+    return entry
+
+
+def build(root, patterns, workers=exrheader.WORKERS):
+    """Index EXR metadata of sequences under `root`
+
+    Each sequence is indexed from its first frame that exists on disk,
+    headers are read concurrently.
+
+    Arguments:
+        root (str): Stage dir that patterns are relative to
+        patterns (dict): {AOV name: fpattern}, non-EXR patterns are
+            skipped
+        workers (int, optional): Max concurrent header reads
+
+    Returns:
+        dict: {AOV name: entry}, AOV that has no frame or failed to read
+            is not in the index.
+
+    """
+    listing = SequenceIndex(root)
+    paths = dict()
+    for aov_name, fpattern in patterns.items():
+        if not fpattern.lower().endswith(".exr"):
+            continue
+        frames = listing.frames(fpattern)
+        if frames:
+            paths[aov_name] = os.path.join(root, fpattern % min(frames))
+
+    headers = exrheader.read_exr_headers(set(paths.values()),
+                                         workers=workers,
+                                         reader=exrheader.read_exr_info)
+    index = dict()
+    for aov_name, path in paths.items():
+        info = headers[path]
+        if not isinstance(info, Exception):
+            index[aov_name] = describe(info)
+
+    return index
+
+
+def summary(index):
+    """Return compact summary of index for representation data
+
+    Resolution is the size of display window, the data window (region
+    that has pixels, may be cropped or overscanned) is kept as is.
+
+    """
+    brief = dict()
+    for aov_name, entry in index.items():
+        data = {"channels": entry["channels"], "parts": entry["parts"]}
+        if "displayWindow" in entry:
+            x_min, y_min, x_max, y_max = entry["displayWindow"]
+            data["resolution"] = [x_max - x_min + 1, y_max - y_min + 1]
+        if "dataWindow" in entry:
+            data["dataWindow"] = entry["dataWindow"]
+        if entry["deep"]:
+            data["deep"] = True
+        brief[aov_name] = data
+    return brief
+
+
+def write(path, index):
+    """Write index sidecar file
+
+    Written to a uniquely named temp file and renamed into place, so
+    concurrent writers (e.g. progressive publish runs sharing one stage
+    dir) never leave a half-written or interleaved sidecar.
+
+    """
+    temp = "%s.%s.tmp" % (path, uuid.uuid4().hex)
+    try:
+        with open(temp, "w") as file:
+            json.dump({"version": FORMAT_VERSION, "index": index},
+                      file,
+                      separators=(",", ":"),
+                      sort_keys=True)
+        if os.name == "nt" and os.path.isfile(path):
+            os.remove(path)  # Windows can't rename onto
+        os.rename(temp, path)
+    except Exception:
+        if os.path.isfile(temp):
+            os.remove(temp)
+        raise
+
+
+def read(path):
+    """Read index sidecar file, return None if not exists or unsupported"""
+    try:
+        with open(path, "r") as file:
+            data = json.load(file)
+    except (IOError, ValueError):
+        return None
+    if data.get("version") != FORMAT_VERSION:
+        return None
+    return data["index"]
@@ -0,0 +1,107 @@
+"""Texture file pattern expansion on cached directory listings
+
+Expands file node patterns like Maya's `fileTexturePathResolver` does,
+without Maya, and lists each directory only once per expander. Texture
+file nodes often point into the same directory, so collecting a look
+lists that directory once instead of once per node.
+
+Supported tokens (case-insensitive):
+
+    <UDIM>: Mari UDIM tile, four digits (e.g. 1001)
+    <u>, <v>: ZBrush (0-based) or Mudbox (1-based) tile coordinates
+    <uvtile>: "u1_v1" style tile
+    <tile>: "_u1_v1" style tile
+    <f>: Frame number
+
+Usage:
+    >> expander = PatternExpander()
+    >> expander.find("/textures/body.<UDIM>.tx")
+    ['/textures/body.1001.tx', '/textures/body.1002.tx']
+
+"""
+import os
+import re
+
+from .sequences import SequenceIndex
+
+
+TOKENS = {
+    "<udim>": r"\d{4}",
+    "<u>": r"-?\d+",
+    "<v>": r"-?\d+",
+    "<uvtile>": r"u-?\d+_v-?\d+",
+    "<tile>": r"_u-?\d+_v-?\d+",
+    "<f>": r"-?\d+",
+}
+
+_TOKEN = re.compile("(%s)" % "|".join(re.escape(token) for token in TOKENS),
+                    re.IGNORECASE)
+
+# File names are case-insensitive on Windows
+_FLAGS = re.IGNORECASE if os.name == "nt" else 0
+
+
+def has_token(pattern):
+    """Return True if pattern contains any tile or frame token"""
+    return bool(_TOKEN.search(pattern))
+
+
+def to_regex(fname):
+    """Return compiled regex that matches file names of the pattern
+
+    Arguments:
+        fname (str): File name pattern, without dir
+
+    """
+    parts = list()
+    for index, part in enumerate(_TOKEN.split(fname)):
+        if index % 2:
+            parts.append(TOKENS[part.lower()])
+        else:
+            parts.append(re.escape(part))
+    return re.compile("".join(parts) + r"\Z", _FLAGS)
+
+
+class PatternExpander(object):
+    """Expand file patterns against cached directory listings
+
+    Each directory is listed at most once per expander, create a new one
+    (or `clear`) to see changes on disk.
+
+    Arguments:
+        index (SequenceIndex, optional): Listing cache to share, default a
+            new one
+
+    """
+
+    def __init__(self, index=None):
+        self.index = index or SequenceIndex("")
+        self._regexes = dict()
+
+    def clear(self):
+        self.index.clear()
+
+    def match(self, dir_path, fname):
+        """Return sorted file names in `dir_path` that match `fname`"""
+        regex = self._regexes.get(fname)
+        if regex is None:
+            regex = self._regexes[fname] = to_regex(fname)
+
+        return sorted(name for name in self.index.listdir(dir_path)
+                      if regex.match(name))
+
+    def find(self, pattern):
+        """Return sorted file paths of pattern found on disk
+
+        Arguments:
+            pattern (str): File path with tokens, e.g. from Maya's
+                `getFilePatternString`
+
+        Returns:
+            list: File paths, joined with pattern's dir as is
+
+        """
+        dir_path, fname = os.path.split(pattern)
+        sep = "/" if "/" in pattern else os.sep
+        return [dir_path + sep + name if dir_path else name
+                for name in self.match(dir_path, fname)]
@@ -0,0 +1,339 @@
+"""Persistent file content hash cache
+
+Content digests are stored in a local SQLite database, keyed by file's
+real path, size, modification time and inode. As long as the file stat
+still matches, the digest is returned without reading the file.
+
+One database file per project root, placed in local cache dir (default
+`~/.reveries/hashcache`, or `$REVERIES_HASH_CACHE_DIR`) instead of the
+project share, since SQLite locking is not reliable on network drives.
+
+Set `$REVERIES_HASH_CACHE` to "0" to disable.
+
+"""
+import os
+import time
+import atexit
+import hashlib
+import sqlite3
+import logging
+import threading
+
+
+log = logging.getLogger(__name__)
+
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".reveries", "hashcache")
+
+# Files modified within this many seconds are not cached, the file may
+# still being written and changed again without mtime moving forward.
+RACY_SECONDS = 2.0
+
+MAX_ENTRIES = 200000
+EVICT_INTERVAL = 256
+
+# Access time updates of cache hits are kept in memory and written in one
+# batch on `flush`, or once this many are pending.
+FLUSH_INTERVAL = 1024
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    algorithm TEXT NOT NULL,
+    digest BLOB NOT NULL,
+    atime REAL NOT NULL,
+    PRIMARY KEY (path, algorithm)
+);
+CREATE INDEX IF NOT EXISTS digests_atime ON digests (atime);
+"""
+
+
+def _stat_key(stat):
+    mtime_ns = getattr(stat, "st_mtime_ns", None)
+    if mtime_ns is None:
+        mtime_ns = int(stat.st_mtime * 1e9)
+    return stat.st_size, mtime_ns, stat.st_ino
+
+
+class HashCache(object):
+    """SQLite backed file digest cache with LRU eviction
+
+    Thread-safe, one connection is shared by all threads of the process.
+
+    Cache hits do not write to the database, their access time is kept
+    in memory until `flush` (or `close`), so LRU order on disk may lag
+    behind a little.
+
+    Arguments:
+        db_path (str): SQLite database file path
+        max_entries (int, optional): Entries to keep, least recently used
+            ones are evicted when exceeded.
+
+    """
+
+    def __init__(self, db_path, max_entries=MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._inserted = 0
+        self._touched = dict()  # {(path, algorithm): atime}
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.isdir(db_dir):
+            try:
+                os.makedirs(db_dir)
+            except OSError:
+                pass  # Race with other process
+
+        self._conn = sqlite3.connect(db_path,
+                                     timeout=30,
+                                     check_same_thread=False)
+        with self._lock:
+            try:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.DatabaseError:
+                pass
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._conn.commit()
+            self._conn.close()
+
+    def _flush(self):
+        if not self._touched:
+            return
+        self._conn.executemany(
+            "UPDATE digests SET atime=? WHERE path=? AND algorithm=?",
+            [(atime, path, algorithm)
+             for (path, algorithm), atime in self._touched.items()])
+        self._touched.clear()
+
+    def flush(self):
+        """Write pending access time updates of cache hits"""
+        with self._lock:
+            self._flush()
+            self._conn.commit()
+
+    def get(self, file_path, algorithm="sha512", stat=None):
+        """Return cached digest if the file is unchanged, else None
+
+        Arguments:
+            file_path (str): File path
+            algorithm (str, optional): Hash algorithm name
+            stat (os.stat_result, optional): Pre-fetched file stat
+
+        """
+        path = os.path.realpath(file_path)
+        stat = stat or os.stat(path)
+        size, mtime_ns, inode = _stat_key(stat)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, inode, digest FROM digests "
+                "WHERE path=? AND algorithm=?",
+                (path, algorithm)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            if tuple(row[:3]) != (size, mtime_ns, inode):
+                # File changed, drop stale entry
+                self._touched.pop((path, algorithm), None)
+                self._conn.execute(
+                    "DELETE FROM digests WHERE path=? AND algorithm=?",
+                    (path, algorithm))
+                self._conn.commit()
+                return None
+
+            self._touched[(path, algorithm)] = time.time()
+            if len(self._touched) >= FLUSH_INTERVAL:
+                self._flush()
+                self._conn.commit()
+
+        return bytes(row[3])
+
+    def put(self, file_path, digest, algorithm="sha512", stat=None):
+        """Store digest of file
+
+        The digest is not stored if the file was modified too recently to
+        be trusted, see `RACY_SECONDS`.
+
+        Arguments:
+            file_path (str): File path
+            digest (bytes): Raw digest of file content
+            algorithm (str, optional): Hash algorithm name
+            stat (os.stat_result, optional): File stat taken *before* the
+                file was read for hashing.
+
+        Returns:
+            bool: True if stored
+
+        """
+        path = os.path.realpath(file_path)
+        stat = stat or os.stat(path)
+
+        now = time.time()
+        if now - stat.st_mtime < RACY_SECONDS:
+            return False
+
+        size, mtime_ns, inode = _stat_key(stat)
+
+        with self._lock:
+            self._touched.pop((path, algorithm), None)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO digests "
+                "(path, size, mtime_ns, inode, algorithm, digest, atime) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, size, mtime_ns, inode, algorithm,
+                 sqlite3.Binary(digest), now))
+
+            self._inserted += 1
+            if self._inserted % EVICT_INTERVAL == 0:
+                self._evict()
+
+            self._conn.commit()
+
+        return True
+
+    def _evict(self):
+        self._flush()  # Evict by up-to-date access time
+        count = self._conn.execute(
+            "SELECT COUNT(*) FROM digests").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM digests WHERE rowid IN ("
+                "SELECT rowid FROM digests ORDER BY atime ASC LIMIT ?)",
+                (excess,))
+
+    def evict(self):
+        """Evict least recently used entries beyond `max_entries`"""
+        with self._lock:
+            self._evict()
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM digests")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM digests").fetchone()[0]
+
+
+_caches = dict()
+_caches_lock = threading.Lock()
+
+
+@atexit.register
+def _flush_all():
+    with _caches_lock:
+        caches = [cache for cache in _caches.values() if cache is not None]
+    for cache in caches:
+        try:
+            cache.flush()
+        except sqlite3.Error as e:
+            log.debug(e)
+
+
+def is_enabled():
+    return os.environ.get("REVERIES_HASH_CACHE", "1") != "0"
+
+
+def project_root_of(file_path):
+    """Return the project root that `file_path` is in, or None
+
+    Project root is `$AVALON_PROJECTS/{project}`.
+
+    """
+    projects = os.environ.get("AVALON_PROJECTS")
+    if not projects:
+        return None
+
+    projects = os.path.normcase(os.path.realpath(projects))
+    path = os.path.normcase(os.path.realpath(file_path))
+
+    if not path.startswith(projects + os.sep):
+        return None
+
+    project = path[len(projects) + 1:].split(os.sep, 1)[0]
+    return os.path.join(projects, project)
+
+
+def get_cache(file_path):
+    """Return the `HashCache` for the project root of `file_path`
+
+    Files outside of any project share one default cache.
+
+    Returns:
+        HashCache or None: None if cache disabled or not accessible
+
+    """
+    if not is_enabled():
+        return None
+
+    root = project_root_of(file_path)
+    if root is None:
+        name = "default"
+    else:
+        name = "%s_%s" % (os.path.basename(root),
+                          hashlib.sha1(root.encode("utf-8")).hexdigest()[:8])
+
+    with _caches_lock:
+        if name not in _caches:
+            cache_dir = os.environ.get("REVERIES_HASH_CACHE_DIR", CACHE_DIR)
+            db_path = os.path.join(cache_dir, name + ".sqlite")
+            try:
+                _caches[name] = HashCache(db_path)
+            except (OSError, sqlite3.Error) as e:
+                log.warning("Hash cache not available: %s" % e)
+                _caches[name] = None
+
+        return _caches[name]
+
+
+def cached_digest(file_path, compute, algorithm="sha512"):
+    """Return file digest from cache, or compute and store it
+
+    Arguments:
+        file_path (str): File path
+        compute (callable): Takes file path and returns raw digest bytes
+        algorithm (str, optional): Hash algorithm name
+
+    """
+    cache = get_cache(file_path)
+    if cache is None:
+        return compute(file_path)
+
+    stat = os.stat(file_path)
+    try:
+        digest = cache.get(file_path, algorithm, stat=stat)
+    except sqlite3.Error as e:
+        log.debug(e)
+        digest = None
+
+    if digest is not None:
+        return digest
+
+    digest = compute(file_path)
+
+    # Only store if the file was not changed while being read
+    if _stat_key(os.stat(file_path)) == _stat_key(stat):
+        try:
+            cache.put(file_path, digest, algorithm, stat=stat)
+        except sqlite3.Error as e:
+            log.debug(e)
+
+    return digest
@@ -0,0 +1,264 @@
+"""Index definitions for Avalon project collections
+
+Lists the compound indexes that Reveries' query shapes need, with
+functions to create or verify them, and to audit which query shapes would
+end up as collection scan.
+
+Usage:
+    >> from reveries import lib, indexes
+    >> collection = lib.project_collection()
+    >> indexes.verify(collection)
+    {'type_parent_name': 'ok', 'type_name': 'missing', ...}
+    >> indexes.ensure(collection)
+    ['type_name']
+    >> indexes.audit(collection)
+    []
+
+See `reveries/scripts/ensure_indexes.py` for command line usage.
+
+"""
+import logging
+
+
+log = logging.getLogger(__name__)
+
+
+ASCENDING = 1
+DESCENDING = -1
+
+OK = "ok"
+MISSING = "missing"
+MISMATCH = "mismatch"
+
+# Definition keys that are passed to `create_index`
+INDEX_OPTIONS = ("unique", "partialFilterExpression")
+
+
+INDEXES = [
+    {
+        "name": "type_parent_name",
+        "keys": [("type", ASCENDING),
+                 ("parent", ASCENDING),
+                 ("name", ASCENDING)],
+        "description": "Subset, version and representation by parent and "
+                       "name, and versions of subset sorted by name.",
+    },
+    {
+        "name": "parent_name",
+        "keys": [("parent", ASCENDING),
+                 ("name", ASCENDING)],
+        "description": "Children by parent and name without type.",
+    },
+    {
+        "name": "type_name",
+        "keys": [("type", ASCENDING),
+                 ("name", ASCENDING)],
+        "description": "Project and asset by name.",
+    },
+    # Unique subset and version per parent, so concurrent publishers that
+    # upsert the same (type, parent, name) can not insert it twice. Key
+    # orders differ from "type_parent_name" since the server does not take
+    # two indexes of the same keys.
+    {
+        "name": "unique_subset",
+        "keys": [("parent", ASCENDING),
+                 ("name", ASCENDING),
+                 ("type", ASCENDING)],
+        "unique": True,
+        "partialFilterExpression": {"type": "subset"},
+        "description": "One subset per asset and name.",
+    },
+    {
+        "name": "unique_version",
+        "keys": [("name", ASCENDING),
+                 ("parent", ASCENDING),
+                 ("type", ASCENDING)],
+        "unique": True,
+        "partialFilterExpression": {"type": "version"},
+        "description": "One version per subset and number.",
+    },
+    {
+        "name": "version_source_key",
+        "keys": [("type", ASCENDING),
+                 ("data.sourceKey", ASCENDING)],
+        "description": "Versions published from source file, see "
+                       "`reveries.utils.get_versions_from_sourcefile`.",
+    },
+]
+
+
+# Query shapes that Reveries runs, for audit. Values are placeholders.
+QUERY_SHAPES = [
+    ("asset by name",
+     {"type": "asset", "name": ""}, None),
+    ("subset by parent and name",
+     {"type": "subset", "parent": None, "name": ""}, None),
+    ("subsets of asset",
+     {"type": "subset", "parent": None}, None),
+    ("latest version of subset",
+     {"type": "version", "parent": None}, [("name", DESCENDING)]),
+    ("version by parent and name",
+     {"type": "version", "parent": None, "name": 0}, None),
+    ("representations of version",
+     {"type": "representation", "parent": None}, None),
+    ("representation by parent and name",
+     {"type": "representation", "parent": None, "name": ""}, None),
+    ("child by parent and name",
+     {"parent": None, "name": ""}, None),
+    ("versions from source file",
+     {"type": "version", "data.sourceKey": ""}, [("name", DESCENDING)]),
+]
+
+
+def get(name):
+    """Return index definition by name"""
+    for index in INDEXES:
+        if index["name"] == name:
+            return index
+    raise KeyError("Unknown index: %s" % name)
+
+
+def verify(collection, definitions=None):
+    """Return status of each index definition
+
+    Arguments:
+        collection: pymongo (or mongomock) collection
+        definitions (list, optional): Index definitions, default `INDEXES`
+
+    Returns:
+        dict: Index name to "ok", "missing" or "mismatch" (name exists but
+            keys differ)
+
+    """
+    existing = collection.index_information()
+    by_keys = dict((tuple(tuple(k) for k in info["key"]), name)
+                   for name, info in existing.items())
+
+    status = dict()
+    for index in definitions or INDEXES:
+        keys = tuple(tuple(k) for k in index["keys"])
+        if keys in by_keys:
+            status[index["name"]] = OK
+        elif index["name"] in existing:
+            status[index["name"]] = MISMATCH
+        else:
+            status[index["name"]] = MISSING
+
+    return status
+
+
+def ensure(collection, definitions=None, dry_run=False):
+    """Create missing indexes
+
+    Index with mismatched keys is reported but not dropped, drop it
+    manually if it's not used by anything else.
+
+    Arguments:
+        collection: pymongo (or mongomock) collection
+        definitions (list, optional): Index definitions, default `INDEXES`
+        dry_run (bool, optional): Only return indexes to create
+
+    Returns:
+        list: Names of created (or to be created) indexes
+
+    """
+    definitions = definitions or INDEXES
+    by_name = dict((index["name"], index) for index in definitions)
+    created = list()
+
+    for name, state in sorted(verify(collection, definitions).items()):
+        if state == MISMATCH:
+            log.warning("Index '%s' exists with different keys, skipped."
+                        % name)
+            continue
+        if state != MISSING:
+            continue
+
+        created.append(name)
+        if dry_run:
+            continue
+
+        index = by_name[name]
+        options = dict((key, index[key]) for key in INDEX_OPTIONS
+                       if key in index)
+        try:
+            collection.create_index(index["keys"],
+                                    name=name,
+                                    background=True,
+                                    **options)
+        except Exception as e:
+            # e.g. Duplicated documents exist for an unique index
+            log.error("Failed to create index '%s' on %s: %s"
+                      % (name, collection.name, e))
+            created.remove(name)
+            continue
+        log.info("Index '%s' created on %s." % (name, collection.name))
+
+    return created
+
+
+def _plan_stages(plan):
+    """Yield all stage names of an explained query plan"""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            for stage in _plan_stages(value):
+                yield stage
+    elif isinstance(plan, list):
+        for value in plan:
+            for stage in _plan_stages(value):
+                yield stage
+
+
+def _explain(collection, filter, sort):
+    """Return winning plan stages from server, None if not supported"""
+    cursor = collection.find(filter)
+    if sort:
+        cursor = cursor.sort(sort)
+    if not hasattr(cursor, "explain"):
+        return None  # e.g. mongomock
+    plan = cursor.explain()["queryPlanner"]["winningPlan"]
+    return set(_plan_stages(plan))
+
+
+def _static_plan(collection, filter):
+    """Estimate stages by index prefix, for servers that cannot explain
+
+    A query can use an index when the first key of that index is in the
+    filter, same as the server's planner would consider.
+
+    """
+    for info in collection.index_information().values():
+        keys = info["key"]
+        if keys and keys[0][0] in filter:
+            return set(["IXSCAN"])
+    return set(["COLLSCAN"])
+
+
+def audit(collection, shapes=None):
+    """Return query shapes that end up in collection scan
+
+    Query plan is taken from `explain()`. Collections that do not support
+    explain (mock) are checked by index key prefix instead.
+
+    Arguments:
+        collection: pymongo (or mongomock) collection
+        shapes (list, optional): (label, filter, sort) tuples, default
+            `QUERY_SHAPES`
+
+    Returns:
+        list: Labels of query shapes that scan the whole collection
+
+    """
+    scans = list()
+    for label, filter, sort in shapes or QUERY_SHAPES:
+        stages = _explain(collection, filter, sort)
+        if stages is None:
+            stages = _static_plan(collection, filter)
+
+        if "COLLSCAN" in stages:
+            log.warning("Query '%s' is a collection scan." % label)
+            scans.append(label)
+
+    return scans
@@ -0,0 +1,245 @@
+"""Render sequence integrity check
+
+Checks frames of whole sequences concurrently before they get published:
+
+    missing: Frame not on disk
+    empty: Zero size file
+    small: Much smaller than neighbour frames, may be truncated (size
+        heuristic, only a warning unless checked strictly)
+    corrupted: EXR chunk offset table points outside the file, or the
+        last chunk is cut short (see `parse_exr_header.check_exr_chunks`)
+
+Existence is answered from directory listings (`sequences.SequenceIndex`),
+size and EXR structure are checked by a thread pool, one small read per
+frame.
+
+Usage:
+    >> report = verify(root, {"beauty": "beauty/beauty.%04d.exr"},
+    ..                 start=1001, end=1100)
+    >> report["beauty"]["corrupted"]
+    {1050: 'last chunk truncated'}
+    >> is_ok(report)
+    False
+
+"""
+import os
+from multiprocessing.pool import ThreadPool
+
+from .sequences import SequenceIndex
+from .vendor import parse_exr_header as exrheader
+
+
+WORKERS = 16
+
+# Frame smaller than this ratio of its neighbours' median size is flagged
+SMALL_RATIO = 0.5
+# Number of neighbours on each side to compare size with
+NEIGHBOURS = 4
+
+
+def inspect(path, check_exr=True):
+    """Return (size, problem) of one file
+
+    Returns:
+        tuple: (size or None, problem str or None), problem is one of
+            "missing", "empty" or the EXR corruption description
+
+    """
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return None, "missing"
+    if not size:
+        return 0, "empty"
+
+    if check_exr and path.lower().endswith(".exr"):
+        try:
+            problem = exrheader.check_exr_chunks(path)
+        except (IOError, OSError) as e:
+            problem = "read failed: %s" % e
+        if problem:
+            return size, problem
+
+    return size, None
+
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+def small_frames(sizes, ratio=SMALL_RATIO, neighbours=NEIGHBOURS):
+    """Return frames that are much smaller than their neighbours
+
+    Arguments:
+        sizes (dict): {frame: size}
+        ratio (float, optional): Flag frame smaller than `ratio` x median
+            size of neighbours
+        neighbours (int, optional): Neighbours on each side
+
+    Returns:
+        list: Sorted frame numbers
+
+    """
+    frames = sorted(sizes)
+    flagged = list()
+    for index, frame in enumerate(frames):
+        around = (frames[max(0, index - neighbours):index]
+                  + frames[index + 1:index + 1 + neighbours])
+        if len(around) < 2:
+            continue
+        median = _median([sizes[f] for f in around])
+        if sizes[frame] < median * ratio:
+            flagged.append(frame)
+    return flagged
+
+
+def check_files(paths, workers=WORKERS, check_exr=True):
+    """Check files concurrently
+
+    Arguments:
+        paths (iterable): File paths
+        workers (int, optional): Max concurrent checks
+        check_exr (bool, optional): Check EXR chunk offsets
+
+    Returns:
+        dict: {path: (size, problem)}
+
+    """
+    paths = list(paths)
+    if not paths:
+        return dict()
+
+    def check(path):
+        return path, inspect(path, check_exr)
+
+    pool = ThreadPool(min(workers, len(paths)))
+    try:
+        return dict(pool.map(check, paths, chunksize=16))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def verify(root,
+           patterns,
+           start,
+           end,
+           step=1,
+           workers=WORKERS,
+           check_exr=True,
+           ratio=SMALL_RATIO):
+    """Verify frame sequences
+
+    Arguments:
+        root (str): Dir that patterns are relative to
+        patterns (dict): {key: fpattern}, e.g. AOV name to pattern
+        start (int): Expected start frame
+        end (int): Expected end frame, inclusive
+        step (int, optional): Expected frame step
+        workers (int, optional): Max concurrent checks
+        check_exr (bool, optional): Check EXR chunk offsets
+        ratio (float, optional): See `small_frames`
+
+    Returns:
+        dict: {key: {
+            "present": [frames],
+            "missing": [frames],
+            "empty": [frames],
+            "small": [frames],
+            "corrupted": {frame: problem},
+        }}
+
+    """
+    listing = SequenceIndex(root)
+    presence = listing.report(patterns, start, end, step)
+
+    jobs = dict()
+    for key, fpattern in patterns.items():
+        for frame in presence[key]["present"]:
+            jobs[os.path.join(root, fpattern % frame)] = (key, frame)
+
+    results = check_files(jobs, workers=workers, check_exr=check_exr)
+
+    report = dict()
+    sizes = dict()
+    for key in patterns:
+        report[key] = {
+            "present": presence[key]["present"],
+            "missing": presence[key]["missing"],
+            "empty": list(),
+            "small": list(),
+            "corrupted": dict(),
+        }
+        sizes[key] = dict()
+
+    for path, (size, problem) in results.items():
+        key, frame = jobs[path]
+        entry = report[key]
+        if problem == "missing":
+            # Removed after listed
+            entry["present"].remove(frame)
+            entry["missing"].append(frame)
+        elif problem == "empty":
+            entry["empty"].append(frame)
+        elif problem:
+            entry["corrupted"][frame] = problem
+        else:
+            sizes[key][frame] = size
+
+    for key, entry in report.items():
+        entry["missing"].sort()
+        entry["empty"].sort()
+        entry["small"] = small_frames(sizes[key], ratio=ratio)
+
+    return report
+
+
+def bad_frames(entry, strict=False):
+    """Return sorted frames that are present but not usable
+
+    Arguments:
+        entry (dict): Sequence entry of `verify` report
+        strict (bool, optional): Count small frames as bad
+
+    """
+    bad = set(entry["empty"]) | set(entry["corrupted"])
+    if strict:
+        bad.update(entry["small"])
+    return sorted(bad)
+
+
+def is_ok(report, allow_missing=False, strict=False):
+    """Is every sequence in report complete and intact ?"""
+    for entry in report.values():
+        if bad_frames(entry, strict=strict):
+            return False
+        if entry["missing"] and not allow_missing:
+            return False
+    return True
+
+
+def format_report(report, fpatterns=None, strict=False):
+    """Return report as readable lines"""
+    lines = list()
+    for key in sorted(report, key=str):
+        entry = report[key]
+        name = fpatterns[key] if fpatterns else key
+        if not is_ok({key: entry}, strict=strict):
+            status = "FAILED"
+        elif entry["small"]:
+            status = "WARNING"
+        else:
+            status = "OK"
+        lines.append("%s: %s (%d present)"
+                     % (name, status, len(entry["present"])))
+        for field in ("missing", "empty", "small"):
+            if entry[field]:
+                lines.append("    %s: %s" % (field, entry[field]))
+        for frame in sorted(entry["corrupted"]):
+            lines.append("    corrupted: %d (%s)"
+                         % (frame, entry["corrupted"][frame]))
+    return lines
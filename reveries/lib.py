@@ -199,21 +199,34 @@ def get_deadline_pools():
     return pools
 
 
-def is_latest(representation):
+def project_collection():
+    """Return pymongo collection of current Avalon project
+
+    For operations that `avalon.io` does not wrap, e.g. `bulk_write` and
+    `aggregate`.
+
+    """
+    return avalon.io._database[avalon.api.Session["AVALON_PROJECT"]]
+
+
+def is_latest(representation, cache=None):
     """Return whether the representation is from latest version
 
     Args:
         representation (dict): The representation document from the database.
+        cache (DocumentCache, optional): Query through this cache if given,
+            see `reveries.doccache`.
 
     Returns:
         bool: Whether the representation is of latest version.
 
     """
+    database = cache or avalon.io
 
-    version = avalon.io.find_one({"_id": representation['parent']})
+    version = database.find_one({"_id": representation['parent']})
 
     # Get highest version under the parent
-    highest_version = avalon.io.find_one({
+    highest_version = database.find_one({
         "type": "version",
         "parent": version["parent"]
     }, sort=[("name", -1)], projection={"name": True})
@@ -224,30 +237,77 @@ def is_latest(representation):
         return False
 
 
-def any_outdated():
-    """Return whether the current scene has any outdated content"""
+def version_status(representation_ids):
+    """Return version status of many representations in three queries
 
-    checked = set()
-    host = avalon.api.registered_host()
-    for container in host.ls():
-        representation = avalon.io.ObjectId(container["representation"])
-        if representation in checked:
+    Representations and their versions are fetched with one `$in` query
+    each, and the latest version name of each subset is found by one
+    aggregation.
+
+    Args:
+        representation_ids (list): Representation ids (str or ObjectId)
+
+    Returns:
+        dict: {ObjectId: {"current": int, "latest": int, "missing": bool}},
+            "current" and "latest" are None if missing in database.
+
+    """
+    ids = list(set(avalon.io.ObjectId(id_) for id_ in representation_ids))
+    status = dict((id_, {"current": None, "latest": None, "missing": True})
+                  for id_ in ids)
+    if not ids:
+        return status
+
+    representations = list(avalon.io.find(
+        {"_id": {"$in": ids}, "type": "representation"},
+        projection={"parent": True}
+    ))
+    version_ids = list(set(doc["parent"] for doc in representations))
+
+    versions = dict((doc["_id"], doc) for doc in avalon.io.find(
+        {"_id": {"$in": version_ids}, "type": "version"},
+        projection={"name": True, "parent": True}
+    ))
+    subset_ids = list(set(doc["parent"] for doc in versions.values()))
+
+    latest = dict()
+    if subset_ids:
+        pipeline = [
+            {"$match": {"type": "version", "parent": {"$in": subset_ids}}},
+            {"$group": {"_id": "$parent", "latest": {"$max": "$name"}}},
+        ]
+        for doc in project_collection().aggregate(pipeline):
+            latest[doc["_id"]] = doc["latest"]
+
+    for representation in representations:
+        version = versions.get(representation["parent"])
+        if version is None:
             continue
+        status[representation["_id"]] = {
+            "current": version["name"],
+            "latest": latest.get(version["parent"], version["name"]),
+            "missing": False,
+        }
 
-        representation_doc = avalon.io.find_one(
-            {"_id": representation, "type": "representation"},
-            projection={"parent": True}
-        )
+    return status
 
-        if representation_doc and not is_latest(representation_doc):
-            return True
 
-        elif not representation_doc:
+def any_outdated():
+    """Return whether the current scene has any outdated content"""
+
+    host = avalon.api.registered_host()
+    containers = list(host.ls())
+    status = version_status([c["representation"] for c in containers])
+
+    for container in containers:
+        result = status[avalon.io.ObjectId(container["representation"])]
+        if result["missing"]:
             log.debug("Container '{objectName}' has an invalid "
                       "representation, it is missing in the "
                       "database".format(**container))
 
-        checked.add(representation)
+        elif result["current"] < result["latest"]:
+            return True
 
     return False
 
@@ -0,0 +1,221 @@
+"""Per-version manifest of progressively integrated files
+
+Progressive publish integrates a render version frame by frame, from
+many processes on different machines. Instead of asking the file server
+whether each destination file exists, every integration run records the
+files it integrated (with source size and mtime) and its progress step
+in the version's manifest, and later runs answer "is it integrated" and
+"how many frames are done" from the manifest.
+
+The manifest is a dir (`.manifest`) in version dir, each run writes one
+segment file atomically and never modifies others, so concurrent writers
+never conflict. Segments are applied in name (time) order.
+
+Usage:
+    >> manifest = FrameManifest(version_dir).load()
+    >> manifest.outdated(candidates)  # integrated files of these dsts
+    >> manifest.record(dst, src)
+    >> manifest.commit(step=10)
+    >> manifest.progress()
+    120
+
+"""
+import os
+import json
+import time
+import uuid
+import errno
+import socket
+
+
+DIRNAME = ".manifest"
+SUFFIX = ".segment"
+
+
+def _stat_key(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime]
+
+
+class FrameManifest(object):
+    """Integrated files and progress steps of one version
+
+    Arguments:
+        version_dir (str): Version dir path
+
+    """
+
+    def __init__(self, version_dir):
+        self.version_dir = os.path.normpath(version_dir)
+        self.path = os.path.join(self.version_dir, DIRNAME)
+
+        self.files = dict()  # Relative dst: [src size, src mtime]
+        self.steps = dict()  # Run id: progress step
+
+        self._files = dict()
+        self._removed = set()
+
+    def relpath(self, dst):
+        """Return manifest key of a destination path"""
+        path = os.path.relpath(os.path.normpath(dst), self.version_dir)
+        return path.replace("\\", "/")
+
+    def __contains__(self, dst):
+        return self.relpath(dst) in self.files
+
+    def __len__(self):
+        return len(self.files)
+
+    def _apply(self, segment):
+        for key in segment.get("removed", []):
+            self.files.pop(key, None)
+        self.files.update(segment.get("files", {}))
+        if segment.get("step"):
+            self.steps[segment["run"]] = segment["step"]
+
+    def load(self):
+        """Read all segments, return self"""
+        self.files.clear()
+        self.steps.clear()
+
+        try:
+            names = sorted(os.listdir(self.path))
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            return self
+
+        for name in names:
+            if not name.endswith(SUFFIX):
+                continue
+            try:
+                with open(os.path.join(self.path, name), "r") as file:
+                    self._apply(json.load(file))
+            except (IOError, ValueError):
+                continue  # Removed or being written
+
+        return self
+
+    def progress(self):
+        """Return progress, sum of steps of all runs"""
+        return sum(self.steps.values())
+
+    def integrated(self, dsts):
+        """Return destinations in `dsts` that have been integrated"""
+        return set(dst for dst in dsts if dst in self)
+
+    def outdated(self, transfers):
+        """Return integrated destinations that their source has changed
+
+        Arguments:
+            transfers (list): (src, dst) pairs
+
+        """
+        outdated = set()
+        for src, dst in transfers:
+            entry = self.files.get(self.relpath(dst))
+            if entry is None:
+                continue
+            try:
+                if _stat_key(src) != list(entry):
+                    outdated.add(dst)
+            except OSError:
+                outdated.add(dst)
+        return outdated
+
+    def record(self, dst, src):
+        """Record one integrated file, written on `commit`"""
+        self._files[self.relpath(dst)] = _stat_key(src)
+
+    def remove(self, dsts):
+        """Record files that have been removed, written on `commit`"""
+        for dst in dsts:
+            key = self.relpath(dst)
+            self._removed.add(key)
+            self._files.pop(key, None)
+
+    def commit(self, step=0):
+        """Write recorded changes as one segment
+
+        Arguments:
+            step (int, optional): Progress step of this run
+
+        Returns:
+            str or None: Segment path, None if nothing to write
+
+        """
+        if not (self._files or self._removed or step):
+            return None
+
+        segment = {
+            "run": "%s-%d-%s" % (socket.gethostname(),
+                                 os.getpid(),
+                                 uuid.uuid4().hex),
+            "time": time.time(),
+            "step": step,
+            "files": self._files,
+            "removed": sorted(self._removed),
+        }
+
+        try:
+            os.makedirs(self.path)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+        name = "%017.6f-%s%s" % (segment["time"], segment["run"], SUFFIX)
+        path = os.path.join(self.path, name)
+        temp = os.path.join(self.path, "." + name)
+        with open(temp, "w") as file:
+            json.dump(segment, file)
+        os.rename(temp, path)
+
+        self._apply(segment)
+        self._files = dict()
+        self._removed = set()
+
+        return path
+
+    def rebuild(self, step=None):
+        """Rebuild manifest from files in version dir
+
+        All existing segments are replaced by one segment that lists the
+        files on disk. Since files on disk do not tell the progress, the
+        current progress is carried over unless `step` is given.
+
+        Arguments:
+            step (int, optional): Progress of the rebuilt manifest
+
+        Returns:
+            str or None: Segment path
+
+        """
+        if step is None:
+            step = self.load().progress()
+
+        old = list()
+        if os.path.isdir(self.path):
+            old = [os.path.join(self.path, name)
+                   for name in os.listdir(self.path)]
+
+        self._files = dict()
+        self._removed = set()
+        for dir_path, dir_names, file_names in os.walk(self.version_dir):
+            dir_names[:] = [d for d in dir_names if not d.startswith(".")]
+            for name in file_names:
+                if name.startswith("."):
+                    continue
+                path = os.path.join(dir_path, name)
+                self._files[self.relpath(path)] = _stat_key(path)
+
+        self.files.clear()
+        self.steps.clear()
+        path = self.commit(step=step)
+
+        for segment in old:
+            try:
+                os.remove(segment)
+            except OSError:
+                pass
+
+        return path
@@ -6,10 +6,7 @@ import itertools
 from collections import defaultdict
 from maya import cmds, mel
 from maya.api import OpenMaya as om
-from maya.app.general.fileTexturePathResolver import (
-    getFilePatternString,
-    findAllFilesForPattern,
-)
+from maya.app.general.fileTexturePathResolver import getFilePatternString
 
 from avalon import io
 
@@ -17,6 +14,7 @@ from .. import lib
 from ..vendor.six import string_types, moves as six_moves
 from .vendor import capture
 from ..utils import get_representation_path_
+from ..filepattern import PatternExpander
 
 
 log = logging.getLogger(__name__)
@@ -2165,6 +2163,9 @@ def profiling_file_nodes(file_nodes):
     file_data = list()
     file_count = 0
 
+    # Texture dirs are listed once for all nodes
+    expander = PatternExpander()
+
     for file_node in file_nodes:
 
         color_space = cmds.getAttr(file_node + ".colorSpace")
@@ -2190,8 +2191,7 @@ def profiling_file_nodes(file_nodes):
                                            is_sequence,
                                            tiling_mode)
             all_files = [
-                os.path.basename(fpath) for fpath in
-                findAllFilesForPattern(pattern, frameNumber=None)
+                os.path.basename(fpath) for fpath in expander.find(pattern)
             ]
 
         if not all_files:
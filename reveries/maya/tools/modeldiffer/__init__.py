@@ -6,6 +6,7 @@ from maya import cmds
 from avalon import style
 from avalon.tools import lib
 from avalon.vendor.Qt import QtWidgets
+from .... import meshhash
 from ....maya import utils
 from ....tools.modeldiffer import app
 
@@ -47,16 +48,13 @@ def show():
         module.window = window
 
 
-_hasher = utils.MeshHasher()
+def _hash(mesh, version=meshhash.DIGEST_VERSION):
+    hasher = utils.MeshHasher(version=version)
+    hasher.set_mesh(mesh)
+    hasher.update_points()
+    hasher.update_uvmap()
 
-
-def _hash(mesh):
-    _hasher.clear()
-    _hasher.set_mesh(mesh)
-    _hasher.update_points()
-    _hasher.update_uvmap()
-
-    return _hasher.digest()
+    return hasher.digest()
 
 
 def profile_from_host(container=None):
@@ -105,6 +103,9 @@ def profile_from_host(container=None):
             "uvmap": None,
         }
         data.update(_hash(mesh))
+        # For comparing with profiles published before current digest
+        # version.
+        data["legacy"] = _hash(mesh, version=meshhash.LEGACY_VERSION)
 
         profile[name] = data
 
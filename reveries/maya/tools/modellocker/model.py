@@ -6,6 +6,7 @@ from avalon.vendor import qtawesome
 from avalon.vendor.Qt import QtCore, QtGui
 from avalon import io, api
 from ... import utils
+from .... import modelprofile
 
 
 class SelectionModel(models.TreeModel):
@@ -53,18 +54,7 @@ class SelectionModel(models.TreeModel):
             # Is latest version loaded ?
             is_latest = latest["name"] == version["name"]
 
-            versions = io.find({"type": "version", "parent": subset_id},
-                               sort=[("name", -1)])
-            for version in versions:
-                repr = io.find_one({"type": "representation",
-                                    "parent": version["_id"],
-                                    "name": "mayaBinary"})
-
-                protected = repr["data"].get("modelProtected")
-                if protected is not None:
-                    # Get protected list from previous version if not found
-                    break
-            protected = protected or set()
+            _, protected = modelprofile.protected_ids(subset_id)
 
             namespace = container["namespace"]
             subset_group = container["subsetGroup"]
@@ -177,5 +167,6 @@ class SelectionModel(models.TreeModel):
                     # Set to Lock
                     protected.add(node["avalonId"])
 
-            io.update_many({"_id": latest_repr["_id"]},
-                           {"$set": {"data.modelProtected": list(protected)}})
+            modelprofile.set_protected(item["subsetId"],
+                                       latest_repr["parent"],
+                                       protected)
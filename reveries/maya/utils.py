@@ -19,9 +19,9 @@ import avalon_sftpc
 from maya import cmds, mel
 from maya.api import OpenMaya as om
 
-from .. import lib as reveries_lib
+from .. import lib as reveries_lib, meshhash
 from ..vendor import six
-from ..utils import _C4Hasher, get_representation_path_
+from ..utils import get_representation_path_
 from .pipeline import (
     find_stray_textures,
     env_embedded_path,
@@ -242,26 +242,6 @@ def fix_texture_file_nodes(nodes=lib._no_val, file_path=None, dry_run=False):
 #       implement __eq__ to compare files
 
 
-def _hash_MPoint(x, y, z, w):
-    x = (x + 1) * 233
-    y = (y + x) * 239
-    z = (z + y) * 241
-    return (x + y + z) * w
-
-
-def _hash_MFloatVectors(x, y, z):
-    x = (x + 1) * 383
-    y = (y + x) * 389
-    z = (z + y) * 397
-    return x + y + z
-
-
-def _hash_UV(u, v):
-    u = (u + 1) * 547
-    v = (v + u) * 557
-    return u * v
-
-
 class MeshHasher(object):
     """A mesh geometry hasher for Maya
 
@@ -270,6 +250,9 @@ class MeshHasher(object):
 
     Order matters, transform does not.
 
+    Mesh data is read into contiguous buffers and hashed in bulk by
+    `reveries.meshhash.ArrayMeshHasher`.
+
     Example Usage:
         >> hasher = MeshHasher()
         >> hasher.set_mesh("path|to|mesh")
@@ -277,7 +260,8 @@ class MeshHasher(object):
         >> hasher.update_normals()
         >> hasher.update_uvmap()
         >> hasher.digest()
-        {'normals': 'c41MSCnAGqWS9dBDDpydbpcMwzzFkGH66jNpuTqctfY...',
+        {'hashVersion': 2,
+         'normals': 'c41MSCnAGqWS9dBDDpydbpcMwzzFkGH66jNpuTqctfY...',
          'points': 'c44fV5wa6bNiekUadZ4HsRPDL2HZ11RFKcXhf3pntsUJ...',
          'uvmap': 'c45JRQTPxgMNYfcijAbm31vkJRt6CUUSn7ew2X1Mnyjwi...'}
 
@@ -288,22 +272,33 @@ class MeshHasher(object):
         ...    hasher.update_normals()
         ...
         >> hasher.digest()
-        {'normals': 'c456rBNH5pzobqjHzFnHApanrTdJo64r2R8o4GJxqU9G...',
+        {'hashVersion': 2,
+         'normals': 'c456rBNH5pzobqjHzFnHApanrTdJo64r2R8o4GJxqU9G...',
          'points': 'c449wXhjNSSKfnUjPp2ub3fd1DeNowW2x5gBJDYrSvxrT...'}
 
         You can still adding more meshes until you call `clear`
         >> hasher.clear()
 
+        For comparing with profile that was hashed in older version
+        >> hasher = MeshHasher(version=meshhash.digest_version(profile))
+
+    Arguments:
+        version (int, optional): Digest version, default is
+            `reveries.meshhash.DIGEST_VERSION`
+
     """
 
-    def __init__(self):
+    def __init__(self, version=meshhash.DIGEST_VERSION):
+        self._hasher = meshhash.ArrayMeshHasher(version)
         self.clear()
 
+    @property
+    def version(self):
+        return self._hasher.version
+
     def clear(self):
         self._mesh = None
-        self._points = 0
-        self._normals = 0
-        self._uvmap = 0
+        self._hasher.clear()
 
     def set_mesh(self, dag_path):
         """Set one mesh geometry node to hasher
@@ -318,37 +313,27 @@ class MeshHasher(object):
         self._mesh = om.MFnMesh(sel_obj)
 
     def update_points(self):
-        for i, vt in enumerate(self._mesh.getPoints()):
-            self._points += _hash_MPoint(*vt) + i
+        points = self._mesh.getPoints()
+        if meshhash.numpy is not None:
+            points = meshhash.numpy.array(points, dtype="float64")
+        else:
+            points = [(p.x, p.y, p.z, p.w) for p in points]
+        self._hasher.update_points(points)
 
     def update_normals(self):
-        for i, vt in enumerate(self._mesh.getNormals()):
-            self._normals += _hash_MFloatVectors(*vt) + i
+        normals = self._mesh.getNormals()
+        if meshhash.numpy is not None:
+            normals = meshhash.numpy.array(normals, dtype="float64")
+        else:
+            normals = [(n.x, n.y, n.z) for n in normals]
+        self._hasher.update_normals(normals)
 
     def update_uvmap(self, uv_set=""):
-        for i, uv in enumerate(zip(*self._mesh.getUVs(uv_set))):
-            self._uvmap += _hash_UV(*uv) + i
+        u_values, v_values = self._mesh.getUVs(uv_set)
+        self._hasher.update_uvmap(u_values, v_values)
 
     def digest(self):
-        result = dict()
-        hasher = _C4Hasher()
-
-        if self._points:
-            hasher.hash_obj.update(str(self._points))
-            result["points"] = hasher.digest()
-            hasher.clear()
-
-        if self._normals:
-            hasher.hash_obj.update(str(self._normals))
-            result["normals"] = hasher.digest()
-            hasher.clear()
-
-        if self._uvmap:
-            hasher.hash_obj.update(str(self._uvmap))
-            result["uvmap"] = hasher.digest()
-            hasher.clear()
-
-        return result
+        return self._hasher.digest()
 
 
 def remove_unused_plugins():
@@ -0,0 +1,269 @@
+"""Mesh geometry hashing on plain arrays
+
+Host independent part of `reveries.maya.utils.MeshHasher`, takes vertex
+positions, normals and UVs as contiguous buffers (or any nested sequence)
+and hashes them in bulk with NumPy if available.
+
+Digest versions:
+    1: Legacy arithmetic sum of per-vertex values, stringified then hashed.
+       Kept for comparing with profiles that were published before version
+       2. Collides easily, do not use for new data.
+    2: SHA-512 of little-endian float64 components with element count,
+       encoded as C4 ID.
+
+Version 2 digests carry `hashVersion` key, version 1 digests don't.
+
+"""
+import sys
+import array
+import struct
+import hashlib
+
+from .utils import _C4Hasher
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+DIGEST_VERSION = 2
+LEGACY_VERSION = 1
+
+CHANNELS = ("points", "normals", "uvmap")
+
+
+def digest_version(digest):
+    """Return digest version of a hashed result (e.g. model profile entry)
+    """
+    return digest.get("hashVersion", LEGACY_VERSION)
+
+
+def _to_rows(values, width, fill=None):
+    """Return values as (N, width) float64 array or list of tuples
+
+    Flat buffer is read with stride `width`. If rows are one component
+    short and `fill` is given, it's appended as the last component.
+
+    """
+    if numpy is not None:
+        arr = numpy.asarray(values, dtype=numpy.float64)
+        if arr.ndim == 1:
+            stride = width if fill is None else width - 1
+            arr = arr.reshape(-1, stride)
+        if fill is not None and arr.shape[1] == width - 1:
+            arr = numpy.column_stack([arr, numpy.full(len(arr), fill)])
+        return arr[:, :width]
+
+    rows = list(values)
+    if rows and not hasattr(rows[0], "__len__"):
+        stride = width if fill is None else width - 1
+        rows = list(zip(*[iter(rows)] * stride))
+    if fill is not None:
+        rows = [tuple(row) + (fill,) if len(row) == width - 1 else row
+                for row in rows]
+    return [tuple(float(v) for v in row[:width]) for row in rows]
+
+
+def _to_bytes(rows):
+    """Pack rows into little-endian float64 bytes, -0.0 packs as 0.0"""
+    if numpy is not None:
+        return (rows + 0.0).astype("<f8").tobytes()
+
+    buf = array.array("d", (v + 0.0 for row in rows for v in row))
+    if sys.byteorder == "big":
+        buf.byteswap()
+    return buf.tostring() if sys.version_info[0] == 2 else buf.tobytes()
+
+
+def _legacy_accumulate(start, terms):
+    """Sum `terms` onto `start` in sequence, same as Python `+=` loop"""
+    if numpy is not None:
+        if not len(terms):
+            return start
+        seq = numpy.concatenate([[start], terms + numpy.arange(len(terms))])
+        return float(numpy.cumsum(seq)[-1])
+
+    for i, term in enumerate(terms):
+        start += term + i
+    return start
+
+
+def _legacy_points(rows):
+    if numpy is not None:
+        x, y, z, w = rows[:, 0], rows[:, 1], rows[:, 2], rows[:, 3]
+        x = (x + 1) * 233
+        y = (y + x) * 239
+        z = (z + y) * 241
+        return (x + y + z) * w
+
+    terms = list()
+    for x, y, z, w in rows:
+        x = (x + 1) * 233
+        y = (y + x) * 239
+        z = (z + y) * 241
+        terms.append((x + y + z) * w)
+    return terms
+
+
+def _legacy_normals(rows):
+    if numpy is not None:
+        x, y, z = rows[:, 0], rows[:, 1], rows[:, 2]
+        x = (x + 1) * 383
+        y = (y + x) * 389
+        z = (z + y) * 397
+        return x + y + z
+
+    terms = list()
+    for x, y, z in rows:
+        x = (x + 1) * 383
+        y = (y + x) * 389
+        z = (z + y) * 397
+        terms.append(x + y + z)
+    return terms
+
+
+def _legacy_uvmap(rows):
+    if numpy is not None:
+        u, v = rows[:, 0], rows[:, 1]
+        u = (u + 1) * 547
+        v = (v + u) * 557
+        return u * v
+
+    terms = list()
+    for u, v in rows:
+        u = (u + 1) * 547
+        v = (v + u) * 557
+        terms.append(u * v)
+    return terms
+
+
+class ArrayMeshHasher(object):
+    """Mesh hasher that works on plain arrays
+
+    Order matters, transform does not.
+
+    Example Usage:
+        >> hasher = ArrayMeshHasher()
+        >> hasher.update_points([(0, 0, 0), (1, 0, 0), (0, 1, 0)])
+        >> hasher.update_uvmap([0, 1, 0], [0, 0, 1])
+        >> hasher.digest()
+        {'hashVersion': 2,
+         'points': 'c43xKqFZ1R6Ud3tkNDrJXuhi3mc5ch9hNFzXNnRDqM...',
+         'uvmap': 'c45e2kBMStkCjnHSY5YzLSb2A63xYfPZKLQcaSwCUK...'}
+
+    Arguments:
+        version (int, optional): Digest version, default `DIGEST_VERSION`
+
+    """
+
+    def __init__(self, version=DIGEST_VERSION):
+        if version not in (LEGACY_VERSION, DIGEST_VERSION):
+            raise ValueError("Unknown mesh digest version: %r" % version)
+        self.version = version
+        self.clear()
+
+    def clear(self):
+        self._hash_objs = dict()
+        self._sums = dict((channel, 0) for channel in CHANNELS)
+
+    def _update(self, channel, rows, legacy):
+        if self.version == LEGACY_VERSION:
+            terms = legacy(rows)
+            self._sums[channel] = _legacy_accumulate(self._sums[channel],
+                                                     terms)
+            return
+
+        if not len(rows):
+            return
+
+        if channel not in self._hash_objs:
+            self._hash_objs[channel] = hashlib.sha512()
+        hash_obj = self._hash_objs[channel]
+        hash_obj.update(struct.pack("<Q", len(rows)))
+        hash_obj.update(_to_bytes(rows))
+
+    def update_points(self, points):
+        """Add vertex positions
+
+        Arguments:
+            points: (N, 3) or (N, 4) rows of x, y, z (, w), or flat buffer
+                of x, y, z. The `w` is only used by legacy version, and
+                defaults to 1.
+
+        """
+        rows = _to_rows(points, 4, fill=1.0)
+        if self.version != LEGACY_VERSION:
+            rows = rows[:, :3] if numpy is not None else [r[:3] for r in rows]
+        self._update("points", rows, _legacy_points)
+
+    def update_normals(self, normals):
+        """Add vertex normals
+
+        Arguments:
+            normals: (N, 3) rows of x, y, z, or flat buffer
+
+        """
+        self._update("normals", _to_rows(normals, 3), _legacy_normals)
+
+    def update_uvmap(self, u_values, v_values):
+        """Add UV coordinates
+
+        Arguments:
+            u_values: Sequence of U values
+            v_values: Sequence of V values
+
+        """
+        if numpy is not None:
+            rows = numpy.column_stack([
+                numpy.asarray(u_values, dtype=numpy.float64),
+                numpy.asarray(v_values, dtype=numpy.float64),
+            ])
+        else:
+            rows = [(float(u), float(v)) for u, v in zip(u_values, v_values)]
+        self._update("uvmap", rows, _legacy_uvmap)
+
+    def digest(self):
+        """Return C4 ID of each updated channel"""
+        result = dict()
+        hasher = _C4Hasher()
+
+        if self.version == LEGACY_VERSION:
+            for channel in CHANNELS:
+                if self._sums[channel]:
+                    value = str(self._sums[channel]).encode("ascii")
+                    hasher.hash_obj.update(value)
+                    result[channel] = hasher.digest()
+                    hasher.clear()
+            return result
+
+        for channel, hash_obj in self._hash_objs.items():
+            result[channel] = hasher.encode(hash_obj.digest())
+
+        if result:
+            result["hashVersion"] = self.version
+
+        return result
+
+
+def hash_mesh(points=None, normals=None, uvs=None, version=DIGEST_VERSION):
+    """Hash one mesh from plain arrays
+
+    Arguments:
+        points (optional): Vertex positions, see `update_points`
+        normals (optional): Vertex normals, see `update_normals`
+        uvs (tuple, optional): Pair of U values and V values
+        version (int, optional): Digest version
+
+    Returns:
+        dict: C4 ID of each given channel
+
+    """
+    hasher = ArrayMeshHasher(version)
+    if points is not None:
+        hasher.update_points(points)
+    if normals is not None:
+        hasher.update_normals(normals)
+    if uvs is not None:
+        hasher.update_uvmap(*uvs)
+    return hasher.digest()
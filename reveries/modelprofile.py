@@ -0,0 +1,306 @@
+"""Model profile store
+
+Per mesh hashes of published model (see `reveries.maya.utils.MeshHasher`)
+are kept in a dedicated collection instead of representation data, one
+document per (version, avalonId):
+
+    {
+        "version": version id,
+        "subset": subset id,
+        "avalonId": "...",
+        "protected": False,
+        "meshes": [{"hierarchy": "|...", "points": "...", ...}],
+    }
+
+So representation documents stay small, and protected meshes of a subset
+or the profile of one version are each answered by one indexed query.
+
+Model protection is set by model locker on one version of the subset, the
+version that the locker wrote last.
+
+Versions that were published before this store exists (and not migrated
+with `reveries.scripts.migrate_model_profile`) are read from their
+mayaBinary representation data as fallback.
+
+"""
+
+
+COLLECTION = "reveries.modelprofiles"
+
+INDEXES = [
+    {
+        "name": "version_avalon_id",
+        "keys": [("version", 1),
+                 ("avalonId", 1)],
+        "unique": True,
+        "description": "Profile of version, one document per mesh id.",
+    },
+    {
+        "name": "subset_protected",
+        "keys": [("subset", 1),
+                 ("protected", 1)],
+        "description": "Protected meshes of subset.",
+    },
+]
+
+# Representation that carried model profile before this store
+LEGACY_REPRESENTATION = "mayaBinary"
+
+
+def get_collection():
+    """Return model profile collection of Avalon database"""
+    from avalon import io
+    return io._database[COLLECTION]
+
+
+def documents(version_id, subset_id, profile, protected=None):
+    """Return profile documents for writing
+
+    Arguments:
+        version_id (ObjectId): Version id
+        subset_id (ObjectId): Subset id
+        profile (dict): {avalonId: [mesh hash data]}
+        protected (iterable, optional): Protected avalonIds
+
+    Returns:
+        list: Documents
+
+    """
+    protected = set(protected or [])
+    return [
+        {
+            "version": version_id,
+            "subset": subset_id,
+            "avalonId": id,
+            "protected": id in protected,
+            "meshes": meshes,
+        }
+        for id, meshes in profile.items()
+    ]
+
+
+def to_profile(docs):
+    """Return {avalonId: [mesh hash data]} from profile documents"""
+    return dict((doc["avalonId"], doc["meshes"]) for doc in docs)
+
+
+def write(version_id, subset_id, profile, collection=None):
+    """Write profile of version, replace previous if re-published
+
+    Arguments:
+        version_id (ObjectId): Version id
+        subset_id (ObjectId): Subset id
+        profile (dict): {avalonId: [mesh hash data]}
+        collection (optional): Profile collection, default from database
+
+    """
+    from pymongo import ReplaceOne
+
+    if collection is None:
+        collection = get_collection()
+
+    requests = [
+        ReplaceOne({"version": version_id, "avalonId": doc["avalonId"]},
+                   doc,
+                   upsert=True)
+        for doc in documents(version_id, subset_id, profile)
+    ]
+    if not requests:
+        return
+
+    collection.bulk_write(requests, ordered=False)
+    # Meshes that were removed in this publish
+    collection.delete_many({"version": version_id,
+                            "avalonId": {"$nin": list(profile)}})
+
+
+def _legacy_representations(filter, projection):
+    from avalon import io
+
+    filter = dict(filter, type="representation", name=LEGACY_REPRESENTATION)
+    return io.find(filter, projection=projection)
+
+
+def find(version_id, fields=None, collection=None):
+    """Return model profile of version
+
+    Arguments:
+        version_id (ObjectId): Version id
+        fields (list, optional): Mesh data keys to fetch, e.g. ["points"],
+            default all
+        collection (optional): Profile collection, default from database
+
+    Returns:
+        dict: {avalonId: [mesh hash data]}, None if not found
+
+    """
+    if collection is None:
+        collection = get_collection()
+
+    projection = {"avalonId": True, "_id": False}
+    if fields:
+        projection.update(("meshes." + key, True) for key in fields)
+    else:
+        projection["meshes"] = True
+
+    profile = to_profile(collection.find({"version": version_id},
+                                         projection=projection))
+    if profile:
+        return profile
+
+    for representation in _legacy_representations(
+            {"parent": version_id},
+            projection={"data.modelProfile": True}):
+        return representation["data"].get("modelProfile")
+
+
+def _legacy_protected(subset_id, projection):
+    """Yield (version id, representation data) that has protected list
+
+    Newest version first.
+
+    """
+    from avalon import io
+
+    version_ids = [version["_id"] for version in
+                   io.find({"type": "version", "parent": subset_id},
+                           projection={"_id": True},
+                           sort=[("name", -1)])]
+    if not version_ids:
+        return
+
+    projection = dict(projection, parent=True)
+    projection["data.modelProtected"] = True
+    by_version = dict(
+        (representation["parent"], representation["data"])
+        for representation in _legacy_representations(
+            {"parent": {"$in": version_ids},
+             "data.modelProtected": {"$exists": True}},
+            projection=projection)
+    )
+    for version_id in version_ids:
+        if version_id in by_version:
+            yield version_id, by_version[version_id]
+
+
+def protected_ids(subset_id, collection=None):
+    """Return (version id, protected avalonIds) of subset
+
+    Returns:
+        tuple: Version that holds the protection (None if nothing has been
+            protected) and set of avalonIds
+
+    """
+    if collection is None:
+        collection = get_collection()
+
+    docs = list(collection.find({"subset": subset_id, "protected": True},
+                                projection={"version": True,
+                                            "avalonId": True},
+                                sort=[("version", -1)]))
+    if docs:
+        # Migrated versions may each hold their own protection, take the
+        # latest one.
+        version_id = docs[0]["version"]
+        return version_id, set(doc["avalonId"] for doc in docs
+                               if doc["version"] == version_id)
+
+    for version_id, data in _legacy_protected(subset_id, {}):
+        return version_id, set(data["modelProtected"])
+
+    return None, set()
+
+
+def find_protected(subset_id, fields=None, collection=None):
+    """Return protected meshes of subset
+
+    Arguments:
+        subset_id (ObjectId): Subset id
+        fields (list, optional): Mesh data keys to fetch, "hierarchy" is
+            always fetched
+        collection (optional): Profile collection, default from database
+
+    Returns:
+        dict: {hierarchy: mesh hash data}
+
+    """
+    if collection is None:
+        collection = get_collection()
+
+    projection = {"meshes": True}
+    if fields:
+        projection = dict(("meshes." + key, True)
+                          for key in set(fields) | {"hierarchy"})
+
+    docs = list(collection.find({"subset": subset_id, "protected": True},
+                                projection=projection))
+
+    if not docs:
+        for _, data in _legacy_protected(subset_id,
+                                         {"data.modelProfile": True}):
+            profile = data.get("modelProfile", dict())
+            docs += [{"meshes": profile[id]}
+                     for id in data["modelProtected"] if id in profile]
+
+    protected = dict()
+    for doc in docs:
+        data = dict(doc["meshes"][0])  # Should have only one mesh per id
+        name = data.pop("hierarchy")
+        protected[name] = data
+
+    return protected
+
+
+def _clear_legacy_protected(subset_id):
+    from avalon import io
+
+    version_ids = [version["_id"] for version in
+                   io.find({"type": "version", "parent": subset_id},
+                           projection={"_id": True})]
+    if not version_ids:
+        return
+    io.update_many({"type": "representation",
+                    "parent": {"$in": version_ids},
+                    "name": LEGACY_REPRESENTATION,
+                    "data.modelProtected": {"$exists": True}},
+                   {"$unset": {"data.modelProtected": ""}})
+
+
+def set_protected(subset_id, version_id, avalon_ids, collection=None):
+    """Protect meshes of version, and only this version in subset
+
+    Arguments:
+        subset_id (ObjectId): Subset id
+        version_id (ObjectId): Version that holds the protection
+        avalon_ids (iterable): Protected avalonIds
+        collection (optional): Profile collection, default from database
+
+    """
+    if collection is None:
+        collection = get_collection()
+    avalon_ids = list(avalon_ids)
+
+    if collection.find_one({"version": version_id},
+                           projection={"_id": True}) is None:
+        # Not migrated, and protection in collection must not shadow it
+        from avalon import io
+        io.update_many({"type": "representation",
+                        "parent": version_id,
+                        "name": LEGACY_REPRESENTATION},
+                       {"$set": {"data.modelProtected": avalon_ids}})
+        collection.update_many({"subset": subset_id, "protected": True},
+                               {"$set": {"protected": False}})
+        return
+
+    # Legacy protection is read when nothing protected in collection, it
+    # must not come back after every mesh has been unprotected.
+    _clear_legacy_protected(subset_id)
+
+    collection.update_many({"subset": subset_id,
+                            "protected": True,
+                            "$or": [{"version": {"$ne": version_id}},
+                                    {"avalonId": {"$nin": avalon_ids}}]},
+                           {"$set": {"protected": False}})
+    collection.update_many({"version": version_id,
+                            "avalonId": {"$in": avalon_ids}},
+                           {"$set": {"protected": True}})
@@ -0,0 +1,515 @@
+"""Queue and worker for progressive filesys publish
+
+Instead of starting a new filesys publish process for every finished
+render task, post task scripts put a submission (dump file, output files,
+frame count, job id) into a local queue and exit. A long-running worker
+on the same machine takes submissions from the queue, coalesces the ones
+that belong to the same dump and job into one submission, and publishes
+it in-process, so avalon, pyblish and the database connection are set up
+only once.
+
+Queues:
+    SpoolQueue: Directory of JSON files, one per submission. Survives
+        worker restart, default at `~/.reveries/publish_queue` or
+        `$REVERIES_PUBLISH_QUEUE`.
+    MemoryQueue: In-memory stand-in with the same interface.
+
+Worker is started by `ensure_worker` if no live worker heartbeat found,
+and exits after being idle for a while. The heartbeat file is created
+exclusively, so it also serves as the worker lock, only one post task
+script gets to start a worker.
+
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import errno
+import socket
+import logging
+import threading
+import subprocess
+
+from .sequences import merge
+
+
+log = logging.getLogger(__name__)
+
+
+QUEUE_DIR = os.path.join(os.path.expanduser("~"), ".reveries",
+                         "publish_queue")
+
+# Worker lock, its mtime is the worker heartbeat
+HEARTBEAT = "worker.heartbeat"
+HEARTBEAT_INTERVAL = 5.0
+HEARTBEAT_TIMEOUT = 30.0
+
+POLL_INTERVAL = 1.0
+# Seconds to wait for more submissions after one arrived
+COALESCE_WINDOW = 3.0
+# Seconds to stay alive without any submission
+IDLE_TIMEOUT = 600.0
+
+# Environment that publish runs with
+ENVIRONMENT_PREFIXES = ("AVALON_", "PYBLISH_")
+
+
+def queue_dir():
+    return os.environ.get("REVERIES_PUBLISH_QUEUE", QUEUE_DIR)
+
+
+def _makedirs(path):
+    try:
+        os.makedirs(path)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+
+
+def _rename(src, dst):
+    try:
+        os.rename(src, dst)
+    except OSError:
+        return False
+    return True
+
+
+def _is_stale(path):
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return True
+    return time.time() - mtime >= HEARTBEAT_TIMEOUT
+
+
+def make_submission(dump, files, frames, job_id, environment=None):
+    """Return a submission of progressive publish
+
+    Arguments:
+        dump (str): Instance dump file path
+        files (list): Output file paths of finished frames, or
+            `sequences.FrameSet` of them
+        frames (int): Finished frame count
+        job_id (str): Deadline job id
+        environment (dict, optional): Environment to publish with, default
+            AVALON_* and PYBLISH_* variables of current process.
+
+    """
+    if environment is None:
+        environment = dict((key, value) for key, value in os.environ.items()
+                           if key.startswith(ENVIRONMENT_PREFIXES))
+    return {
+        "dump": dump,
+        "files": [str(item) for item in files],
+        "frames": frames,
+        "jobId": job_id,
+        "environment": environment,
+        "time": time.time(),
+    }
+
+
+def coalesce(items):
+    """Merge submissions of the same dump and job
+
+    Arguments:
+        items (list): (id, submission) pairs, in arrival order
+
+    Returns:
+        list: (ids, submission) pairs, merged submission has all files
+            (no duplicates, frame sets of the same pattern are merged) and
+            the sum of frame count.
+
+    """
+    groups = dict()
+    order = list()
+
+    for id_, submission in items:
+        key = (submission["dump"], submission["jobId"])
+        if key not in groups:
+            merged = dict(submission, files=list(), frames=0)
+            groups[key] = ([], merged)
+            order.append(key)
+
+        ids, merged = groups[key]
+        ids.append(id_)
+        merged["frames"] += submission["frames"]
+        merged["environment"] = submission["environment"]  # Latest
+        merged["files"] += submission["files"]
+
+    for key in order:
+        merged = groups[key][1]
+        merged["files"] = [str(item) for item in merge(merged["files"])]
+
+    return [groups[key] for key in order]
+
+
+class MemoryQueue(object):
+    """In-memory submission queue"""
+
+    def __init__(self):
+        self.pending = list()
+        self.failed = list()
+        self._claimed = dict()
+        self._lock = threading.Lock()
+
+    def put(self, submission):
+        with self._lock:
+            self.pending.append((uuid.uuid4().hex, submission))
+
+    def beat(self):
+        pass
+
+    def take(self):
+        """Claim and return all pending (id, submission) pairs"""
+        with self._lock:
+            items, self.pending = self.pending, list()
+            self._claimed.update(items)
+            return items
+
+    def done(self, id_):
+        with self._lock:
+            self._claimed.pop(id_, None)
+
+    def fail(self, id_):
+        with self._lock:
+            self.failed.append((id_, self._claimed.pop(id_)))
+
+
+class SpoolQueue(object):
+    """Directory backed submission queue
+
+    Each submission is one JSON file, written to a temp name and renamed
+    into place, so the worker never reads a partial file. Claimed files
+    are moved to the owner's dir under "claimed" and removed when done, or
+    moved to "failed" dir for inspection.
+
+    Owner dir mtime is kept fresh by `beat`, files left in the dir of an
+    owner that stopped beating (crashed worker) are taken again. Claims of
+    a live owner are never touched.
+
+    Arguments:
+        path (str, optional): Queue dir, default `queue_dir()`
+        owner (str, optional): Claim owner name, default host name and
+            process id
+
+    """
+
+    def __init__(self, path=None, owner=None):
+        self.path = path or queue_dir()
+        self.owner = owner or "%s-%d" % (socket.gethostname(), os.getpid())
+        self._dirs = dict((name, os.path.join(self.path, name))
+                          for name in ("pending", "claimed", "failed"))
+        self._claimed = os.path.join(self._dirs["claimed"], self.owner)
+        for dir_path in list(self._dirs.values()) + [self._claimed]:
+            _makedirs(dir_path)
+
+    def put(self, submission):
+        name = "%017.6f-%s.json" % (time.time(), uuid.uuid4().hex)
+        temp = os.path.join(self.path, "." + name)
+        with open(temp, "w") as file:
+            json.dump(submission, file)
+        os.rename(temp, os.path.join(self._dirs["pending"], name))
+
+    def beat(self):
+        """Mark claims of this owner as alive"""
+        os.utime(self._claimed, None)
+
+    def _recover(self):
+        """Adopt claimed files of owners that stopped beating"""
+        names = list()
+        claimed = self._dirs["claimed"]
+        for owner in os.listdir(claimed):
+            owner_dir = os.path.join(claimed, owner)
+            if owner == self.owner or not os.path.isdir(owner_dir):
+                continue
+            if not _is_stale(owner_dir):
+                continue
+
+            log.warning("Taking over claims of %s" % owner)
+            try:
+                for name in os.listdir(owner_dir):
+                    if _rename(os.path.join(owner_dir, name),
+                               os.path.join(self._claimed, name)):
+                        names.append(name)
+                os.rmdir(owner_dir)
+            except OSError:
+                # Being taken over by another worker
+                pass
+
+        return sorted(names)
+
+    def take(self):
+        """Claim and return all pending (id, submission) pairs"""
+        names = self._recover()
+
+        for name in sorted(os.listdir(self._dirs["pending"])):
+            if _rename(os.path.join(self._dirs["pending"], name),
+                       os.path.join(self._claimed, name)):
+                names.append(name)
+
+        items = list()
+        for name in names:
+            path = os.path.join(self._claimed, name)
+            try:
+                with open(path, "r") as file:
+                    items.append((name, json.load(file)))
+            except (IOError, ValueError) as e:
+                log.error("Bad submission %s: %s" % (name, e))
+                self.fail(name)
+
+        return items
+
+    def done(self, id_):
+        try:
+            os.remove(os.path.join(self._claimed, id_))
+        except OSError:
+            pass
+
+    def fail(self, id_):
+        _rename(os.path.join(self._claimed, id_),
+                os.path.join(self._dirs["failed"], id_))
+
+
+def publish(submission):
+    """Run filesys publish of a submission in current process
+
+    Returns:
+        bool: True if published without error
+
+    """
+    import avalon.api
+    import avalon.io
+    import pyblish.api
+    from reveries import filesys, lib, reclaim
+
+    # Submissions may come from jobs of different projects
+    os.environ.update(submission["environment"])
+
+    if not filesys.installed:
+        avalon.api.install(filesys)
+        pyblish.api.register_target("localhost")
+
+    for key, value in submission["environment"].items():
+        if key.startswith("AVALON_"):
+            avalon.api.Session[key] = value
+            avalon.io.Session[key] = value
+
+    context = pyblish.api.Context()
+    context.data.update({
+        "_pyblishDumpFile": submission["dump"],
+        "_progressivePublishing": True,
+        "_progressiveStep": submission["frames"],
+        "_progressiveOutput": submission["files"],
+        "deadlineJobId": submission["jobId"],
+    })
+
+    try:
+        return lib.publish_remote(context) == 0
+    finally:
+        reclaim.get_reclaimer().wait()
+
+
+class Worker(object):
+    """Take submissions from queue, coalesce and publish them
+
+    Arguments:
+        queue: `SpoolQueue` or `MemoryQueue`
+        publish (callable, optional): Takes one submission and returns
+            True on success, default `publish`.
+        window (float, optional): Seconds to wait for more submissions
+            after one arrived, for coalescing
+        idle_timeout (float, optional): Exit after idle this long, None
+            to run forever.
+        heartbeat (str, optional): Heartbeat file path to touch, the file
+            is created if not exists (not started by `ensure_worker`) and
+            removed when worker exits.
+
+    """
+
+    def __init__(self,
+                 queue,
+                 publish=publish,
+                 window=COALESCE_WINDOW,
+                 idle_timeout=IDLE_TIMEOUT,
+                 heartbeat=None):
+        self.queue = queue
+        self.publish = publish
+        self.window = window
+        self.idle_timeout = idle_timeout
+        self.heartbeat = heartbeat
+
+        self.published = 0
+        self.failed = 0
+        self._running = False
+
+    def _beat(self):
+        # Keep beating from thread, a publish may take longer than
+        # `HEARTBEAT_TIMEOUT`.
+        while self._running:
+            try:
+                self.queue.beat()
+                if self.heartbeat is not None:
+                    os.utime(self.heartbeat, None)
+            except OSError as e:
+                log.warning("Heartbeat failed: %s" % e)
+            time.sleep(HEARTBEAT_INTERVAL)
+
+    def process(self, items):
+        """Coalesce and publish claimed submissions"""
+        for ids, submission in coalesce(items):
+            log.info("Publishing %d frames (%d submissions) of %s"
+                     % (submission["frames"], len(ids), submission["dump"]))
+            try:
+                success = self.publish(submission)
+            except Exception as e:
+                log.exception(e)
+                success = False
+
+            for id_ in ids:
+                if success:
+                    self.queue.done(id_)
+                else:
+                    self.queue.fail(id_)
+
+            if success:
+                self.published += 1
+            else:
+                self.failed += 1
+                log.error("Publish failed, submissions moved to failed.")
+
+    def run_once(self):
+        """Take and process submissions, return False if nothing to do"""
+        items = self.queue.take()
+        if not items:
+            return False
+
+        # Wait a bit for submissions of other tasks that finish around
+        # the same time.
+        deadline = time.time() + self.window
+        while time.time() < deadline:
+            time.sleep(min(POLL_INTERVAL, self.window))
+            items += self.queue.take()
+
+        self.process(items)
+        return True
+
+    def run(self):
+        if self.heartbeat is not None and not os.path.isfile(self.heartbeat):
+            if not acquire(self.heartbeat):
+                log.info("Another worker is running, exit.")
+                return
+
+        self._running = True
+        beating = threading.Thread(target=self._beat)
+        beating.daemon = True
+        beating.start()
+
+        idle_since = time.time()
+        try:
+            while True:
+                if self.run_once():
+                    idle_since = time.time()
+                    continue
+
+                if (self.idle_timeout is not None
+                        and time.time() - idle_since > self.idle_timeout):
+                    log.info("Idle, worker exit.")
+                    return
+
+                time.sleep(POLL_INTERVAL)
+        finally:
+            self._running = False
+            if self.heartbeat is not None:
+                try:
+                    os.remove(self.heartbeat)
+                except OSError:
+                    pass
+
+
+def is_worker_alive(path=None):
+    """Is there a worker serving the queue dir ?"""
+    heartbeat = os.path.join(path or queue_dir(), HEARTBEAT)
+    try:
+        mtime = os.path.getmtime(heartbeat)
+    except OSError:
+        return False
+    return time.time() - mtime < HEARTBEAT_TIMEOUT
+
+
+def acquire(heartbeat):
+    """Create worker heartbeat file exclusively
+
+    A stale heartbeat (worker crashed) is moved away and acquired again.
+
+    Arguments:
+        heartbeat (str): Heartbeat file path
+
+    Returns:
+        bool: True if acquired, False if other process holds it
+
+    """
+    for _ in range(2):
+        try:
+            fd = os.open(heartbeat, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+        else:
+            os.write(fd, ("%s:%d" % (socket.gethostname(),
+                                     os.getpid())).encode())
+            os.close(fd)
+            return True
+
+        if not _is_stale(heartbeat):
+            return False
+
+        # Only one process gets to move the stale file away
+        tomb = "%s.%s" % (heartbeat, uuid.uuid4().hex)
+        if not _rename(heartbeat, tomb):
+            return False
+        if not _is_stale(tomb):
+            # Another process has just acquired it, give it back
+            _rename(tomb, heartbeat)
+            return False
+        os.remove(tomb)
+
+    return False
+
+
+def ensure_worker(python, script, path=None):
+    """Start a detached worker process if none is alive
+
+    Arguments:
+        python (str): Python executable
+        script (str): Worker script path
+        path (str, optional): Queue dir
+
+    Returns:
+        bool: True if a new worker was started
+
+    """
+    path = path or queue_dir()
+    if is_worker_alive(path):
+        return False
+
+    # Acquire heartbeat first so other post task scripts that run at the
+    # same time will not start another worker, the worker takes it over.
+    if not acquire(os.path.join(path, HEARTBEAT)):
+        return False
+
+    kwargs = dict()
+    if sys.platform == "win32":
+        DETACHED_PROCESS = 0x00000008
+        CREATE_NEW_PROCESS_GROUP = 0x00000200
+        kwargs["creationflags"] = DETACHED_PROCESS | CREATE_NEW_PROCESS_GROUP
+        kwargs["close_fds"] = True
+    else:
+        kwargs["preexec_fn"] = os.setsid
+
+    with open(os.devnull, "w") as devnull:
+        subprocess.Popen([python, script, "--queue", path],
+                         stdout=devnull,
+                         stderr=devnull,
+                         **kwargs)
+    return True
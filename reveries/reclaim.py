@@ -0,0 +1,318 @@
+"""Rename-then-delete directory cleanup
+
+Deleting large directories on network storage could take minutes, so
+instead of deleting in place, paths are renamed into a trash dir (which
+is one fast metadata operation on the same file system) and purged by
+a background worker pool.
+
+Trash dir is `.reveries_trash` under the project root (see
+`hashcache.project_root_of`), or next to the path if not in any project.
+Each process discards into its own entry, named by pid and host. Entries
+left by a crashed process (dead pid on this host, or older than
+`RECOVER_AGE`) are purged when the trash dir is used again, entries of
+live processes are left to them.
+
+Usage:
+    >> reclaimer = get_reclaimer()
+    >> reclaimer.discard(["/proj/asset/publish/model/v003/mayaBinary"])
+    >> reclaimer.wait()  # Optional
+    >> reclaimer.reclaimed
+    183500800
+
+"""
+import os
+import stat
+import socket
+import uuid
+import time
+import errno
+import shutil
+import logging
+import threading
+from multiprocessing.pool import ThreadPool
+
+from .hashcache import project_root_of
+
+
+log = logging.getLogger(__name__)
+
+
+TRASH = ".reveries_trash"
+
+WORKERS = 4
+
+# Seconds after which a trash entry is purged by anyone, for entries of
+# other hosts, or entries that were claimed but not finished.
+RECOVER_AGE = 24 * 3600
+
+
+def trash_dir_of(path):
+    """Return the trash dir for `path`, on the same file system"""
+    root = project_root_of(path)
+    if root is None:
+        root = os.path.dirname(os.path.abspath(path))
+    return os.path.join(root, TRASH)
+
+
+def _host():
+    return socket.gethostname().replace("-", "_")
+
+
+def _entry_name():
+    """Return a new trash entry name, "<pid>-<host>-<uuid>" """
+    return "%d-%s-%s" % (os.getpid(), _host(), uuid.uuid4().hex)
+
+
+def is_process_alive(pid):
+    """Is process of `pid` running on this host ?"""
+    if os.name == "nt":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION,
+                                      False,
+                                      pid)
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        try:
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        finally:
+            kernel32.CloseHandle(handle)
+        return code.value == STILL_ACTIVE
+
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno == errno.EPERM
+    return True
+
+
+def is_abandoned(path):
+    """Is trash entry left by a process that is gone ?"""
+    try:
+        age = time.time() - os.lstat(path).st_mtime
+    except OSError:
+        return False
+    if age > RECOVER_AGE:
+        return True
+
+    parts = os.path.basename(path).split("-")
+    if len(parts) != 3 or parts[1] != _host():
+        return False  # Other host or being recovered, only by age
+    try:
+        pid = int(parts[0])
+    except ValueError:
+        return False
+    return pid != os.getpid() and not is_process_alive(pid)
+
+
+def _remove_readonly(func, path, _):
+    os.chmod(path, stat.S_IWRITE)
+    func(path)
+
+
+def purge(path):
+    """Delete file or directory and return bytes reclaimed
+
+    Errors are logged and skipped, so the rest can still be deleted.
+
+    """
+    reclaimed = 0
+
+    if not os.path.isdir(path) or os.path.islink(path):
+        try:
+            reclaimed = os.lstat(path).st_size
+            os.remove(path)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                log.warning("Purge failed: %s" % e)
+            return 0
+        return reclaimed
+
+    for dir_path, dir_names, file_names in os.walk(path, topdown=False):
+        for name in file_names:
+            file_path = os.path.join(dir_path, name)
+            try:
+                size = os.lstat(file_path).st_size
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    _remove_readonly(os.remove, file_path, None)
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    log.warning("Purge failed: %s" % e)
+                continue
+            reclaimed += size
+
+        for name in dir_names:
+            sub_path = os.path.join(dir_path, name)
+            if os.path.islink(sub_path):
+                try:
+                    os.remove(sub_path)
+                except OSError:
+                    pass
+
+        try:
+            os.rmdir(dir_path)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                log.warning("Purge failed: %s" % e)
+
+    return reclaimed
+
+
+class Reclaimer(object):
+    """Move paths into trash and purge them in background
+
+    Arguments:
+        workers (int, optional): Max concurrent purges
+
+    """
+
+    def __init__(self, workers=WORKERS):
+        self.workers = workers
+        self.reclaimed = 0
+        self.pending = 0
+
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        self._pool = None
+        self._recovered = set()
+
+    def _submit(self, path):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPool(self.workers)
+            self.pending += 1
+            self._pool.apply_async(self._purge, (path,))
+
+    def _purge(self, path):
+        start = time.time()
+        reclaimed = 0
+        try:
+            reclaimed = purge(path)
+        finally:
+            trash = os.path.dirname(path)
+            with self._lock:
+                self.reclaimed += reclaimed
+                self.pending -= 1
+                if not self.pending:
+                    # Remove trash dir if empty, it may be next to a
+                    # version dir. Entries are created under the same
+                    # lock, see `_make_entry`.
+                    try:
+                        os.rmdir(trash)
+                    except OSError:
+                        pass
+                self._done.notify_all()
+
+        log.info("Reclaimed %.1f MB in %.1fs: %s"
+                 % (reclaimed / 1024.0 / 1024.0, time.time() - start, path))
+
+    def _recover(self, trash):
+        """Purge entries that were left by crashed process"""
+        if trash in self._recovered:
+            return
+        self._recovered.add(trash)
+
+        try:
+            entries = os.listdir(trash)
+        except OSError:
+            return
+
+        for name in entries:
+            path = os.path.join(trash, name)
+            if not is_abandoned(path):
+                continue
+            # Rename first, so others that are recovering the same trash
+            # would not purge it at the same time.
+            claimed = os.path.join(trash, "recover-" + uuid.uuid4().hex)
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue
+            log.info("Recovering leftover trash: %s" % path)
+            self._submit(claimed)
+
+    def _make_entry(self, trash):
+        """Create and return a new entry in trash, None if failed"""
+        entry = os.path.join(trash, _entry_name())
+        for _ in range(2):
+            # Trash dir may be removed by a worker when its purges are
+            # done, or by other process
+            with self._lock:
+                try:
+                    os.makedirs(entry)
+                except OSError as e:
+                    if e.errno == errno.ENOENT:
+                        continue
+                    log.debug("Create trash entry failed: %s" % e)
+                    return None
+                return entry
+        return None
+
+    def discard(self, paths):
+        """Move paths into trash and purge them in background
+
+        Paths that can not be renamed into trash (e.g. different file
+        system) are deleted immediately.
+
+        Arguments:
+            paths (list): File or directory paths
+
+        Raises:
+            OSError: If a path can neither be renamed nor be deleted
+
+        """
+        batches = dict()
+
+        for index, path in enumerate(paths):
+            path = os.path.normpath(path)
+            if not os.path.lexists(path):
+                continue
+
+            trash = trash_dir_of(path)
+            if trash not in batches:
+                self._recover(trash)
+                batches[trash] = self._make_entry(trash)
+
+            entry = batches[trash]
+            if entry is not None:
+                dst = os.path.join(entry, "%d-%s" % (index,
+                                                     os.path.basename(path)))
+                try:
+                    os.rename(path, dst)
+                    continue
+                except OSError as e:
+                    log.debug("Rename into trash failed (%s), delete "
+                              "directly: %s" % (e, path))
+
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path, onerror=_remove_readonly)
+            else:
+                os.remove(path)
+
+        for entry in batches.values():
+            if entry is not None:
+                self._submit(entry)
+
+    def wait(self):
+        """Block until all pending purges are done"""
+        with self._lock:
+            while self.pending:
+                self._done.wait(1)
+
+
+_reclaimer = None
+_reclaimer_lock = threading.Lock()
+
+
+def get_reclaimer():
+    """Return the shared `Reclaimer` of this process"""
+    global _reclaimer
+    with _reclaimer_lock:
+        if _reclaimer is None:
+            _reclaimer = Reclaimer()
+        return _reclaimer
@@ -0,0 +1,290 @@
+"""Atomic version number reservation for publish
+
+Concurrent publishes to the same subset must not pick the same version.
+A reservation hands out the next version number in one atomic step and
+expires after a while, so the number of an abandoned publish can be
+reused.
+
+Two backends:
+    DatabaseReservation: A counter document per subset that is increased
+        by `findAndModify`, and one reservation document per handed out
+        number. Used whenever the database is available.
+    LockFileReservation: A lock file in version dir that is created with
+        `O_EXCL`, for publishing without database.
+
+Both are given a `floor`, which is the latest registered version + 1, and
+never hand out numbers below it.
+
+A reservation is saved as plain dict in instance data (which may be
+dumped into JSON), and released with `release(data)` once the version has
+been integrated.
+
+"""
+import os
+import json
+import time
+import uuid
+import errno
+import socket
+import getpass
+import logging
+
+
+log = logging.getLogger(__name__)
+
+
+DATABASE = "database"
+LOCKFILE = "lockfile"
+
+COLLECTION = "reveries.reservations"
+LOCK = ".publish.lock"
+
+# Seconds before an unreleased reservation can be taken by others
+DEFAULT_TTL = 12 * 3600
+
+
+def default_owner():
+    """Return a new owner identity, "user@host:pid:uuid"
+
+    Unique to each call, so concurrent publishes by the same user on the
+    same host (e.g. two Maya sessions) never share a reservation. Pass a
+    stable owner (e.g. dump file path) for resumable publish.
+
+    """
+    return "%s@%s:%d:%s" % (getpass.getuser(),
+                            socket.gethostname(),
+                            os.getpid(),
+                            uuid.uuid4().hex)
+
+
+class _Reservation(object):
+
+    backend = None
+
+    def __init__(self, key, owner=None, ttl=DEFAULT_TTL):
+        self.key = key
+        self.owner = owner or default_owner()
+        self.ttl = ttl
+        self.version = None
+
+    def reserve(self, floor, pin=None):
+        """Reserve and return a version number
+
+        Arguments:
+            floor (int): Lowest version number that can be handed out
+            pin (int, optional): Reserve this exact number regardless of
+                others' reservation.
+
+        """
+        raise NotImplementedError
+
+    def data(self):
+        """Return JSON serializable data for `release`"""
+        return {"backend": self.backend,
+                "key": self.key,
+                "owner": self.owner,
+                "version": self.version}
+
+
+class DatabaseReservation(_Reservation):
+    """Reserve version with counter document
+
+    Arguments:
+        collection: pymongo collection for reservation documents
+        key (str): Subset identity, e.g. "{project}/{asset_id}/{subset}"
+        owner (str, optional): Owner identity, reservation of the same
+            owner can be taken again (resume). Default `default_owner()`.
+        ttl (float, optional): Seconds before the reservation expires
+
+    """
+
+    backend = DATABASE
+
+    _indexed = set()
+
+    def __init__(self, collection, key, owner=None, ttl=DEFAULT_TTL):
+        super(DatabaseReservation, self).__init__(key, owner, ttl)
+        self.collection = collection
+
+        if collection.name not in self._indexed:
+            collection.create_index([("key", 1), ("version", 1)],
+                                    name="key_version",
+                                    unique=True,
+                                    background=True)
+            self._indexed.add(collection.name)
+
+    def reserve(self, floor, pin=None):
+        from pymongo import ReturnDocument
+        from pymongo.errors import DuplicateKeyError
+
+        now = time.time()
+        counter_id = "counter:" + self.key
+        ownership = {"owner": self.owner, "expires": now + self.ttl}
+
+        if pin is not None:
+            self.collection.update_one({"_id": counter_id},
+                                       {"$max": {"next": pin + 1}},
+                                       upsert=True)
+            self.collection.update_one({"key": self.key, "version": pin},
+                                       {"$set": ownership},
+                                       upsert=True)
+            self.version = pin
+            return pin
+
+        # Reservations below floor have been registered
+        self.collection.delete_many({"key": self.key,
+                                     "version": {"$lt": floor}})
+
+        self.collection.update_one({"_id": counter_id},
+                                   {"$max": {"next": floor}},
+                                   upsert=True)
+
+        # Take back our own, or an expired reservation
+        taken = self.collection.find_one_and_update(
+            {"key": self.key,
+             "version": {"$gte": floor},
+             "$or": [{"owner": self.owner},
+                     {"expires": {"$lt": now}}]},
+            {"$set": ownership},
+            sort=[("version", 1)],
+            projection={"version": True},
+        )
+        if taken is not None:
+            self.version = taken["version"]
+            return self.version
+
+        while True:
+            counter = self.collection.find_one_and_update(
+                {"_id": counter_id},
+                {"$inc": {"next": 1}},
+                return_document=ReturnDocument.BEFORE,
+            )
+            version = counter["next"]
+            try:
+                self.collection.insert_one({"key": self.key,
+                                            "version": version,
+                                            "owner": self.owner,
+                                            "expires": now + self.ttl})
+            except DuplicateKeyError:
+                continue  # Pinned by other
+            else:
+                self.version = version
+                return version
+
+
+class LockFileReservation(_Reservation):
+    """Reserve version with lock file in version dir
+
+    Arguments:
+        version_dir (callable): Takes version number, returns version dir
+        key (str): Subset identity
+        owner (str, optional): Owner identity, lock of the same owner can
+            be taken again (resume). Default `default_owner()`.
+        ttl (float, optional): Seconds before the lock expires
+
+    """
+
+    backend = LOCKFILE
+
+    def __init__(self, version_dir, key, owner=None, ttl=DEFAULT_TTL):
+        super(LockFileReservation, self).__init__(key, owner, ttl)
+        self.version_dir = version_dir
+        self.path = None
+
+    @staticmethod
+    def read(path):
+        """Return lock content, or None if not exists"""
+        try:
+            with open(path, "r") as file:
+                content = file.read()
+        except IOError as e:
+            if e.errno == errno.ENOENT:
+                return None
+            raise
+        try:
+            return json.loads(content)
+        except ValueError:
+            # Written by previous version, only has user name
+            return {"owner": content.strip(), "expires": None}
+
+    def _create(self, path):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except OSError as e:
+            if e.errno == errno.EEXIST:
+                return False
+            raise
+        lock = {"owner": self.owner, "expires": time.time() + self.ttl}
+        with os.fdopen(fd, "w") as file:
+            file.write(json.dumps(lock))
+        return True
+
+    def _claim(self, path, force=False):
+        if self._create(path):
+            return True
+
+        lock = self.read(path)
+        if lock is None:
+            return self._create(path)
+
+        expires = lock.get("expires")
+        if (force
+                or lock.get("owner") == self.owner
+                or (expires is not None and expires < time.time())):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return self._create(path)
+
+        return False
+
+    def reserve(self, floor, pin=None):
+        version = floor if pin is None else pin
+
+        while True:
+            dir_path = self.version_dir(version)
+            if not os.path.isdir(dir_path):
+                try:
+                    os.makedirs(dir_path)
+                except OSError as e:
+                    if e.errno != errno.EEXIST:
+                        raise
+
+            path = os.path.join(dir_path, LOCK)
+            if self._claim(path, force=pin is not None):
+                self.version = version
+                self.path = path
+                return version
+
+            version += 1
+
+    def data(self):
+        data = super(LockFileReservation, self).data()
+        data["path"] = self.path
+        return data
+
+
+def release(data, collection=None):
+    """Release a reservation from its data
+
+    Only released if still owned, reservation that was taken by others
+    after expired is left untouched.
+
+    Arguments:
+        data (dict): Reservation data, see `_Reservation.data`
+        collection (optional): Reservation collection of database backend
+
+    """
+    if data["backend"] == DATABASE:
+        collection.delete_one({"key": data["key"],
+                               "version": data["version"],
+                               "owner": data["owner"]})
+
+    elif data["backend"] == LOCKFILE:
+        lock = LockFileReservation.read(data["path"])
+        if lock is not None and lock.get("owner") == data["owner"]:
+            os.remove(data["path"])
+
+    else:
+        raise ValueError("Unknown reservation backend: %r" % data["backend"])
@@ -0,0 +1,32 @@
+
+import sys
+import argparse
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        prog="convert_dump",
+        description="Convert publish dump file between compact format "
+                    "and readable JSON")
+
+    parser.add_argument("src",
+                        type=str,
+                        help="Dump file path, either format.")
+    parser.add_argument("dst",
+                        type=str,
+                        nargs="?",
+                        default="",
+                        help="Output file path, print JSON if not given.")
+    parser.add_argument("-c", "--compact",
+                        action="store_true",
+                        help="Write compact format instead of JSON.")
+
+    args = parser.parse_args(sys.argv[1:])
+
+    from reveries import dumpfile
+
+    if not args.dst:
+        print(dumpfile.to_json(dumpfile.load(args.src)))
+    else:
+        dumpfile.convert(args.src, args.dst, readable=not args.compact)
@@ -2,9 +2,9 @@
 import os
 import sys
 import logging
-import json
 import pyblish.api
 import pyblish.lib
+from reveries import dumpfile
 
 
 def get_plugin(classname):
@@ -23,8 +23,7 @@ def get_plugin(classname):
 def deadline_extract():
     dumps = os.environ["PYBLISH_EXTRACTOR_DUMPS"].split(";")
     for path in dumps:
-        with open(path, "r") as file:
-            data = json.load(file)
+        data = dumpfile.load(path)
 
         args = data["args"]
         kwargs = data["kwargs"]
@@ -0,0 +1,68 @@
+
+import sys
+import argparse
+import logging
+
+
+log = logging.getLogger("reveries.ensure_indexes")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        prog="ensure_indexes",
+        description="Create, verify or audit project collection indexes")
+
+    parser.add_argument("projects",
+                        type=str,
+                        nargs="*",
+                        help="Project names, default all projects.")
+    parser.add_argument("-v", "--verify",
+                        action="store_true",
+                        help="Only report index status.")
+    parser.add_argument("-a", "--audit",
+                        action="store_true",
+                        help="Report query shapes that are collection scan.")
+
+    args = parser.parse_args(sys.argv[1:])
+
+    logging.basicConfig(level=logging.INFO)
+
+    from avalon import io
+    from reveries import indexes, modelprofile
+
+    io.install()
+
+    projects = args.projects or [p["name"] for p in io.projects()]
+    failed = False
+
+    for project in projects:
+        collection = io._database[project]
+
+        if args.verify:
+            for name, state in sorted(indexes.verify(collection).items()):
+                log.info("%s: %s %s" % (project, name, state))
+                failed |= state != indexes.OK
+        elif not args.audit:
+            created = indexes.ensure(collection)
+            log.info("%s: %d indexes created." % (project, len(created)))
+
+        if args.audit:
+            scans = indexes.audit(collection)
+            for label in scans:
+                log.warning("%s: '%s' is a collection scan." % (project,
+                                                                label))
+            failed |= bool(scans)
+
+    # Collections shared by all projects
+    collection = io._database[modelprofile.COLLECTION]
+    if args.verify:
+        status = indexes.verify(collection, modelprofile.INDEXES)
+        for name, state in sorted(status.items()):
+            log.info("%s: %s %s" % (collection.name, name, state))
+            failed |= state != indexes.OK
+    elif not args.audit:
+        created = indexes.ensure(collection, modelprofile.INDEXES)
+        log.info("%s: %d indexes created." % (collection.name, len(created)))
+
+    sys.exit(1 if failed else 0)
@@ -3,7 +3,7 @@ import sys
 import argparse
 import avalon.api
 import pyblish.api
-from reveries import filesys, lib
+from reveries import filesys, lib, reclaim
 
 
 if __name__ == "__main__":
@@ -22,7 +22,8 @@ if __name__ == "__main__":
     parser.add_argument("-u", "--update",
                         type=str,
                         nargs="*",
-                        help="Instance progressive publish output file path.")
+                        help="Instance progressive publish output file path, "
+                             "or frame set like 'beauty.%%04d.exr@1-10'.")
     parser.add_argument("-j", "--jobid",
                         type=str,
                         default="",
@@ -53,5 +54,9 @@ if __name__ == "__main__":
     context = pyblish.api.Context()
     context.data.update(data)
 
-    if lib.publish_remote(context) != 0:
-        raise Exception("FileSys publish failed.")
+    try:
+        if lib.publish_remote(context) != 0:
+            raise Exception("FileSys publish failed.")
+    finally:
+        # Finish background cleanup before process exit
+        reclaim.get_reclaimer().wait()
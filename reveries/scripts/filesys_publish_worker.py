@@ -0,0 +1,44 @@
+
+import os
+import sys
+import argparse
+import logging
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        prog="Pyblish [host:filesys] worker",
+        description="Run progressive publish submissions from local queue")
+
+    parser.add_argument("-q", "--queue",
+                        type=str,
+                        default="",
+                        help="Queue dir path.")
+    parser.add_argument("-i", "--idle",
+                        type=float,
+                        default=None,
+                        help="Exit after idle for this many seconds.")
+
+    args = parser.parse_args(sys.argv[1:])
+
+    from reveries import publishqueue
+
+    queue = publishqueue.SpoolQueue(args.queue or None)
+
+    logging.basicConfig(
+        filename=os.path.join(queue.path, "worker.log"),
+        format="%(asctime)s %(name)-24s: %(levelname)-8s %(message)s",
+        level=logging.INFO,
+    )
+
+    idle_timeout = publishqueue.IDLE_TIMEOUT
+    if args.idle is not None:
+        idle_timeout = args.idle
+
+    worker = publishqueue.Worker(
+        queue,
+        idle_timeout=idle_timeout,
+        heartbeat=os.path.join(queue.path, publishqueue.HEARTBEAT),
+    )
+    worker.run()
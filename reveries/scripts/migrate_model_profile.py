@@ -0,0 +1,120 @@
+import sys
+import argparse
+import logging
+
+
+log = logging.getLogger("reveries.migrate_model_profile")
+
+
+def migrate(project, batch_size=100, dry_run=False):
+    """Move model profile out of representation data into profile store
+
+    `data.modelProfile` and `data.modelProtected` of mayaBinary
+    representations are written into `reveries.modelprofile` collection,
+    then removed from representation.
+
+    Args:
+        project (str): Project name
+        batch_size (int, optional): Representations per bulk write
+        dry_run (bool, optional): Only count representations to migrate
+
+    Returns:
+        int: Count of representations migrated
+
+    """
+    from pymongo import ReplaceOne, UpdateOne
+    from avalon import io
+    from reveries import modelprofile, indexes
+
+    collection = io._database[project]
+    profiles = modelprofile.get_collection()
+
+    if not dry_run:
+        indexes.ensure(profiles, modelprofile.INDEXES)
+
+    cursor = collection.find({"type": "representation",
+                              "name": modelprofile.LEGACY_REPRESENTATION,
+                              "data.modelProfile": {"$exists": True}},
+                             projection={"parent": True,
+                                         "data.modelProfile": True,
+                                         "data.modelProtected": True})
+    profile_requests = list()
+    requests = list()
+    migrated = 0
+
+    def flush():
+        if dry_run:
+            return
+        if profile_requests:
+            profiles.bulk_write(profile_requests, ordered=False)
+        if requests:
+            collection.bulk_write(requests, ordered=False)
+
+    for representation in cursor:
+        version = collection.find_one({"_id": representation["parent"]},
+                                      projection={"parent": True})
+        if version is None:
+            log.warning("Orphan representation skipped: %s"
+                        % representation["_id"])
+            continue
+
+        data = representation["data"]
+        for doc in modelprofile.documents(version["_id"],
+                                          version["parent"],
+                                          data["modelProfile"],
+                                          data.get("modelProtected")):
+            profile_requests.append(
+                ReplaceOne({"version": doc["version"],
+                            "avalonId": doc["avalonId"]},
+                           doc,
+                           upsert=True))
+
+        requests.append(UpdateOne({"_id": representation["_id"]},
+                                  {"$unset": {"data.modelProfile": "",
+                                              "data.modelProtected": ""}}))
+        migrated += 1
+
+        if len(requests) >= batch_size:
+            # Profiles written before removed from representations
+            flush()
+            profile_requests = list()
+            requests = list()
+            log.info("%d representations processed.." % migrated)
+
+    flush()
+
+    return migrated
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        prog="migrate_model_profile",
+        description="Move model profile from representation data into "
+                    "model profile collection")
+
+    parser.add_argument("projects",
+                        type=str,
+                        nargs="+",
+                        help="Project names.")
+    parser.add_argument("-b", "--batch",
+                        type=int,
+                        default=100,
+                        help="Representations per bulk write.")
+    parser.add_argument("-n", "--dry-run",
+                        action="store_true",
+                        help="Only count representations to migrate.")
+
+    args = parser.parse_args(sys.argv[1:])
+
+    logging.basicConfig(level=logging.INFO)
+
+    from avalon import io
+    io.install()
+
+    for project in args.projects:
+        count = migrate(project, args.batch, args.dry_run)
+        log.info("%s: %d representations %s." % (project,
+                                                 count,
+                                                 "to migrate" if args.dry_run
+                                                 else "migrated"))
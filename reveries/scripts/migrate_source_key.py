@@ -0,0 +1,91 @@
+
+import sys
+import argparse
+import logging
+
+
+log = logging.getLogger("reveries.migrate_source_key")
+
+
+def migrate(project, batch_size=1000, dry_run=False):
+    """Backfill `data.sourceKey` of versions and ensure its index
+
+    Args:
+        project (str): Project name
+        batch_size (int, optional): Updates per bulk write
+        dry_run (bool, optional): Only count versions to update
+
+    Returns:
+        int: Count of versions updated
+
+    """
+    from pymongo import UpdateOne
+    from avalon import io
+    from reveries import utils, indexes
+
+    collection = io._database[project]
+
+    if not dry_run:
+        indexes.ensure(collection, [indexes.get("version_source_key")])
+
+    cursor = collection.find({"type": "version",
+                              "data.source": {"$exists": True},
+                              "data.sourceKey": {"$exists": False}},
+                             projection={"data.source": True})
+    requests = list()
+    updated = 0
+
+    for version in cursor:
+        key = utils.source_key(version["data"]["source"], project)
+        if key is None:
+            log.warning("Source not under project, skipped: %s (%s)"
+                        % (version["data"]["source"], version["_id"]))
+            continue
+
+        requests.append(UpdateOne({"_id": version["_id"]},
+                                  {"$set": {"data.sourceKey": key}}))
+        updated += 1
+
+        if len(requests) >= batch_size:
+            if not dry_run:
+                collection.bulk_write(requests, ordered=False)
+            requests = list()
+            log.info("%d versions processed.." % updated)
+
+    if requests and not dry_run:
+        collection.bulk_write(requests, ordered=False)
+
+    return updated
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        prog="migrate_source_key",
+        description="Backfill version source key for indexed lookup")
+
+    parser.add_argument("projects",
+                        type=str,
+                        nargs="+",
+                        help="Project names.")
+    parser.add_argument("-b", "--batch",
+                        type=int,
+                        default=1000,
+                        help="Updates per bulk write.")
+    parser.add_argument("-n", "--dry-run",
+                        action="store_true",
+                        help="Only count versions to update.")
+
+    args = parser.parse_args(sys.argv[1:])
+
+    logging.basicConfig(level=logging.INFO)
+
+    from avalon import io
+    io.install()
+
+    for project in args.projects:
+        count = migrate(project, args.batch, args.dry_run)
+        log.info("%s: %d versions %s." % (project,
+                                          count,
+                                          "to update" if args.dry_run
+                                          else "updated"))
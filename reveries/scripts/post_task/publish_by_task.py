@@ -12,6 +12,11 @@ def __main__(*args):
     This script will run publish on any task completed, if the subset of this
     task already been published, run file integration.
 
+    Set env `PYBLISH_FILESYS_WORKER` to "1" to submit the publish to a
+    local publish worker which coalesces submissions of the same job, see
+    `reveries.publishqueue`. The task will not fail on publish error in
+    that mode, failed submissions are kept in the queue's "failed" dir.
+
     (NOTE) Post task script will not run if task has error.
 
     Args:
@@ -27,7 +32,7 @@ def __main__(*args):
 
     files = get_output_files(job, frames)
 
-    log.info("%d output files collected from %d frames."
+    log.info("%d output sequences collected from %d frames."
              % (len(files), len(frames)))
 
     python = os.getenv("PYBLISH_FILESYS_EXECUTABLE")
@@ -38,6 +43,10 @@ def __main__(*args):
     log.info("Publish script:      %s" % script)
     log.info("Publish dump file:   %s" % dumpfile)
 
+    if os.getenv("PYBLISH_FILESYS_WORKER") == "1":
+        if submit_to_worker(python, script, dumpfile, files, frames, job):
+            return
+
     args = [
         python,
         script,
@@ -46,7 +55,7 @@ def __main__(*args):
         "--progress",
         str(len(frames)),
         "--update",
-        " ".join(files),
+    ] + files + [
         "--jobid",
         job.JobId,
     ]
@@ -59,8 +68,46 @@ def __main__(*args):
         raise Exception("Publish failed, see log..")
 
 
+def submit_to_worker(python, script, dumpfile, files, frames, job):
+    """Submit progress to local publish worker
+
+    Returns:
+        bool: False if publish worker is not available here
+
+    """
+    try:
+        # Needs pyblish and avalon, which may not be importable in
+        # Deadline's Python
+        from reveries import publishqueue
+    except ImportError as e:
+        log.warning("Publish worker not available, run publish in new "
+                    "process: %s" % e)
+        return False
+
+    submission = publishqueue.make_submission(dumpfile,
+                                              files,
+                                              len(frames),
+                                              job.JobId)
+    queue = publishqueue.SpoolQueue()
+    queue.put(submission)
+
+    worker = os.path.join(os.path.dirname(script),
+                          "filesys_publish_worker.py")
+    if publishqueue.ensure_worker(python, worker, queue.path):
+        log.info("Publish worker started.")
+
+    log.info("Progress submitted to publish worker: %s" % queue.path)
+    return True
+
+
 def get_output_files(job, frames):
+    """Return output files of frames as `sequences.FrameSet` strings
+
+    Strings are built here, this script only has the standard library.
+
+    """
     files = list()
+    ranges = format_ranges(frames)
 
     output_directories = job.OutputDirectories
     output_filenames = job.OutputFileNames
@@ -68,13 +115,25 @@ def get_output_files(job, frames):
     for i, dir in enumerate(output_directories):
         file = output_filenames[i]
         file = format_padding(file)
-        for frame in frames:
-            path = os.path.join(dir, file % frame).replace("\\", "/")
-            files.append(path)
+        pattern = os.path.join(dir, file).replace("\\", "/")
+        files.append("%s@%s" % (pattern, ranges))
 
     return files
 
 
+def format_ranges(frames):
+    """Return frames as ranges string, e.g. "1-3,5" for [1, 2, 3, 5]"""
+    parts = list()
+    for frame in sorted(set(int(f) for f in frames)):
+        if parts and parts[-1][1] == frame - 1:
+            parts[-1][1] = frame
+        else:
+            parts.append([frame, frame])
+
+    return ",".join("%d" % start if start == end else "%d-%d" % (start, end)
+                    for start, end in parts)
+
+
 def format_padding(tail):
     padding = tail.count("#")
     if padding:
@@ -0,0 +1,28 @@
+import sys
+import argparse
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        prog="rebuild_frame_manifest",
+        description="Rebuild progressive publish manifest of a version "
+                    "from files on disk")
+
+    parser.add_argument("version_dir",
+                        type=str,
+                        help="Version dir path.")
+    parser.add_argument("--progress",
+                        type=int,
+                        default=None,
+                        help="Progress of rebuilt manifest, keep current "
+                             "progress if not given.")
+
+    args = parser.parse_args(sys.argv[1:])
+
+    from reveries import manifest
+
+    frames = manifest.FrameManifest(args.version_dir)
+    frames.rebuild(step=args.progress)
+    print("Rebuilt, %d files, progress %d."
+          % (len(frames), frames.progress()))
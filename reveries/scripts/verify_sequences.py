@@ -0,0 +1,73 @@
+
+import sys
+import argparse
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        prog="verify_sequences",
+        description="Check render sequences for missing, empty and "
+                    "truncated frames")
+
+    parser.add_argument("root",
+                        type=str,
+                        help="Dir that sequence patterns are relative to.")
+    parser.add_argument("pattern",
+                        type=str,
+                        nargs="+",
+                        help="Sequence file pattern, e.g. "
+                             "'beauty/beauty.%%04d.exr'.")
+    parser.add_argument("-s", "--start",
+                        type=int,
+                        required=True,
+                        help="Expected start frame.")
+    parser.add_argument("-e", "--end",
+                        type=int,
+                        required=True,
+                        help="Expected end frame.")
+    parser.add_argument("--step",
+                        type=int,
+                        default=1,
+                        help="Expected frame step.")
+    parser.add_argument("-w", "--workers",
+                        type=int,
+                        default=16,
+                        help="Max concurrent file checks.")
+    parser.add_argument("--no-exr",
+                        action="store_true",
+                        help="Skip EXR chunk offset check.")
+    parser.add_argument("--strict",
+                        action="store_true",
+                        help="Fail on frames much smaller than their "
+                             "neighbours.")
+    parser.add_argument("--json",
+                        action="store_true",
+                        help="Print report as JSON.")
+
+    args = parser.parse_args(sys.argv[1:])
+
+    import json
+    from reveries import integrity
+
+    patterns = dict(enumerate(args.pattern))
+    report = integrity.verify(args.root,
+                              patterns,
+                              args.start,
+                              args.end,
+                              step=args.step,
+                              workers=args.workers,
+                              check_exr=not args.no_exr)
+
+    if args.json:
+        print(json.dumps(dict((patterns[key], entry)
+                              for key, entry in report.items()),
+                         indent=4,
+                         sort_keys=True))
+    else:
+        for line in integrity.format_report(report,
+                                            patterns,
+                                            strict=args.strict):
+            print(line)
+
+    sys.exit(0 if integrity.is_ok(report, strict=args.strict) else 1)
@@ -0,0 +1,453 @@
+"""Frame sequence lookup on disk and compact frame sets
+
+Checking each frame with `os.path.isfile` costs one stat call per frame
+per AOV, which over NFS is slow on long shots with many AOVs. Instead,
+each directory is listed once (with `os.scandir` when available, which
+does not stat entries) and frame file names are matched against the
+`fpattern` (e.g. "beauty/beauty.%04d.exr") in memory.
+
+Usage:
+    >> index = SequenceIndex(staging_dir)
+    >> report = index.report({"beauty": "beauty/beauty.%04d.exr"},
+    ..                       start=1001, end=1100)
+    >> report["beauty"]["missing"]
+    [1050]
+
+`FrameSet` holds a sequence of frame file paths as pattern and frame
+ranges, for passing long sequences around in instance data, dumps and
+command line arguments. `expand` turns mixed FrameSet/path items back
+into paths.
+
+"""
+import os
+import re
+
+try:
+    from os import scandir as _scandir
+except ImportError:
+    try:
+        from scandir import scandir as _scandir
+    except ImportError:
+        _scandir = None
+
+
+_PADDING = re.compile(r"%0?(\d*)d")
+
+
+def split_pattern(fpattern):
+    """Split file name pattern into (head, padding, tail)
+
+    Arguments:
+        fpattern (str): File name with printf style frame token, e.g.
+            "beauty.%04d.exr"
+
+    Returns:
+        tuple: (head, padding str, tail), e.g. ("beauty.", "%04d", ".exr")
+
+    Raises:
+        ValueError: If no or more than one frame token in pattern
+
+    """
+    tokens = list(_PADDING.finditer(fpattern))
+    if len(tokens) != 1:
+        raise ValueError("Need exactly one frame token: %s" % fpattern)
+    token = tokens[0]
+    return (fpattern[:token.start()],
+            token.group(0),
+            fpattern[token.end():])
+
+
+def listdir_files(dir_path):
+    """Return file names in directory, empty if not exists"""
+    if _scandir is None:
+        try:
+            names = os.listdir(dir_path)
+        except OSError:
+            return set()
+        return set(name for name in names
+                   if not os.path.isdir(os.path.join(dir_path, name)))
+
+    try:
+        entries = _scandir(dir_path)
+    except OSError:
+        return set()
+
+    try:
+        return set(entry.name for entry in entries if entry.is_file())
+    finally:
+        if hasattr(entries, "close"):
+            entries.close()
+
+
+class SequenceIndex(object):
+    """Match frame sequences against cached directory listings
+
+    Each directory is listed at most once per index, create a new index
+    (or `clear`) to see changes on disk.
+
+    Arguments:
+        root (str): Root dir that patterns are relative to
+
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._listings = dict()
+
+    def clear(self):
+        self._listings.clear()
+
+    def listdir(self, dir_path):
+        """Return cached file names of `dir_path` (relative to root)"""
+        dir_path = os.path.normpath(os.path.join(self.root, dir_path))
+        if dir_path not in self._listings:
+            self._listings[dir_path] = listdir_files(dir_path)
+        return self._listings[dir_path]
+
+    def frames(self, fpattern):
+        """Return frames of `fpattern` found on disk
+
+        File name that has the right head and tail but different padding
+        (e.g. "beauty.01.exr" for "%04d") is not a frame of the pattern.
+
+        Arguments:
+            fpattern (str): File path pattern, relative to root
+
+        Returns:
+            dict: {frame number: file name}
+
+        """
+        dir_path, fname = os.path.split(fpattern)
+        head, padding, tail = split_pattern(fname)
+
+        frames = dict()
+        for name in self.listdir(dir_path):
+            if not (name.startswith(head) and name.endswith(tail)):
+                continue
+            digits = name[len(head):len(name) - len(tail)]
+            try:
+                frame = int(digits)
+            except ValueError:
+                continue
+            if padding % frame == digits:
+                frames[frame] = name
+
+        return frames
+
+    def report(self, patterns, start, end, step=1):
+        """Return present, missing and unexpected frames of patterns
+
+        Arguments:
+            patterns (dict): {key: fpattern}, key could be AOV name or
+                (AOV name, stereo side) for example
+            start (int): Expected start frame
+            end (int): Expected end frame, inclusive
+            step (int, optional): Expected frame step, default 1
+
+        Returns:
+            dict: {key: {"present": [frames], "missing": [frames],
+                "unexpected": [frames]}}, frames are sorted, unexpected
+                are frames on disk that are out of expected range.
+
+        """
+        expected = set(range(start, end + 1, step))
+
+        report = dict()
+        for key, fpattern in patterns.items():
+            found = set(self.frames(fpattern))
+            report[key] = {
+                "present": sorted(found & expected),
+                "missing": sorted(expected - found),
+                "unexpected": sorted(found - expected),
+            }
+
+        return report
+
+
+class FrameSet(object):
+    """File sequence as pattern and run-length frame ranges
+
+    Stands for a list of frame file paths (e.g. per-frame outputs), but
+    only holds the pattern and (start, end, step) ranges, so it stays
+    small in instance data, dump files and command line. Iterating gives
+    file paths, same as the list it replaces.
+
+    Arguments:
+        pattern (str): Path pattern with printf style frame token, e.g.
+            "/renders/beauty/beauty.%04d.exr"
+        ranges (list, optional): (start, end, step) tuples, end inclusive
+
+    Example:
+        >> frames = FrameSet.from_frames("beauty.%04d.exr", [1, 2, 3, 5])
+        >> str(frames)
+        'beauty.%04d.exr@1-3,5'
+        >> list(frames)[-1]
+        'beauty.0005.exr'
+
+    """
+
+    _RANGES = re.compile(r"^-?\d+(--?\d+(x\d+)?)?(,-?\d+(--?\d+(x\d+)?)?)*$")
+
+    def __init__(self, pattern, ranges=None):
+        split_pattern(pattern)  # Validate
+        self.pattern = pattern
+        self.ranges = [tuple(r) for r in ranges or []]
+
+    @classmethod
+    def from_frames(cls, pattern, frames):
+        """Create from frame numbers, runs of the same step are merged"""
+        frames = sorted(set(frames))
+        ranges = list()
+
+        index = 0
+        while index < len(frames):
+            start = frames[index]
+            if index + 1 == len(frames):
+                ranges.append((start, start, 1))
+                break
+
+            step = frames[index + 1] - start
+            end = index + 1
+            while (end + 1 < len(frames)
+                   and frames[end + 1] - frames[end] == step):
+                end += 1
+
+            if end == index + 1 and end + 1 < len(frames):
+                # Only two frames in this run, leave the second one to
+                # the next run which may be longer.
+                ranges.append((start, start, 1))
+                index += 1
+                continue
+
+            ranges.append((start, frames[end], step))
+            index = end + 1
+
+        return cls(pattern, ranges)
+
+    def frames(self):
+        """Yield frame numbers in order"""
+        for start, end, step in self.ranges:
+            for frame in range(start, end + 1, step):
+                yield frame
+
+    def __iter__(self):
+        for frame in self.frames():
+            yield self.pattern % frame
+
+    def __len__(self):
+        return sum((end - start) // step + 1
+                   for start, end, step in self.ranges)
+
+    def frame_of(self, path):
+        """Return frame number of a path of this sequence, or None"""
+        head, padding, tail = split_pattern(self.pattern)
+        if not (path.startswith(head) and path.endswith(tail)):
+            return None
+        digits = path[len(head):len(path) - len(tail)]
+        try:
+            frame = int(digits)
+        except ValueError:
+            return None
+        return frame if padding % frame == digits else None
+
+    def __contains__(self, item):
+        frame = item if isinstance(item, int) else self.frame_of(item)
+        if frame is None:
+            return False
+        return any(start <= frame <= end and (frame - start) % step == 0
+                   for start, end, step in self.ranges)
+
+    def __eq__(self, other):
+        return (isinstance(other, FrameSet)
+                and self.pattern == other.pattern
+                and list(self.frames()) == list(other.frames()))
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "FrameSet(%r, %r)" % (self.pattern, self.ranges)
+
+    def _check(self, other):
+        if self.pattern != other.pattern:
+            raise ValueError("Pattern not matched: %s, %s"
+                             % (self.pattern, other.pattern))
+
+    def union(self, other):
+        self._check(other)
+        frames = set(self.frames()) | set(other.frames())
+        return FrameSet.from_frames(self.pattern, frames)
+
+    def difference(self, other):
+        self._check(other)
+        frames = set(self.frames()) - set(other.frames())
+        return FrameSet.from_frames(self.pattern, frames)
+
+    __or__ = union
+    __sub__ = difference
+
+    def map(self, func):
+        """Return a FrameSet of the same ranges with `func(pattern)`"""
+        return FrameSet(func(self.pattern), self.ranges)
+
+    def __str__(self):
+        parts = list()
+        for start, end, step in self.ranges:
+            if start == end:
+                parts.append("%d" % start)
+            elif step == 1:
+                parts.append("%d-%d" % (start, end))
+            else:
+                parts.append("%d-%dx%d" % (start, end, step))
+        return "%s@%s" % (self.pattern, ",".join(parts))
+
+    @classmethod
+    def parse(cls, string):
+        """Create from `str(frameset)`, return None if not a frameset"""
+        pattern, _, ranges = string.rpartition("@")
+        if not (pattern and cls._RANGES.match(ranges)):
+            return None
+        try:
+            split_pattern(pattern)
+        except ValueError:
+            return None
+
+        parsed = list()
+        for part in ranges.split(","):
+            match = re.match(r"^(-?\d+)(?:-(-?\d+)(?:x(\d+))?)?$", part)
+            start = int(match.group(1))
+            end = int(match.group(2) or start)
+            step = int(match.group(3) or 1)
+            parsed.append((start, end, step))
+        return cls(pattern, parsed)
+
+    def to_data(self):
+        """Return JSON/BSON serializable data, see `from_data`"""
+        return {"pattern": self.pattern,
+                "ranges": [list(r) for r in self.ranges]}
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(data["pattern"], data["ranges"])
+
+
+_FRAME_IN_PATH = re.compile(r"^(.*?)(\d+)(\D*)$")
+
+
+def collapse(paths):
+    """Collapse frame file paths into FrameSets
+
+    Paths that do not look like frames are kept as they are.
+
+    Arguments:
+        paths (iterable): File paths
+
+    Returns:
+        list: FrameSet and path string items
+
+    """
+    groups = dict()
+    order = list()
+    loose = list()
+
+    for path in paths:
+        match = _FRAME_IN_PATH.match(path)
+        if match is None:
+            loose.append(path)
+            continue
+        head, digits, tail = match.groups()
+        key = (head, tail)
+        if key not in groups:
+            groups[key] = list()
+            order.append(key)
+        groups[key].append((digits, path))
+
+    items = list()
+    for head, tail in order:
+        members = groups[(head, tail)]
+        lengths = set(len(digits) for digits, _ in members)
+        padded = any(d.startswith("0") and len(d) > 1 for d, _ in members)
+        if len(lengths) == 1 and padded:
+            token = "%%0%dd" % lengths.pop()
+        elif not padded:
+            token = "%d"
+        else:
+            loose += [path for _, path in members]
+            continue
+
+        pattern = head.replace("%", "%%") + token + tail.replace("%", "%%")
+        frames = list()
+        for digits, path in members:
+            if pattern % int(digits) == path:
+                frames.append(int(digits))
+            else:
+                loose.append(path)
+
+        if len(frames) == 1:
+            loose.append(pattern % frames[0])
+        elif frames:
+            items.append(FrameSet.from_frames(pattern, frames))
+
+    return items + loose
+
+
+def expand(items):
+    """Yield file paths from FrameSet, FrameSet string or path items
+
+    Arguments:
+        items (iterable): FrameSet objects, their string form (see
+            `FrameSet.parse`) or plain file paths
+
+    """
+    for item in items or []:
+        if not isinstance(item, FrameSet):
+            item = FrameSet.parse(item) or item
+        if isinstance(item, FrameSet):
+            for path in item:
+                yield path
+        else:
+            yield item
+
+
+def merge(items):
+    """Union FrameSets of the same pattern, remove duplicated paths
+
+    Arguments:
+        items (iterable): FrameSet objects, their string form or paths
+
+    Returns:
+        list: FrameSet and path items, in first seen order
+
+    """
+    merged = list()
+    by_pattern = dict()
+    seen = set()
+
+    for item in items:
+        if not isinstance(item, FrameSet):
+            item = FrameSet.parse(item) or item
+
+        if isinstance(item, FrameSet):
+            if item.pattern in by_pattern:
+                index = by_pattern[item.pattern]
+                merged[index] = merged[index].union(item)
+            else:
+                by_pattern[item.pattern] = len(merged)
+                merged.append(item)
+
+        elif item not in seen:
+            seen.add(item)
+            merged.append(item)
+
+    return merged
+
+
+def map_paths(items, func):
+    """Apply `func` to each path or FrameSet pattern"""
+    return [item.map(func) if isinstance(item, FrameSet) else func(item)
+            for item in items]
+
+
+def first(items):
+    """Return the first file path of items"""
+    return next(expand(items))
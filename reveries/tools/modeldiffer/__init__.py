@@ -1,9 +1,25 @@
-from .app import (
-    show,
-    cli,
-    register_host_profiler,
-    register_host_selector,
-)
+# GUI is imported on call, so `engine` and the command line diff can be
+# used without Qt.
+
+
+def show():
+    from . import app
+    return app.show()
+
+
+def cli():
+    from . import app
+    return app.cli()
+
+
+def register_host_profiler(method):
+    from . import app
+    return app.register_host_profiler(method)
+
+
+def register_host_selector(method):
+    from . import app
+    return app.register_host_selector(method)
 
 
 __all__ = [
@@ -1,5 +1,72 @@
-from . import cli
+import sys
+import argparse
+
+
+def load_profile(source):
+    """Load model profile from JSON file or by version id from database"""
+    import os
+    import json
+
+    if os.path.isfile(source):
+        with open(source, "r") as file:
+            return json.load(file)
+
+    from avalon import io
+    from . import engine
+
+    io.install()
+    profile = engine.profile_from_database(io.ObjectId(source))
+    if profile is None:
+        raise ValueError("Model profile not found: %s" % source)
+    return profile
+
+
+def diff(source_a, source_b, as_json=False):
+    import json
+    from . import engine
+
+    results = engine.diff(load_profile(source_a), load_profile(source_b))
+    report = engine.report(results)
+
+    if as_json:
+        print(json.dumps(report, indent=4, sort_keys=True))
+    else:
+        for mesh in report["meshes"]:
+            state = ("%d%d%d" % (mesh["matchMethod"],
+                                 mesh["points"],
+                                 mesh["uvmap"]))
+            print("%s  %s  %s" % (state,
+                                  mesh[engine.SIDE_A] or "-",
+                                  mesh[engine.SIDE_B] or "-"))
+        print(", ".join("%s: %d" % (key, count) for key, count
+                        in sorted(report["summary"].items())))
+
+    summary = report["summary"]
+    return int(bool(summary["changed"]
+                    or summary["added"]
+                    or summary["removed"]))
+
 
 if __name__ == '__main__':
-    import sys
+
+    parser = argparse.ArgumentParser(
+        prog="modeldiffer",
+        description="Compare model meshes, run GUI if no diff given")
+
+    parser.add_argument("--diff",
+                        nargs=2,
+                        metavar=("A", "B"),
+                        help="Compare two model profiles without GUI, "
+                             "each is a version id or a profile JSON file.")
+    parser.add_argument("--json",
+                        action="store_true",
+                        help="Print diff result as JSON.")
+
+    args = parser.parse_args(sys.argv[1:])
+
+    if args.diff:
+        sys.exit(diff(*args.diff, as_json=args.json))
+
+    # Qt is only needed for GUI
+    from . import cli
     sys.exit(cli())
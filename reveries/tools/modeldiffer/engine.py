@@ -0,0 +1,327 @@
+"""Mesh matching engine of model differ
+
+No Qt, usable from command line. Meshes of one side are matched against
+rows of the other side with hash indexes, in three passes:
+
+    1. Same avalonId (matchMethod 1, or 3 if names are also related)
+    2. Related longName, one path is a suffix of the other (matchMethod 2)
+    3. Same shortName (matchMethod 0)
+
+Each pass takes the first not yet matched row, in row order.
+
+"""
+import logging
+import collections
+
+from ... import meshhash
+
+
+main_logger = logging.getLogger("modeldiffer")
+
+
+SIDE_A = "origin"
+SIDE_B = "contrast"
+
+SIDE_A_DATA = "originData"
+SIDE_B_DATA = "contrastData"
+
+MATCH_ID = 1
+MATCH_NAME = 2
+
+
+def short_name(name):
+    """Return node name without parents and namespace"""
+    return name.rsplit("|", 1)[-1].rsplit(":", 1)[-1]
+
+
+def long_name(name):
+    """Return full path without namespace"""
+    return "|".join(n.rsplit(":", 1)[-1] for n in name.split("|"))
+
+
+def _reversed_path(name):
+    return tuple(reversed(name.strip("|").split("|")))
+
+
+def related(this, that):
+    """Return True if one of the paths is a suffix of the other
+
+    Paths are compared by whole node names, so "|grp|body" and "body" are
+    related but "abody" and "body" are not.
+
+    """
+    this = _reversed_path(this)
+    that = _reversed_path(that)
+    length = min(len(this), len(that))
+    return this[:length] == that[:length]
+
+
+def profile_from_database(version_id):
+    """Return model profile of version from database
+
+    Arguments:
+        version_id (ObjectId): Version id
+
+    Returns:
+        dict: {full path: mesh data}, None if not found
+
+    """
+    from avalon import io
+    from ... import modelprofile
+
+    version = io.find_one({"_id": version_id}, projection={"parent": True})
+    # No need to compare normals
+    model_profile = modelprofile.find(version_id,
+                                      fields=["hierarchy",
+                                              "points",
+                                              "uvmap",
+                                              "hashVersion",
+                                              "legacy"])
+    if model_profile is None:
+        main_logger.critical("Model profile not found. This is a bug.")
+        return
+
+    holder, model_protected = modelprofile.protected_ids(version["parent"])
+    if holder != version_id:
+        model_protected = set()
+
+    profile = dict()
+
+    for id, meshes in model_profile.items():
+        # Currently, meshes with duplicated id are not supported,
+        # and may remain unsupported in the future.
+        data = meshes[0]
+
+        name = data.pop("hierarchy")
+        data.pop("normals", None)
+
+        data["avalonId"] = id
+        data["protected"] = id in model_protected
+
+        profile[name] = data
+
+    return profile
+
+
+def entries(profile, host=False):
+    """Return side data of each mesh in profile, sorted by name
+
+    Arguments:
+        profile (dict): Model profile, {full path: mesh data}
+        host (bool, optional): Whether profile is from host
+
+    Returns:
+        list: Side data dicts
+
+    """
+    sides = list()
+    for name, data in (profile or {}).items():
+        sides.append({
+            "fullPath": name,
+            "fromHost": host,
+            "shortName": short_name(name),
+            "longName": long_name(name),
+            "avalonId": data["avalonId"],
+            "protected": data.get("protected"),
+            "points": data["points"],
+            "uvmap": data.get("uvmap", ""),
+            "hashVersion": meshhash.digest_version(data),
+            "legacy": data.get("legacy"),
+        })
+
+    sides.sort(key=lambda d: d["longName"] + d["fullPath"])
+    return sides
+
+
+def compare(side_a, side_b):
+    """Return (points, uvmap) equality of two side data as int"""
+    # Compare in the older digest version if not the same, the side
+    # from host may provide legacy digests.
+    version_a = side_a["hashVersion"]
+    version_b = side_b["hashVersion"]
+    if version_a > version_b:
+        side_a = side_a.get("legacy") or side_a
+    elif version_b > version_a:
+        side_b = side_b.get("legacy") or side_b
+
+    return (int(side_a.get("points") == side_b.get("points")),
+            int(side_a.get("uvmap", "") == side_b.get("uvmap", "")))
+
+
+class _Index(object):
+    """Row positions by key, in row order, skipping matched rows"""
+
+    def __init__(self, matched):
+        self._queues = dict()
+        self._matched = matched
+
+    def add(self, key, position):
+        self._queues.setdefault(key, collections.deque()).append(position)
+
+    def first(self, key):
+        queue = self._queues.get(key)
+        if not queue:
+            return None
+        while queue and queue[0] in self._matched:
+            queue.popleft()
+        return queue[0] if queue else None
+
+
+def match(rows, sides):
+    """Match side data to rows
+
+    Arguments:
+        rows (list): Dicts of other side with keys "name" (longName),
+            "id" (avalonId) and "shortName"
+        sides (list): Side data from `entries`
+
+    Returns:
+        tuple: List of (row position, side data, matchMethod) and list of
+            side data that has no match
+
+    """
+    matched = set()
+    by_id = _Index(matched)
+    by_path = _Index(matched)  # Full path
+    by_suffix = _Index(matched)  # Every path suffix
+    by_short = _Index(matched)
+
+    paths = list()
+    for position, row in enumerate(rows):
+        path = _reversed_path(row["name"])
+        paths.append(path)
+
+        by_id.add(row["id"], position)
+        by_path.add(path, position)
+        for length in range(1, len(path) + 1):
+            by_suffix.add(path[:length], position)
+        by_short.add(row["shortName"], position)
+
+    pairs = list()
+    remains = list()
+
+    def take(position, data, state):
+        matched.add(position)
+        pairs.append((position, data, state))
+
+    # Matching avalonId & longName
+    for data in sides:
+        position = by_id.first(data["avalonId"])
+        if position is None:
+            remains.append(data)
+            continue
+
+        path = _reversed_path(data["longName"])
+        length = min(len(path), len(paths[position]))
+        state = MATCH_ID
+        if path[:length] == paths[position][:length]:
+            state |= MATCH_NAME
+        take(position, data, state)
+
+    # Try matching only by longName
+    sides, remains = remains, list()
+    for data in sides:
+        path = _reversed_path(data["longName"])
+        # Rows that this path is a suffix of, or that are a suffix of
+        # this path
+        candidates = [by_suffix.first(path)]
+        candidates += [by_path.first(path[:length])
+                       for length in range(1, len(path))]
+        candidates = [p for p in candidates if p is not None]
+        if candidates:
+            take(min(candidates), data, MATCH_NAME)
+        else:
+            remains.append(data)
+
+    # Finally, try matching by shortName
+    sides, remains = remains, list()
+    for data in sides:
+        position = by_short.first(data["shortName"])
+        if position is None:
+            remains.append(data)
+        else:
+            take(position, data, 0)
+
+    return pairs, remains
+
+
+def diff(profile_a, profile_b, host_a=False, host_b=False):
+    """Match and compare meshes of two model profiles
+
+    Arguments:
+        profile_a (dict): Origin side model profile
+        profile_b (dict): Contrast side model profile
+        host_a (bool, optional): Whether origin profile is from host
+        host_b (bool, optional): Whether contrast profile is from host
+
+    Returns:
+        list: Dicts of SIDE_A_DATA, SIDE_B_DATA (None if no match),
+            "matchMethod", "points" and "uvmap"
+
+    """
+    sides_a = entries(profile_a, host_a)
+    rows = [{"name": data["longName"],
+             "id": data["avalonId"],
+             "shortName": data["shortName"]} for data in sides_a]
+
+    results = [{SIDE_A_DATA: data,
+                SIDE_B_DATA: None,
+                "matchMethod": 0,
+                "points": 0,
+                "uvmap": 0} for data in sides_a]
+
+    pairs, remains = match(rows, entries(profile_b, host_b))
+    for position, data, state in pairs:
+        result = results[position]
+        points, uvmap = compare(result[SIDE_A_DATA], data)
+        result.update({
+            SIDE_B_DATA: data,
+            "matchMethod": state,
+            "points": points,
+            "uvmap": uvmap,
+        })
+
+    for data in remains:
+        results.append({SIDE_A_DATA: None,
+                        SIDE_B_DATA: data,
+                        "matchMethod": 0,
+                        "points": 0,
+                        "uvmap": 0})
+    return results
+
+
+def report(results):
+    """Return diff results as JSON serializable data
+
+    Returns:
+        dict: "meshes" list of per mesh diff, and "summary" counts
+
+    """
+    meshes = list()
+    summary = collections.Counter()
+    for result in results:
+        side_a = result[SIDE_A_DATA]
+        side_b = result[SIDE_B_DATA]
+        mesh = {
+            SIDE_A: side_a and side_a["fullPath"],
+            SIDE_B: side_b and side_b["fullPath"],
+            "avalonId": (side_a or side_b)["avalonId"],
+            "matchMethod": result["matchMethod"],
+            "points": result["points"],
+            "uvmap": result["uvmap"],
+        }
+        meshes.append(mesh)
+
+        if side_a is None:
+            summary["added"] += 1
+        elif side_b is None:
+            summary["removed"] += 1
+        elif result["points"] and result["uvmap"]:
+            summary["unchanged"] += 1
+        else:
+            summary["changed"] += 1
+
+    for key in ("unchanged", "changed", "added", "removed"):
+        summary.setdefault(key, 0)
+
+    return {"meshes": meshes, "summary": dict(summary)}
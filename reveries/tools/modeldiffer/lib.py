@@ -1,9 +1,9 @@
 
 import logging
-from avalon import io
 from avalon.vendor import qtawesome
 from avalon.tools import lib, delegates
 from ... import lib as reveries_lib
+from . import engine
 
 
 main_logger = logging.getLogger("modeldiffer")
@@ -22,41 +22,7 @@ def icon(name, color=None):
     return qtawesome.icon("fa.{}".format(name), color=color)
 
 
-def profile_from_database(version_id):
-    """
-    """
-    representation = io.find_one({"type": "representation",
-                                  "name": "mayaBinary",
-                                  "parent": version_id})
-    if representation is None:
-        main_logger.critical("Representation not found. This is a bug.")
-        return
-
-    model_profile = representation["data"].get("modelProfile")
-    model_protected = representation["data"].get("modelProtected", [])
-
-    if model_profile is None:
-        main_logger.critical("'data.modelProfile' not found."
-                             "This is a bug.")
-        return
-
-    profile = dict()
-
-    for id, meshes in model_profile.items():
-        # Currently, meshes with duplicated id are not supported,
-        # and may remain unsupported in the future.
-        data = meshes[0]
-
-        name = data.pop("hierarchy")
-        # No need to compare normals
-        data.pop("normals")
-
-        data["avalonId"] = id
-        data["protected"] = id in model_protected
-
-        profile[name] = data
-
-    return profile
+profile_from_database = engine.profile_from_database
 
 
 profile_from_host = NotImplemented
@@ -5,17 +5,12 @@ from avalon.tools import models
 from avalon.vendor.Qt import Qt, QtGui, QtCore
 from avalon import api, io
 
-from . import lib
+from . import lib, engine
+from .engine import SIDE_A, SIDE_B, SIDE_A_DATA, SIDE_B_DATA
 
 main_logger = logging.getLogger("modeldiffer")
 
 
-SIDE_A = "origin"
-SIDE_B = "contrast"
-
-SIDE_A_DATA = "originData"
-SIDE_B_DATA = "contrastData"
-
 SIDE_COLOR = {
     SIDE_A: "#76D7C4",
     SIDE_B: "#E59866",
@@ -172,11 +167,10 @@ class ComparerItem(models.Item):
         })
 
     def compare(self):
-        side_a = self[SIDE_A_DATA]
-        side_b = self[SIDE_B_DATA]
+        points, uvmap = engine.compare(self[SIDE_A_DATA], self[SIDE_B_DATA])
         self.update({
-            "points": int(side_a["points"] == side_b["points"]),
-            "uvmap": int(side_a["uvmap"] == side_b["uvmap"]),
+            "points": points,
+            "uvmap": uvmap,
         })
 
 
@@ -209,102 +203,44 @@ class ComparerModel(models.TreeModel):
         return result
 
     def refresh_side(self, side, profile, host=False):
-        profile = profile or dict()
+        sides = engine.entries(profile, host)
+
+        # Rebuild rows in one reset, per row insert/remove signals stall
+        # the view when there are many meshes.
+        self.beginResetModel()
+        self._focused_indexes = {SIDE_A: None, SIDE_B: None}
 
         items = self._root_item.children()
-        root_index = QtCore.QModelIndex()
 
         # Remove previous data of this side
 
-        to_remove = list()
+        kept = list()
         for item in items:
             if item.has_other(side):
                 item.pop_this(side)
-            else:
-                to_remove.append(item)
-
-        for item in to_remove:
-            row = item.row()
-            self.beginRemoveRows(root_index, row, row)
-            items.remove(item)
-            self.endRemoveRows()
+                kept.append(item)
+        items[:] = kept
 
         # Place new data
 
-        not_matched_items = list(items)
-        not_matched_data = list()
-
-        def short(name):  # No namespace
-            return name.rsplit("|", 1)[-1].rsplit(":", 1)[-1]
-
-        def long(name):  # No namespace
-            return "|".join(n.rsplit(":", 1)[-1] for n in name.split("|"))
-
-        def related(this, that):
-            return this == that or this.endswith(that) or that.endswith(this)
-
-        for name, data in profile.items():
-            data = {
-                "fullPath": name,
-                "fromHost": host,
-                "shortName": short(name),
-                "longName": long(name),
-                "avalonId": data["avalonId"],
-                "protected": data.get("protected"),
-                "points": data["points"],
-                "uvmap": data.get("uvmap", ""),
-            }
-            not_matched_data.append(data)
-
-        not_matched_data.sort(key=lambda d: d["longName"] + d["fullPath"])
-
-        for data in list(not_matched_data):
-            # Matching avalonId & longName
-            state = 0
-            for item in not_matched_items:
-                if item.id == data["avalonId"]:
-                    state |= 1
-
-                    if related(item.name, data["longName"]):
-                        state |= 2
-
-                if state:
-                    not_matched_items.remove(item)
-                    not_matched_data.remove(data)
-                    item.add_this(side, data, matched=state)
-                    item.compare()
-                    break
-
-        for data in list(not_matched_data):
-            # Try matching only by longName
-            state = 0
-            for item in not_matched_items:
-
-                if related(item.name, data["longName"]):
-                    state |= 2
-                    not_matched_items.remove(item)
-                    not_matched_data.remove(data)
-                    item.add_this(side, data, matched=state)
-                    item.compare()
-                    break
-
-        for data in not_matched_data:
-            # Finally, try matching by shortName
-            for item in not_matched_items:
-                other_side = item[item.get_other(side)]
-
-                if other_side["shortName"] == data["shortName"]:
-                    not_matched_items.remove(item)
-                    item.add_this(side, data, matched=0)
-                    item.compare()
-                    break
-            else:
-                item = ComparerItem(data["longName"], data["avalonId"])
-                item.add_this(side, data)
-                last = self.rowCount(root_index)
-                self.beginInsertRows(root_index, last, last)
-                self.add_child(item)
-                self.endInsertRows()
+        rows = [{"name": item.name,
+                 "id": item.id,
+                 "shortName": item[item.get_other(side)]["shortName"]}
+                for item in items]
+
+        pairs, remains = engine.match(rows, sides)
+
+        for position, data, state in pairs:
+            item = items[position]
+            item.add_this(side, data, matched=state)
+            item.compare()
+
+        for data in remains:
+            item = ComparerItem(data["longName"], data["avalonId"])
+            item.add_this(side, data)
+            self.add_child(item)
+
+        self.endResetModel()
 
     def set_fouced(self, side, index):
         self._focused_indexes[side] = index
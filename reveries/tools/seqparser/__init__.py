@@ -1,6 +1,17 @@
 
 from .command import ls_sequences, save_cache, load_cache
-from .app import show, show_on_stray
+
+
+# GUI is imported on call, so sequence discovery can be used without Qt.
+
+def show(callback=None, with_keys=None, parent=None):
+    from . import app
+    return app.show(callback=callback, with_keys=with_keys, parent=parent)
+
+
+def show_on_stray(root, sequences, framerange, parent=None):
+    from . import app
+    return app.show_on_stray(root, sequences, framerange, parent=parent)
 
 
 __all__ = [
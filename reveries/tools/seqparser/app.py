@@ -9,7 +9,7 @@ from avalon import style
 from ...lib import pindict
 from ... import plugins
 from .. import widgets as tool_widgets
-from . import widgets, command
+from . import widgets, command, discovery
 
 
 module = sys.modules[__name__]
@@ -212,7 +212,7 @@ class Window(QtWidgets.QDialog):
     def ls_sequences(self, path):
         min_length = 1 if self.is_single else 2
 
-        sequences = list()
+        count = 0
         max_sequence = 50
         # Pop up a progress dialog for interruption
         with tool_widgets.Interrupter(
@@ -222,14 +222,25 @@ class Window(QtWidgets.QDialog):
                 minimum=0,
                 maximum=10,  # Don't know where is the end
         ) as progress:
-            # (TODO) Run in worker thread
+            self.add_sequences([])
+
+            scan = discovery.Discovery(path, min_length=min_length)
+            scan.start()
+
+            while not scan.done:
+                # Wait shortly so the dialog stays responsive
+                sequences = scan.poll(timeout=0.1)
+                progress.bump()
 
-            for i, item in enumerate(command.ls_sequences(path,
-                                                          min_length)):
                 if progress.is_canceled():
+                    scan.cancel()
                     return
 
-                if i > max_sequence:
+                if not sequences:
+                    continue
+
+                count += len(sequences)
+                if count > max_sequence:
                     # Prompt dialog asking continue the process or not
                     respond = plugins.message_box_warning(
                         title="Warning",
@@ -241,15 +252,14 @@ class Window(QtWidgets.QDialog):
                         # Double it
                         max_sequence += max_sequence
                     else:
+                        scan.cancel()
                         return
 
-                sequences.append(item)
-                progress.bump()  # Also keep dialog responsive
-
-        self.add_sequences(sequences)
+                # Fill in progressively
+                self.add_sequences(sequences, clear=False)
 
-    def add_sequences(self, sequences):
-        self.data["sequences"]["view"].add_sequences(sequences)
+    def add_sequences(self, sequences, clear=True):
+        self.data["sequences"]["view"].add_sequences(sequences, clear)
 
     def on_nhead_changed(self, head):
         tail = self.data["sequences"]["nTail"].text()
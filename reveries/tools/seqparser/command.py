@@ -2,6 +2,7 @@
 import os
 import json
 from avalon.vendor import clique
+from .discovery import Discovery
 
 
 def assemble(root, files, min_length=2):
@@ -42,41 +43,23 @@ def assemble(root, files, min_length=2):
     }
 
 
-def ls_sequences(path, min_length=2):
+def ls_sequences(path, min_length=2, cache=False):
+    """Yield sequences found under `path`
 
-    patterns = [
-        clique.PATTERNS["frames"],
-        clique.DIGITS_PATTERN,
-    ]
+    Directories are scanned in parallel, see `discovery.Discovery`.
+
+    Arguments:
+        path (str): Root dir to scan
+        min_length (int, optional): Minimum frames of a sequence
+        cache (bool, optional): Use and save per-directory scan cache in
+            `path`, default False.
 
-    for root, dirs, files in os.walk(path):
-        collections, remainder = clique.assemble(files,
-                                                 patterns=patterns,
-                                                 minimum_items=min_length)
-        for collection in collections:
-            indexes = list(collection.indexes)
-
-            head = collection.head
-            padding = collection.padding
-            tail = collection.tail
-            start = indexes[0]
-            end = indexes[-1]
-
-            relative = os.path.relpath(root, path).replace("\\", "/")
-            relative = "" if relative == "." else (relative + "/")
-            frame_str = "%%0%dd" % padding
-            fpattern = "%s%s%s%s" % (relative, head, frame_str, tail)
-
-            yield {
-                "root": path.replace("\\", "/"),
-                "head": head,
-                "padding": padding,
-                "paddingStr": frame_str,
-                "tail": tail,
-                "fpattern": fpattern,
-                "start": start,
-                "end": end,
-            }
+    """
+    discovery = Discovery(path,
+                          min_length=min_length,
+                          cache=None if cache else False)
+    for item in discovery:
+        yield item
 
 
 CACHE_FILE_NAME = ".sequences.json"
@@ -0,0 +1,359 @@
+"""Parallel, incrementally cached sequence discovery
+
+Directories are listed and assembled into sequences by a thread pool,
+sub-dirs are queued as soon as their parent is listed, and found
+sequences are handed out as they come, so a viewer can be filled in
+progressively and the scan can be cancelled at any time.
+
+Results of each directory are cached by directory mtime (which changes
+when entries are added, removed or renamed), so a rescan only lists and
+assembles directories that have been changed. The scan cache is saved
+into `SCAN_CACHE_DIR_NAME` under the scan root, a dir of its own, so
+saving the cache does not change the mtime of the scan root. The cache
+dir is not scanned.
+
+Usage:
+    >> discovery = Discovery(root, min_length=2)
+    >> for sequence in discovery:
+    ..     print(sequence["fpattern"])
+
+    Or non-blocking, e.g. from Qt event loop:
+    >> discovery.start()
+    >> while not discovery.done:
+    ..     sequences = discovery.poll(timeout=0.1)
+    >> discovery.cancel()
+
+"""
+import os
+import json
+import logging
+import threading
+from multiprocessing.pool import ThreadPool
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from avalon.vendor import clique
+
+try:
+    from os import scandir as _scandir
+except ImportError:
+    _scandir = None
+
+
+log = logging.getLogger(__name__)
+
+
+SCAN_CACHE_DIR_NAME = ".sequences.scan"
+SCAN_CACHE_FILE_NAME = "cache.json"
+SCAN_CACHE_VERSION = 1
+
+WORKERS = 8
+
+_PATTERNS = [
+    clique.PATTERNS["frames"],
+    clique.DIGITS_PATTERN,
+]
+
+
+def listdir(dir_path):
+    """Return (sub-dir names, file names) of `dir_path`"""
+    dirs = list()
+    files = list()
+
+    if _scandir is None:
+        for name in os.listdir(dir_path):
+            path = os.path.join(dir_path, name)
+            if os.path.isdir(path) and not os.path.islink(path):
+                dirs.append(name)
+            else:
+                files.append(name)
+        return dirs, files
+
+    entries = _scandir(dir_path)
+    try:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                dirs.append(entry.name)
+            else:
+                files.append(entry.name)
+    finally:
+        if hasattr(entries, "close"):
+            entries.close()
+
+    return dirs, files
+
+
+def assemble_dir(files, min_length=2):
+    """Return sequences (without dir path) assembled from file names"""
+    collections, _ = clique.assemble(files,
+                                     patterns=_PATTERNS,
+                                     minimum_items=min_length)
+    sequences = list()
+    for collection in collections:
+        indexes = list(collection.indexes)
+        sequences.append({
+            "head": collection.head,
+            "padding": collection.padding,
+            "tail": collection.tail,
+            "start": indexes[0],
+            "end": indexes[-1],
+        })
+    return sequences
+
+
+def to_sequence(root, relative, entry):
+    """Return sequence item in `command.ls_sequences` form"""
+    relative = "" if relative == "." else (relative + "/")
+    frame_str = "%%0%dd" % entry["padding"]
+    return {
+        "root": root.replace("\\", "/"),
+        "head": entry["head"],
+        "padding": entry["padding"],
+        "paddingStr": frame_str,
+        "tail": entry["tail"],
+        "fpattern": "%s%s%s%s" % (relative,
+                                  entry["head"],
+                                  frame_str,
+                                  entry["tail"]),
+        "start": entry["start"],
+        "end": entry["end"],
+    }
+
+
+class ScanCache(object):
+    """Per-directory scan results, keyed by relative dir path
+
+    Arguments:
+        path (str): Cache file path, None for in-memory only. Its dir is
+            created right away, before anything is scanned.
+
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = dict()
+        self._lock = threading.Lock()
+        self._changed = False
+
+        if path and not os.path.isdir(os.path.dirname(path)):
+            try:
+                os.makedirs(os.path.dirname(path))
+            except OSError:
+                pass  # e.g. Read-only, save will fail and be logged
+
+        if path and os.path.isfile(path):
+            try:
+                with open(path, "r") as file:
+                    data = json.load(file)
+            except (IOError, ValueError):
+                data = dict()
+            if data.get("version") == SCAN_CACHE_VERSION:
+                self.entries = data.get("entries", {})
+
+    def get(self, relative, mtime, min_length):
+        entry = self.entries.get(relative)
+        if (entry is not None
+                and entry["mtime"] == mtime
+                and entry["minLength"] == min_length):
+            return entry
+        return None
+
+    def put(self, relative, entry):
+        with self._lock:
+            self.entries[relative] = entry
+            self._changed = True
+
+    def prune(self, visited):
+        """Drop entries of dirs that no longer exist"""
+        with self._lock:
+            for relative in set(self.entries) - set(visited):
+                del self.entries[relative]
+                self._changed = True
+
+    def save(self):
+        if not (self.path and self._changed):
+            return
+        data = {"version": SCAN_CACHE_VERSION, "entries": self.entries}
+        temp = self.path + ".tmp"
+        try:
+            with open(temp, "w") as file:
+                json.dump(data, file)
+            if os.path.isfile(self.path):
+                os.remove(self.path)  # Windows can't rename onto
+            os.rename(temp, self.path)
+        except (IOError, OSError) as e:
+            log.warning("Failed to save scan cache: %s" % e)
+        else:
+            self._changed = False
+
+
+class Discovery(object):
+    """Find sequences under root dir in parallel
+
+    Arguments:
+        root (str): Root dir to scan
+        min_length (int, optional): Minimum frames of a sequence
+        workers (int, optional): Number of scanning threads
+        cache (ScanCache, optional): Scan cache, default load from root,
+            pass False to disable.
+
+    """
+
+    def __init__(self, root, min_length=2, workers=WORKERS, cache=None):
+        self.root = root
+        self.min_length = min_length
+        self.workers = workers
+
+        if cache is None:
+            cache = ScanCache(os.path.join(root,
+                                           SCAN_CACHE_DIR_NAME,
+                                           SCAN_CACHE_FILE_NAME))
+        elif cache is False:
+            cache = ScanCache()
+        self.cache = cache
+
+        self.scanned = 0
+        self.reused = 0
+        self._count_lock = threading.Lock()
+
+        self._results = queue.Queue()
+        self._pending = 0
+        self._visited = list()
+        self._canceled = threading.Event()
+        self._pool = None
+        self._started = False
+        self._errors = list()
+
+    @property
+    def done(self):
+        return self._started and self._pool is None
+
+    def _run(self, relative):
+        try:
+            return self._scan(relative)
+        except Exception as e:
+            return e
+
+    def _scan(self, relative):
+        if self._canceled.is_set():
+            return None
+
+        dir_path = os.path.normpath(os.path.join(self.root, relative))
+        try:
+            mtime = os.stat(dir_path).st_mtime
+        except OSError:
+            return None
+
+        entry = self.cache.get(relative, mtime, self.min_length)
+        if entry is not None:
+            with self._count_lock:
+                self.reused += 1
+            return entry
+
+        try:
+            dirs, files = listdir(dir_path)
+        except OSError:
+            return None
+
+        entry = {
+            "mtime": mtime,
+            "minLength": self.min_length,
+            "dirs": sorted(name for name in dirs
+                           if name != SCAN_CACHE_DIR_NAME),
+            "sequences": assemble_dir(files, self.min_length),
+        }
+        self.cache.put(relative, entry)
+        with self._count_lock:
+            self.scanned += 1
+        return entry
+
+    def _submit(self, relative):
+        self._pending += 1
+
+        def callback(entry):
+            self._results.put((relative, entry))
+
+        self._pool.apply_async(self._run, (relative,), callback=callback)
+
+    def start(self):
+        """Start scanning in background threads"""
+        self._started = True
+        self._pool = ThreadPool(self.workers)
+        self._submit(".")
+
+    def poll(self, timeout=None):
+        """Return sequences found since last poll
+
+        Arguments:
+            timeout (float, optional): Seconds to wait for a result, block
+                until next result if None.
+
+        Returns:
+            list: Sequence items, empty if nothing new or done
+
+        """
+        if self._pool is None:
+            return []
+
+        found = list()
+        block = True
+        while self._pending:
+            try:
+                relative, entry = self._results.get(block=block,
+                                                    timeout=timeout)
+            except queue.Empty:
+                break
+            block = False
+            self._pending -= 1
+
+            if isinstance(entry, Exception):
+                self._errors.append(entry)
+                continue
+            if entry is None:
+                continue
+
+            self._visited.append(relative)
+            if not self._canceled.is_set():
+                for name in entry["dirs"]:
+                    sub = name if relative == "." else relative + "/" + name
+                    self._submit(sub)
+
+            for item in entry["sequences"]:
+                found.append(to_sequence(self.root, relative, item))
+
+        if not self._pending:
+            self._finish()
+
+        return found
+
+    def _finish(self):
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+
+        if not self._canceled.is_set():
+            self.cache.prune(self._visited)
+        self.cache.save()
+
+        if self._errors:
+            raise self._errors[0]
+
+    def cancel(self):
+        """Stop scanning, directories already queued are skipped"""
+        self._canceled.set()
+        while self._pool is not None:
+            self.poll()
+
+    def __iter__(self):
+        if not self._started:
+            self.start()
+        try:
+            while not self.done:
+                for item in self.poll():
+                    yield item
+        finally:
+            if not self.done:
+                self.cancel()
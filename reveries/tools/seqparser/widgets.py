@@ -102,9 +102,10 @@ class SequenceWidget(QtWidgets.QWidget):
     def search_channel_name(self, head, tail):
         self.data["model"].search_channel_name(head, tail)
 
-    def add_sequences(self, sequences):
+    def add_sequences(self, sequences, clear=True):
         model = self.data["model"]
-        model.clear()
+        if clear:
+            model.clear()
         for sequence in sequences:
             model.add_sequence(sequence)
 
@@ -0,0 +1,381 @@
+"""Concurrent file transfer for publish integration
+
+Integrating large render publishes is bound by per-file latency to the
+file server rather than bandwidth, so the transfers are planned up front
+and then executed on a bounded thread pool.
+
+Usage:
+    >> plan = TransferPlan()
+    >> plan.add("files", "/stage/a.ma", "/publish/v001/a.ma")
+    >> plan.add("hardlinks", "/stage/b.exr", "/publish/v001/b.exr")
+    >> engine = TransferEngine(workers=8, log=plugin.log)
+    >> engine.run(plan)
+
+"""
+import os
+import json
+import time
+import errno
+import shutil
+import logging
+import threading
+from multiprocessing.pool import ThreadPool
+
+from avalon.vendor import filelink
+
+
+COPY = "files"
+HARDLINK = "hardlinks"
+
+# Errors that may go away on retry when talking to NFS/SMB servers
+TRANSIENT_ERRNO = set(getattr(errno, name) for name in (
+    "EAGAIN",
+    "EBUSY",
+    "EINTR",
+    "EIO",
+    "ESTALE",
+    "ETIMEDOUT",
+    "ECONNRESET",
+    "ECONNABORTED",
+    "EHOSTUNREACH",
+    "ENETRESET",
+    "ENETUNREACH",
+) if hasattr(errno, name))
+
+# Windows network errors (`OSError.winerror`)
+TRANSIENT_WINERROR = set([
+    53,   # ERROR_BAD_NETPATH
+    59,   # ERROR_UNEXP_NET_ERR
+    64,   # ERROR_NETNAME_DELETED
+    121,  # ERROR_SEM_TIMEOUT
+    1231,  # ERROR_NETWORK_UNREACHABLE
+])
+
+
+def normpath(path):
+    return os.path.abspath(os.path.normpath(os.path.expandvars(path)))
+
+
+def is_transient(error):
+    """Is the error worth retrying ?"""
+    if not isinstance(error, EnvironmentError):
+        return False
+    if getattr(error, "winerror", None) in TRANSIENT_WINERROR:
+        return True
+    return error.errno in TRANSIENT_ERRNO
+
+
+class TransferPlan(object):
+    """Collection of unique file transfers
+
+    Destinations are de-duplicated, the first transfer added to one
+    destination wins.
+
+    """
+
+    def __init__(self):
+        self.items = list()
+        self.skipped = list()
+        self.duplicated = list()
+        self._destinations = set()
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def add(self, job, src, dst):
+        """Add one transfer
+
+        Arguments:
+            job (str): Either "files" (copy) or "hardlinks"
+            src (str): Source file path
+            dst (str): Destination file path
+
+        Returns:
+            bool: True if added
+
+        """
+        if job not in (COPY, HARDLINK):
+            raise ValueError("Unknown transfer job: %r" % job)
+
+        src = normpath(src)
+        dst = normpath(dst)
+
+        if src == dst:
+            self.skipped.append((job, src, dst))
+            return False
+
+        if dst in self._destinations:
+            self.duplicated.append((job, src, dst))
+            return False
+
+        self._destinations.add(dst)
+        self.items.append((job, src, dst))
+
+        return True
+
+    def directories(self):
+        """Return unique destination directories"""
+        return sorted(set(os.path.dirname(dst) for _, _, dst in self.items))
+
+
+class TransferEngine(object):
+    """Run `TransferPlan` on a bounded worker pool
+
+    Arguments:
+        workers (int, optional): Max concurrent transfers, default 8
+        retries (int, optional): Max retries on transient error, default 4
+        backoff (float, optional): First retry delay in seconds, doubled on
+            each retry. Default 0.5
+        log (logging.Logger, optional): Logger for progress report
+        report_interval (float, optional): Seconds between progress logs
+        on_done (callable, optional): Called with (job, src, dst) from
+            worker thread after each successful transfer.
+
+    """
+
+    def __init__(self,
+                 workers=8,
+                 retries=4,
+                 backoff=0.5,
+                 log=None,
+                 report_interval=5.0,
+                 on_done=None):
+        self.workers = max(1, workers)
+        self.retries = retries
+        self.backoff = backoff
+        self.log = log or logging.getLogger(__name__)
+        self.report_interval = report_interval
+        self.on_done = on_done
+
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.done = 0
+        self.total = 0
+        self.bytes = 0
+        self.retried = 0
+        self._start = None
+        self._last_report = 0
+
+    def make_dirs(self, plan):
+        for dirname in plan.directories():
+            try:
+                os.makedirs(dirname)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    self.log.critical("An unexpected error occurred.")
+                    raise
+
+    def copy_file(self, src, dst):
+        shutil.copy2(src, dst)
+
+    def hardlink_file(self, src, dst):
+        if os.path.isfile(dst):
+            self.log.warning("File exists, skip creating hardlink: %s" % dst)
+            return
+        filelink.create(src, dst, filelink.HARDLINK)
+
+    def _transfer(self, item):
+        job, src, dst = item
+        delay = self.backoff
+        attempt = 0
+
+        while True:
+            try:
+                if job == COPY:
+                    self.copy_file(src, dst)
+                else:
+                    self.hardlink_file(src, dst)
+                break
+
+            except EnvironmentError as e:
+                if attempt >= self.retries or not is_transient(e):
+                    raise
+                attempt += 1
+                with self._lock:
+                    self.retried += 1
+                self.log.warning("Transfer failed (%s), retry %d/%d in "
+                                 "%.1fs: %s" % (e, attempt, self.retries,
+                                                delay, dst))
+                time.sleep(delay)
+                delay *= 2
+
+        if self.on_done is not None:
+            self.on_done(job, src, dst)
+
+        size = os.path.getsize(dst) if job == COPY else 0
+        with self._lock:
+            self.done += 1
+            self.bytes += size
+            self._report()
+
+    def _report(self, force=False):
+        now = time.time()
+        if not force and now - self._last_report < self.report_interval:
+            return
+        self._last_report = now
+
+        elapsed = max(now - self._start, 1e-6)
+        rate = self.done / elapsed
+        remain = self.total - self.done
+        eta = remain / rate if rate else 0
+        self.log.info("Transferred %d/%d files, %.1f MB/s, %.1f files/s, "
+                      "ETA %ds" % (self.done,
+                                   self.total,
+                                   self.bytes / elapsed / 1024.0 / 1024.0,
+                                   rate,
+                                   eta))
+
+    def run(self, plan):
+        """Execute all transfers in the plan
+
+        Raises the first error that isn't recoverable after all running
+        transfers have finished.
+
+        """
+        self._reset()
+        self.total = len(plan)
+        self._start = time.time()
+        self._last_report = self._start
+
+        if not self.total:
+            return
+
+        self.make_dirs(plan)
+
+        workers = min(self.workers, self.total)
+        if workers == 1:
+            for item in plan:
+                self._transfer(item)
+        else:
+            pool = ThreadPool(workers)
+            try:
+                pool.map(self._transfer, list(plan), chunksize=1)
+            finally:
+                pool.close()
+                pool.join()
+
+        with self._lock:
+            self._report(force=True)
+
+
+JOURNAL = ".transfer.journal"
+
+
+class TransferJournal(object):
+    """Record of completed transfers for resuming interrupted publish
+
+    Journal is a JSON-lines file placed in version dir, first line is
+    the header which holds a publish key (e.g. dump file path), then one
+    line per completed transfer with source file size and mtime.
+
+    If the journal was written by the same publish key, transfers that
+    have been recorded and are still valid can be skipped. Journal from
+    other publish is discarded.
+
+    Arguments:
+        path (str): Journal file path
+        key (str): Identity of the publish, None for not resumable
+
+    """
+
+    FORMAT = 1
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self, path, key):
+        self.path = path
+        self.key = key
+        self.entries = dict()
+
+        self._file = None
+        self._lock = threading.Lock()
+        self._last_flush = 0
+
+        if key is not None:
+            self.entries = self.read(path, key)
+
+    @classmethod
+    def read(cls, path, key):
+        """Return recorded entries by destination if journal key matched"""
+        entries = dict()
+
+        if not os.path.isfile(path):
+            return entries
+
+        with open(path, "r") as file:
+            try:
+                header = json.loads(file.readline())
+            except ValueError:
+                return entries
+
+            if (header.get("format") != cls.FORMAT
+                    or header.get("key") != key):
+                return entries
+
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # Interrupted while writing, ignore the rest
+                entries[entry["dst"]] = entry
+
+        return entries
+
+    def is_done(self, src, dst):
+        """Is the transfer recorded and both files unchanged ?"""
+        entry = self.entries.get(dst)
+        if entry is None or entry["src"] != src:
+            return False
+        try:
+            src_stat = os.stat(src)
+            dst_size = os.path.getsize(dst)
+        except OSError:
+            return False
+
+        return (src_stat.st_size == entry["size"] == dst_size
+                and src_stat.st_mtime == entry["mtime"])
+
+    def record(self, job, src, dst):
+        """Append one completed transfer, thread-safe"""
+        if self.key is None:
+            return
+
+        stat = os.stat(src)
+        entry = {
+            "job": job,
+            "src": src,
+            "dst": dst,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+        }
+        line = json.dumps(entry) + "\n"
+
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self.entries[dst] = entry
+            self._file.write(line)
+
+            now = time.time()
+            if now - self._last_flush > self.FLUSH_INTERVAL:
+                self._file.flush()
+                self._last_flush = now
+
+    def _open(self):
+        # Rewrite with entries that were read, drops any broken line from
+        # previous run.
+        self._file = open(self.path, "w")
+        header = {"format": self.FORMAT, "key": self.key}
+        self._file.write(json.dumps(header) + "\n")
+        for entry in self.entries.values():
+            self._file.write(json.dumps(entry) + "\n")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -1,5 +1,7 @@
 
 import os
+import re
+import stat
 import tempfile
 import hashlib
 import codecs
@@ -7,6 +9,7 @@ import weakref
 import getpass
 import pymongo
 
+from multiprocessing.pool import ThreadPool
 from distutils import dir_util, errors as distutils_err
 
 from avalon import io, Session
@@ -16,6 +19,7 @@ import avalon
 from pyblish_qml.ipc import formatting
 
 from .plugins import message_box_error
+from . import hashcache
 
 
 def stage_dir(prefix=None, dir=None):
@@ -198,6 +202,12 @@ def publish_results_formatting(context):
 
 
 def hash_file(file_path):
+    """Return C4 ID of file content
+
+    Digest is taken from persistent hash cache if the file is unchanged,
+    see `reveries.hashcache`.
+
+    """
     hasher = AssetHasher()
     hasher.add_file(file_path)
     return hasher.digest()
@@ -268,8 +278,13 @@ class _C4Hasher(object):
     def digest(self):
         """Return hash value of data added so far
         """
+        return self.encode(self.hash_obj.digest())
+
+    def encode(self, raw_digest):
+        """Encode raw SHA-512 digest bytes into C4 ID string
+        """
         c4_id_length = 90
-        b58_hash = self._b58encode(self.hash_obj.digest())
+        b58_hash = self._b58encode(raw_digest)
 
         padding = ""
         if len(b58_hash) < (c4_id_length - 2):
@@ -288,6 +303,7 @@ class AssetHasher(_C4Hasher):
         >> hasher = AssetHasher()
         >> hasher.add_file("/path/to/file")
         >> hasher.add_dir("/path/to/dir")
+        >> hasher.add_tree("/path/to/large/dir")  # Parallel, Merkle tree
 
         You can keep adding more assets.
         And get the hash value by
@@ -306,6 +322,29 @@ class AssetHasher(_C4Hasher):
 
     """
 
+    def clear(self):
+        """Start a new hash session
+        """
+        super(AssetHasher, self).clear()
+        # If only one file added, digest could be taken from hash cache
+        # without reading the file, see `reveries.hashcache`.
+        self._pending = None
+        self._updated = False
+
+    def _flush(self):
+        """Read pending file into hash object"""
+        if self._pending is None:
+            return
+
+        chunk_size = self.CHUNK_SIZE
+
+        with open(self._pending, "rb") as file:
+            for chunk in iter(lambda: file.read(chunk_size), b""):
+                self.hash_obj.update(chunk)
+
+        self._pending = None
+        self._updated = True
+
     def add_file(self, file_path):
         """Add one file to hasher
 
@@ -313,11 +352,19 @@ class AssetHasher(_C4Hasher):
             file_path (str): File path string
 
         """
-        chunk_size = self.CHUNK_SIZE
+        self._flush()
+        self._pending = file_path
 
-        with open(file_path, "rb") as file:
-            for chunk in iter(lambda: file.read(chunk_size), b""):
-                self.hash_obj.update(chunk)
+        if self._updated:
+            self._flush()
+
+    def digest(self):
+        """Return hash value of data added so far
+        """
+        if self._pending is not None and not self._updated:
+            return self.encode(digest_file(self._pending))
+
+        return super(AssetHasher, self).digest()
 
     def add_dir(self, dir_path, recursive=True, followlinks=True):
         """Add one directory to hasher
@@ -340,6 +387,189 @@ class AssetHasher(_C4Hasher):
                 path = os.path.join(root, name)
                 self.add_dir(path, recursive=True, followlinks=followlinks)
 
+    def add_tree(self, dir_path, recursive=True, followlinks=True,
+                 workers=None):
+        """Add one directory to hasher as a Merkle tree of file digests
+
+        Unlike `add_dir`, each file under `dir_path` is visited exactly once
+        and hashed concurrently. Per-file digests are combined into one
+        root digest with `merkle_digest`, so the result does not depend on
+        walk order or on how the files were scheduled.
+
+        (NOTE) The value differs from `add_dir` on the same directory, do
+               not compare hashes produced by different modes.
+
+        Arguments:
+            dir_path (str): Directory path string
+            recursive (bool, optional): Add sub-dir as well, default is True
+            followlinks (bool, optional): Add directories pointed to by
+                symlinks, default is True
+            workers (int, optional): Max hashing threads, default is
+                `DIR_HASH_WORKERS`
+
+        """
+        root = hash_tree(dir_path,
+                         recursive=recursive,
+                         followlinks=followlinks,
+                         workers=workers)
+        self._flush()
+        self.hash_obj.update(root)
+        self._updated = True
+
+
+DIR_HASH_WORKERS = 8
+DIR_HASH_CHUNK_SIZE = 1024 * 1024 * 4
+
+
+def walk_files(dir_path, recursive=True, followlinks=True):
+    """Yield each regular file under `dir_path` exactly once
+
+    Directories reached through more than one path (symlinks) are only
+    walked once.
+
+    Arguments:
+        dir_path (str): Directory path string
+        recursive (bool, optional): Walk into sub-dir, default is True
+        followlinks (bool, optional): Walk into directories pointed to by
+            symlinks, default is True
+
+    Yields:
+        (str, str): File path relative to `dir_path` in forward slashes,
+            and the full file path
+
+    """
+    visited = set()
+
+    for root, dirs, files in os.walk(dir_path, followlinks=followlinks):
+        real = os.path.realpath(root)
+        if real in visited:
+            dirs[:] = []
+            continue
+        visited.add(real)
+
+        rel_root = os.path.relpath(root, dir_path).replace("\\", "/")
+        rel_root = "" if rel_root == "." else rel_root + "/"
+
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                if not stat.S_ISREG(os.stat(path).st_mode):
+                    continue
+            except OSError:
+                continue  # Broken link
+            yield rel_root + name, path
+
+        if not recursive:
+            break
+
+
+def digest_file(file_path, chunk_size=DIR_HASH_CHUNK_SIZE, use_cache=True):
+    """Return raw SHA-512 digest bytes of file content
+
+    Reads in large chunks, `hashlib` releases the GIL while updating so
+    this can be run on multiple threads at once.
+
+    Arguments:
+        file_path (str): File path string
+        chunk_size (int, optional): Read size per call
+        use_cache (bool, optional): Lookup and store digest in persistent
+            hash cache, default True
+
+    """
+    def compute(file_path):
+        hash_obj = hashlib.sha512()
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(chunk_size), b""):
+                hash_obj.update(chunk)
+        return hash_obj.digest()
+
+    if use_cache:
+        return hashcache.cached_digest(file_path, compute)
+    return compute(file_path)
+
+
+def merkle_digest(digests):
+    """Combine raw SHA-512 digests into one root digest
+
+    Follows C4 ID of ID set: digests are sorted and de-duplicated, then
+    hashed pairwise (smaller one first) level by level until only one
+    remains. Input order does not matter.
+
+    Arguments:
+        digests (iterable): Raw SHA-512 digest bytes
+
+    Returns:
+        bytes: Root digest, or the digest of empty input if nothing given
+
+    """
+    level = sorted(set(digests))
+    if not level:
+        return hashlib.sha512().digest()
+
+    while len(level) > 1:
+        next_level = list()
+        for i in range(0, len(level) - 1, 2):
+            a, b = sorted(level[i:i + 2])
+            if a == b:
+                next_level.append(a)
+            else:
+                next_level.append(hashlib.sha512(a + b).digest())
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = sorted(next_level)
+
+    return level[0]
+
+
+def hash_tree(dir_path, recursive=True, followlinks=True, workers=None):
+    """Return Merkle root digest of all files under `dir_path`
+
+    Each leaf is the hash of the file's relative path and its content
+    digest, so moving or renaming files changes the result.
+
+    Arguments:
+        dir_path (str): Directory path string
+        recursive (bool, optional): Add sub-dir as well, default is True
+        followlinks (bool, optional): Add directories pointed to by
+            symlinks, default is True
+        workers (int, optional): Max hashing threads, default is
+            `DIR_HASH_WORKERS`
+
+    Returns:
+        bytes: Raw SHA-512 root digest
+
+    """
+    files = list(walk_files(dir_path, recursive, followlinks))
+
+    def leaf(item):
+        rel_path, path = item
+        content = digest_file(path)
+        if not isinstance(rel_path, bytes):
+            rel_path = rel_path.encode("utf-8")
+        return hashlib.sha512(rel_path + b"\0" +
+                              content).digest()
+
+    if len(files) < 2:
+        return merkle_digest(leaf(item) for item in files)
+
+    pool = ThreadPool(min(workers or DIR_HASH_WORKERS, len(files)))
+    try:
+        leaves = pool.map(leaf, files, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+    return merkle_digest(leaves)
+
+
+def hash_dir(dir_path, recursive=True, followlinks=True, workers=None):
+    """Return C4 ID of directory content, see `AssetHasher.add_tree`"""
+    hasher = _C4Hasher()
+    return hasher.encode(hash_tree(dir_path,
+                                   recursive=recursive,
+                                   followlinks=followlinks,
+                                   workers=workers))
+
 
 def get_representation_path_(representation, parents):
     """Get filename from representation document
@@ -563,23 +793,76 @@ class AssetGraber(object):
             raise e
 
 
+def source_key(source, project):
+    """Return normalized key of a source path for indexed lookup
+
+    The key is the lower-cased path relative to project root with forward
+    slashes, e.g. "/assets/char/boy/work/model/maya/scenes/boy_v01.ma".
+    It's the same for published `version.data.source` (which starts with
+    "{root}") and any absolute path of the same file.
+
+    Args:
+        source (str): Source file path
+        project (str): Project name
+
+    Returns:
+        str or None: None if the path is not under project
+
+    """
+    path = source.replace("\\", "/")
+    if project not in path:
+        return None
+    path = path.split(project, 1)[-1]
+    path = "/" + "/".join(part for part in path.split("/") if part)
+    return path.lower()
+
+
+# Whether project has versions without `data.sourceKey`, by project name
+_unmigrated = dict()
+
+
+def has_unmigrated_versions(project):
+    """Are there versions published before `data.sourceKey` exists ?
+
+    Checked once per project in this session, run
+    `reveries.scripts.migrate_source_key` to backfill the key.
+
+    """
+    if project not in _unmigrated:
+        _unmigrated[project] = io.find_one(
+            {"type": "version", "data.sourceKey": {"$exists": False}},
+            projection={"_id": True}) is not None
+    return _unmigrated[project]
+
+
 def get_versions_from_sourcefile(source, project):
     """Get version documents by the source path
 
-    By matching the path with field `version.data.source` to query latest
-    versions.
+    By matching the path with field `version.data.sourceKey` to query latest
+    versions. If the project has versions that were published before the
+    key exists (and not migrated with `reveries.scripts.migrate_source_key`),
+    they are matched with field `version.data.source` by regex as fallback.
 
     Args:
         source (str): A path string where subsets been published from
         project (str): Project name
 
     """
-    source = source.split(project, 1)[-1].replace("\\", "/")
-    source = {"$regex": "/*{}".format(source), "$options": "i"}
-
-    cursor = io.find({"type": "version",
-                      "data.source": source},
-                     sort=[("name", -1)])
+    key = source_key(source, project)
+    cursor = list()
+    if key is not None:
+        cursor = list(io.find({"type": "version",
+                               "data.sourceKey": key},
+                              sort=[("name", -1)]))
+
+    if not cursor and has_unmigrated_versions(project):
+        source = source.split(project, 1)[-1].replace("\\", "/")
+        source = {"$regex": "/*{}".format(re.escape(source)),
+                  "$options": "i"}
+
+        cursor = io.find({"type": "version",
+                          "data.source": source},
+                         sort=[("name", -1)])
     # (NOTE) Each version usually coming from different source file, but
     #        let's not making this assumtion.
     #        So here we filter out other versions that belongs to the same
@@ -0,0 +1,83 @@
+from reveries import doccache
+
+
+class _Database(object):
+    """Minimal in-memory stand-in of `avalon.io`, counts queries"""
+
+    def __init__(self, documents):
+        self.documents = dict((doc["_id"], doc) for doc in documents)
+        self.queries = 0
+
+    def _match(self, doc, filter):
+        for key, value in filter.items():
+            if isinstance(value, dict) and "$in" in value:
+                if doc.get(key) not in value["$in"]:
+                    return False
+            elif doc.get(key) != value:
+                return False
+        return True
+
+    def find(self, filter, projection=None, sort=None):
+        self.queries += 1
+        docs = [dict(doc) for doc in self.documents.values()
+                if self._match(doc, filter)]
+        for field, direction in reversed(sort or []):
+            docs.sort(key=lambda d: d[field], reverse=direction < 0)
+        return docs
+
+    def find_one(self, filter, projection=None, sort=None):
+        docs = self.find(filter, sort=sort)
+        return docs[0] if docs else None
+
+    def update_one(self, filter, update):
+        doc = self.find_one(filter)
+        self.documents[doc["_id"]].update(update["$set"])
+
+
+def test_document_cache():
+    database = _Database([
+        {"_id": 1, "type": "subset", "name": "modelDefault", "parent": 0},
+        {"_id": 2, "type": "version", "name": 1, "parent": 1, "data": {}},
+        {"_id": 3, "type": "version", "name": 2, "parent": 1, "data": {}},
+    ])
+    cache = doccache.DocumentCache(database)
+
+    version = cache.find_one({"_id": 2})
+    assert version["name"] == 1
+    assert cache.find_one({"_id": 2}, projection={"parent": True}) == {
+        "_id": 2, "parent": 1}
+    assert cache.find_one({"_id": 2, "type": "subset"}) is None
+    assert database.queries == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    # Returned documents are copies
+    version["name"] = 5
+    assert cache.find_one({"_id": 2})["name"] == 1
+
+    # Query by filter
+    query = {"type": "version", "parent": 1}
+    latest = cache.find_one(query, sort=[("name", -1)])
+    assert latest["name"] == 2
+    cache.find_one(query, sort=[("name", -1)])
+    assert database.queries == 2
+
+    # Not found is not cached
+    assert cache.find_one({"type": "subset", "name": "rigDefault"}) is None
+    assert cache.find_one({"type": "subset", "name": "rigDefault"}) is None
+    assert database.queries == 4
+
+    # Id in query, fetch only missing ones
+    cache.find({"_id": {"$in": [1, 2, 3]}})
+    assert database.queries == 5
+    docs = cache.find({"_id": {"$in": [3, 2]}}, sort=[("name", 1)])
+    assert [d["_id"] for d in docs] == [2, 3]
+    assert database.queries == 5
+
+    # Write invalidates
+    cache.update_one({"_id": 2}, {"$set": {"name": 9}})
+    assert cache.find_one({"_id": 2})["name"] == 9
+    assert cache.find_one(query, sort=[("name", -1)])["name"] == 9
+
+    stats = cache.stats()
+    assert stats["hits"] == cache.hits
+    assert stats["misses"] == cache.misses
@@ -0,0 +1,53 @@
+import os
+import json
+import datetime
+import tempfile
+
+import bson
+
+from reveries import dumpfile, sequences
+
+
+def test_dump_roundtrip():
+    data = {
+        "id": "e3e4f8a2",
+        "version": 12,
+        "time": datetime.datetime(2020, 5, 1, 12, 30),
+        "assetId": bson.ObjectId(),
+        "repr.mayaBinary._hardlinks": ["/a/b.%04d.exr" % i
+                                       for i in range(100)],
+        "families": set(["reveries.model", "reveries.rig"]),
+        "frames": (1, 100),
+        "func": object,
+        "_progressiveOutput": [
+            sequences.FrameSet("/a/b.%04d.exr", [(1, 100, 1)]),
+        ],
+    }
+
+    blob = dumpfile.dumps(data)
+    assert dumpfile.is_compact(blob)
+
+    loaded = dumpfile.loads(blob)
+    assert loaded["time"] == data["time"]
+    assert loaded["assetId"] == data["assetId"]
+    assert loaded["families"] == data["families"]
+    assert loaded["frames"] == [1, 100]
+    assert loaded["func"] == str(object)
+    assert loaded["_progressiveOutput"] == data["_progressiveOutput"]
+
+    # Readable JSON
+    text = dumpfile.to_json(data)
+    assert json.loads(text)["version"] == 12
+    assert dumpfile.from_json(text) == loaded
+
+    wdir = tempfile.mkdtemp(prefix="test_dumpfile")
+
+    # Plain JSON dump from previous version
+    legacy = os.path.join(wdir, ".instance.json")
+    with open(legacy, "w") as file:
+        json.dump({"id": "e3e4f8a2", "frames": [1, 100]}, file)
+    assert dumpfile.load(legacy)["frames"] == [1, 100]
+
+    compact = os.path.join(wdir, ".instance.dump")
+    dumpfile.convert(legacy, compact)
+    assert dumpfile.load(compact) == dumpfile.load(legacy)
@@ -0,0 +1,145 @@
+import os
+import struct
+import tempfile
+
+from reveries.vendor import parse_exr_header as exrheader
+
+
+def _attr(name, type_, value):
+    return (name.encode() + b"\x00" + type_.encode() + b"\x00"
+            + struct.pack("<i", len(value)) + value)
+
+
+def _header(channels, compression=3, height=100, extra=b""):
+    chlist = b"".join(name.encode() + b"\x00" + struct.pack("<iB3xii",
+                                                            1, 0, 1, 1)
+                      for name in channels) + b"\x00"
+    window = struct.pack("<4i", 0, 0, 199, height - 1)
+    return b"".join([
+        _attr("channels", "chlist", chlist),
+        _attr("compression", "compression", struct.pack("<B", compression)),
+        _attr("dataWindow", "box2i", window),
+        _attr("displayWindow", "box2i", window),
+        _attr("lineOrder", "lineOrder", struct.pack("<B", 0)),
+        _attr("pixelAspectRatio", "float", struct.pack("<f", 1.0)),
+        _attr("owner", "string", b"reveries"),
+        _attr("custom", "someUnknownType", b"\x01\x02\x03"),
+        extra,
+    ]) + b"\x00"
+
+
+def _write(path, version_field, headers, tail=b""):
+    with open(path, "wb") as f:
+        f.write(struct.pack("<iI", exrheader.MAGIC, version_field))
+        f.write(b"".join(headers))
+        f.write(tail)
+
+
+def test_read_exr_header():
+    wdir = tempfile.mkdtemp(prefix="test_exrheader")
+
+    path = os.path.join(wdir, "beauty.exr")
+    _write(path, 2, [_header(["R", "G", "B", "A"])], b"\x00" * 64)
+
+    header = exrheader.read_exr_header(path)
+    assert sorted(header["channels"]) == ["A", "B", "G", "R"]
+    assert header["compression"] == "ZIP_COMPRESSION"
+    assert header["dataWindow"]["yMax"] == 99
+    assert header["owner"] == "reveries"
+    assert header["custom"] is None
+    assert "parts" not in header
+
+    info = exrheader.read_exr_info(path)
+    assert info["headerSize"] == os.path.getsize(path) - 64
+    assert exrheader.chunk_count(info["parts"][0]) == 7  # ZIP, 16 lines
+
+    # Header larger than first read
+    big = os.path.join(wdir, "big.exr")
+    extra = _attr("comments", "string", b"x" * (exrheader.READ_SIZE * 3))
+    _write(big, 2, [_header(["Y"], extra=extra)])
+    assert exrheader.read_exr_header(big)["comments"].startswith("xxx")
+
+
+def test_read_exr_header_multipart():
+    wdir = tempfile.mkdtemp(prefix="test_exrheader")
+
+    path = os.path.join(wdir, "multi.exr")
+    deep = _header(["Z"], extra=_attr("chunkCount", "int",
+                                      struct.pack("<i", 12)))
+    _write(path,
+           2 | exrheader.MULTIPART_FLAG | exrheader.NON_IMAGE_FLAG,
+           [_header(["R", "G", "B"]), deep, b"\x00"])
+
+    info = exrheader.read_exr_info(path)
+    assert info["multipart"] and info["deep"]
+    assert len(info["parts"]) == 2
+    assert exrheader.chunk_count(info["parts"][1]) == 12
+    assert info["headerSize"] == os.path.getsize(path)
+
+    header = exrheader.read_exr_header(path)
+    assert sorted(header["channels"]) == ["B", "G", "R"]
+    assert len(header["parts"]) == 2
+
+
+def test_read_exr_headers_batch():
+    wdir = tempfile.mkdtemp(prefix="test_exrheader")
+
+    paths = list()
+    for i in range(6):
+        path = os.path.join(wdir, "aov%d.exr" % i)
+        _write(path, 2, [_header(["aov%d" % i])])
+        paths.append(path)
+
+    truncated = os.path.join(wdir, "truncated.exr")
+    with open(truncated, "wb") as f:
+        f.write(open(paths[0], "rb").read()[:30])
+    not_exr = os.path.join(wdir, "not.exr")
+    with open(not_exr, "wb") as f:
+        f.write(b"hello world")
+
+    headers = exrheader.read_exr_headers(paths + [truncated, not_exr],
+                                         workers=4)
+    for i, path in enumerate(paths):
+        assert list(headers[path]["channels"]) == ["aov%d" % i]
+    assert isinstance(headers[truncated], exrheader.HeaderError)
+    assert isinstance(headers[not_exr], exrheader.HeaderError)
+
+
+def _frame(path, height=100, data_size=10):
+    """Write scanline EXR with offset table and ZIP chunks"""
+    header = _header(["R", "G", "B"], height=height)
+    count = (height + 15) // 16
+    start = 8 + len(header) + 8 * count
+    chunk = 8 + data_size
+    table = struct.pack("<%dQ" % count,
+                        *[start + i * chunk for i in range(count)])
+    chunks = b"".join(struct.pack("<ii", i * 16, data_size)
+                      + b"\x00" * data_size for i in range(count))
+    _write(path, 2, [header], table + chunks)
+
+
+def test_check_exr_chunks():
+    wdir = tempfile.mkdtemp(prefix="test_exrheader")
+
+    path = os.path.join(wdir, "beauty.exr")
+    _frame(path)
+    assert exrheader.check_exr_chunks(path) is None
+
+    with open(path, "rb") as f:
+        data = f.read()
+
+    truncated = os.path.join(wdir, "truncated.exr")
+    for size, problem in [(len(data) - 4, "last chunk truncated"),
+                          (len(data) - 18, "chunk offset out of file"),
+                          (60, "header incomplete")]:
+        with open(truncated, "wb") as f:
+            f.write(data[:size])
+        assert exrheader.check_exr_chunks(truncated) == problem
+
+    # Offset table reserved but not yet filled
+    info = exrheader.read_exr_info(path)
+    unwritten = os.path.join(wdir, "unwritten.exr")
+    with open(unwritten, "wb") as f:
+        f.write(data[:info["headerSize"]] + b"\x00" * 8
+                + data[info["headerSize"] + 8:])
+    assert exrheader.check_exr_chunks(unwritten) == "chunk not written"
@@ -0,0 +1,73 @@
+import os
+import struct
+import tempfile
+
+from reveries import exrindex
+from reveries.vendor import parse_exr_header as exrheader
+
+
+def _write_exr(path, channels, data_window=(0, 0, 1919, 1079)):
+    def attr(name, type_, value):
+        return (name.encode() + b"\x00" + type_.encode() + b"\x00"
+                + struct.pack("<i", len(value)) + value)
+
+    chlist = b"".join(name.encode() + b"\x00"
+                      + struct.pack("<iB3xii", 1, 0, 1, 1)
+                      for name in channels) + b"\x00"
+    window = struct.pack("<4i", 0, 0, 1919, 1079)
+    data_window = struct.pack("<4i", *data_window)
+
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with open(path, "wb") as f:
+        f.write(struct.pack("<iI", exrheader.MAGIC, 2))
+        f.write(attr("channels", "chlist", chlist))
+        f.write(attr("compression", "compression", b"\x03"))
+        f.write(attr("dataWindow", "box2i", data_window))
+        f.write(attr("displayWindow", "box2i", window))
+        f.write(b"\x00")
+
+
+def test_exrindex():
+    root = tempfile.mkdtemp(prefix="test_exrindex")
+    for frame in [3, 4]:
+        _write_exr(os.path.join(root, "beauty", "beauty.%04d.exr" % frame),
+                   ["R", "G", "B", "A"])
+        _write_exr(os.path.join(root, "crypto", "crypto.%04d.exr" % frame),
+                   ["crypto00.R", "crypto00.G"],
+                   data_window=(100, 50, 899, 549))
+    open(os.path.join(root, "beauty", "beauty.0002.exr"), "w").close()
+
+    index = exrindex.build(root, {
+        "beauty": "beauty/beauty.%04d.exr",
+        "crypto": "crypto/crypto.%04d.exr",
+        "missing": "missing/missing.%04d.exr",
+        "png": "png/png.%04d.png",
+    })
+    # Frame 2 of beauty is broken, indexed from first frame on disk
+    assert set(index) == {"crypto"}
+
+    os.remove(os.path.join(root, "beauty", "beauty.0002.exr"))
+    index = exrindex.build(root, {"beauty": "beauty/beauty.%04d.exr",
+                                  "crypto": "crypto/crypto.%04d.exr"})
+    assert index["beauty"]["channels"] == ["A", "B", "G", "R"]
+    assert index["beauty"]["pixelTypes"]["R"] == "HALF"
+    assert index["beauty"]["compression"] == "ZIP_COMPRESSION"
+    assert index["beauty"]["dataWindow"] == [0, 0, 1919, 1079]
+    assert index["beauty"]["parts"] == 1
+
+    summary = exrindex.summary(index)
+    # Resolution from display window, not the cropped data window
+    assert summary["crypto"] == {"channels": ["crypto00.G", "crypto00.R"],
+                                 "parts": 1,
+                                 "resolution": [1920, 1080],
+                                 "dataWindow": [100, 50, 899, 549]}
+
+    sidecar = os.path.join(root, exrindex.SIDECAR)
+    exrindex.write(sidecar, index)
+    assert exrindex.read(sidecar) == index
+
+    # Rewrite replaces the sidecar in place, no temp file left behind
+    exrindex.write(sidecar, {"beauty": index["beauty"]})
+    assert exrindex.read(sidecar) == {"beauty": index["beauty"]}
+    assert not [name for name in os.listdir(root) if name.endswith(".tmp")]
@@ -0,0 +1,50 @@
+import os
+import tempfile
+
+from reveries import filepattern
+
+
+def _touch(path):
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    open(path, "w").close()
+
+
+def test_find():
+    root = tempfile.mkdtemp(prefix="test_filepattern").replace("\\", "/")
+    for name in ["body.1001.tx",
+                 "body.1002.tx",
+                 "body.100.tx",
+                 "body.1001.tx.bak",
+                 "head_u0_v0.tif",
+                 "head_u1_v0.tif",
+                 "eye[1].1001.tif",
+                 "cloud.1.exr",
+                 "cloud.12.exr",
+                 "cloud.-3.exr"]:
+        _touch(root + "/tex/" + name)
+    os.makedirs(root + "/tex/body.1003.tx")
+
+    expander = filepattern.PatternExpander()
+
+    def names(pattern):
+        return [os.path.basename(path) for path in
+                expander.find(root + "/tex/" + pattern)]
+
+    assert names("body.<UDIM>.tx") == ["body.1001.tx", "body.1002.tx"]
+    assert names("body.<udim>.tx") == ["body.1001.tx", "body.1002.tx"]
+    assert names("head_u<u>_v<v>.tif") == ["head_u0_v0.tif", "head_u1_v0.tif"]
+    assert names("head<tile>.tif") == ["head_u0_v0.tif", "head_u1_v0.tif"]
+    assert names("eye[1].<UDIM>.tif") == ["eye[1].1001.tif"]
+    assert names("cloud.<f>.exr") == ["cloud.-3.exr",
+                                      "cloud.1.exr",
+                                      "cloud.12.exr"]
+    assert names("cloud.1.exr") == ["cloud.1.exr"]
+    assert names("cloud.2.exr") == []
+    assert expander.find(root + "/none/body.<UDIM>.tx") == []
+
+    assert expander.find(root + "/tex/body.<UDIM>.tx")[0] == \
+        root + "/tex/body.1001.tx"
+
+    # Listed once per directory
+    assert len(expander.index._listings) == 2
@@ -0,0 +1,49 @@
+from reveries import indexes
+
+
+class _Collection(object):
+    """Collection stand-in that can not explain, like mongomock"""
+
+    name = "test"
+
+    def __init__(self):
+        self.indexes = {"_id_": {"key": [("_id", 1)]}}
+
+    def index_information(self):
+        return dict(self.indexes)
+
+    def create_index(self, keys, name, **kwargs):
+        self.indexes[name] = dict(kwargs, key=list(keys))
+
+    def find(self, filter):
+        return self
+
+    def sort(self, sort):
+        return self
+
+
+def test_ensure_and_audit_indexes():
+    collection = _Collection()
+
+    status = indexes.verify(collection)
+    assert set(status.values()) == set([indexes.MISSING])
+    assert indexes.audit(collection)
+
+    collection.indexes["type_name"] = {"key": [("name", 1)]}
+    assert indexes.verify(collection)["type_name"] == indexes.MISMATCH
+
+    created = indexes.ensure(collection, dry_run=True)
+    assert "type_name" not in created
+    assert len(collection.indexes) == 2
+
+    indexes.ensure(collection)
+    del collection.indexes["type_name"]
+    assert indexes.ensure(collection) == ["type_name"]
+
+    status = indexes.verify(collection)
+    assert set(status.values()) == set([indexes.OK])
+    assert indexes.audit(collection) == []
+
+    unique = collection.indexes["unique_version"]
+    assert unique["unique"]
+    assert unique["partialFilterExpression"] == {"type": "version"}
@@ -0,0 +1,96 @@
+import os
+import struct
+import tempfile
+
+from reveries import integrity
+from reveries.vendor import parse_exr_header as exrheader
+
+
+def _attr(name, type_, value):
+    return (name.encode() + b"\x00" + type_.encode() + b"\x00"
+            + struct.pack("<i", len(value)) + value)
+
+
+def _frame(path, height=100, data_size=10):
+    """Write scanline EXR with offset table and ZIP chunks"""
+    chlist = b"R\x00" + struct.pack("<iB3xii", 1, 0, 1, 1) + b"\x00"
+    window = struct.pack("<4i", 0, 0, 199, height - 1)
+    header = b"".join([
+        _attr("channels", "chlist", chlist),
+        _attr("compression", "compression", struct.pack("<B", 3)),
+        _attr("dataWindow", "box2i", window),
+        _attr("displayWindow", "box2i", window),
+    ]) + b"\x00"
+    count = (height + 15) // 16
+    start = 8 + len(header) + 8 * count
+    chunk = 8 + data_size
+    with open(path, "wb") as f:
+        f.write(struct.pack("<iI", exrheader.MAGIC, 2))
+        f.write(header)
+        f.write(struct.pack("<%dQ" % count,
+                            *[start + i * chunk for i in range(count)]))
+        for i in range(count):
+            f.write(struct.pack("<ii", i * 16, data_size)
+                    + b"\x00" * data_size)
+
+
+def _sequence(root, name, frames):
+    os.makedirs(os.path.join(root, name))
+    for frame in frames:
+        _frame(os.path.join(root, name, "%s.%04d.exr" % (name, frame)))
+
+
+def test_verify():
+    root = tempfile.mkdtemp(prefix="test_integrity")
+    _sequence(root, "beauty", range(1, 11))
+    _sequence(root, "depth", [1, 2, 3, 5])
+
+    beauty = os.path.join(root, "beauty", "beauty.%04d.exr")
+    with open(beauty % 3, "rb") as f:
+        data = f.read()
+    with open(beauty % 3, "wb") as f:
+        f.write(data[:-4])
+    open(beauty % 4, "w").close()
+
+    patterns = {
+        "beauty": "beauty/beauty.%04d.exr",
+        "depth": "depth/depth.%04d.exr",
+    }
+    report = integrity.verify(root, patterns, 1, 5)
+
+    assert report["beauty"]["corrupted"] == {3: "last chunk truncated"}
+    assert report["beauty"]["empty"] == [4]
+    assert report["beauty"]["missing"] == []
+    assert integrity.bad_frames(report["beauty"]) == [3, 4]
+
+    assert report["depth"]["present"] == [1, 2, 3, 5]
+    assert report["depth"]["missing"] == [4]
+    assert integrity.bad_frames(report["depth"]) == []
+
+    assert not integrity.is_ok(report)
+    assert not integrity.is_ok({"depth": report["depth"]})
+    assert integrity.is_ok({"depth": report["depth"]}, allow_missing=True)
+
+
+def test_small_frames():
+    sizes = dict((frame, 1000) for frame in range(1, 20))
+    sizes[7] = 300
+    sizes[8] = 900
+    assert integrity.small_frames(sizes) == [7]
+    assert integrity.small_frames({1: 10, 2: 1000}) == []
+
+
+def test_small_frames_not_failed():
+    entry = {
+        "present": [1, 2, 3],
+        "missing": [],
+        "empty": [],
+        "small": [2],
+        "corrupted": {},
+    }
+    assert integrity.bad_frames(entry) == []
+    assert integrity.bad_frames(entry, strict=True) == [2]
+    assert integrity.is_ok({"beauty": entry})
+    assert not integrity.is_ok({"beauty": entry}, strict=True)
+    assert integrity.format_report({"beauty": entry})[0] == \
+        "beauty: WARNING (3 present)"
@@ -0,0 +1,96 @@
+import bson
+
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+import reveries.lib
+
+
+def _database():
+    import mongomock
+
+    collection = mongomock.MongoClient().db.project
+    subsets = [bson.ObjectId(), bson.ObjectId()]
+    versions = dict()
+    representations = dict()
+    for subset, names in zip(subsets, [(1, 2, 3), (1, 2)]):
+        for name in names:
+            version = collection.insert_one({"type": "version",
+                                             "parent": subset,
+                                             "name": name}).inserted_id
+            versions[(subset, name)] = version
+            representations[(subset, name)] = collection.insert_one(
+                {"type": "representation", "parent": version}
+            ).inserted_id
+
+    return collection, subsets, representations
+
+
+def _patched(collection):
+    io = mock.patch.multiple("avalon.io",
+                             find=collection.find,
+                             ObjectId=bson.ObjectId,
+                             create=True)
+    lib = mock.patch.object(reveries.lib, "project_collection",
+                            return_value=collection)
+    return io, lib
+
+
+def test_version_status():
+    collection, subsets, representations = _database()
+    io, lib = _patched(collection)
+
+    outdated = representations[(subsets[0], 2)]
+    latest = representations[(subsets[1], 2)]
+    missing = bson.ObjectId()
+    # Representation of a removed version
+    orphan = collection.insert_one({"type": "representation",
+                                    "parent": bson.ObjectId()}).inserted_id
+
+    with io, lib:
+        status = reveries.lib.version_status([str(outdated),
+                                              latest,
+                                              latest,  # Duplicated
+                                              missing,
+                                              orphan])
+
+    assert status[outdated] == {"current": 2, "latest": 3, "missing": False}
+    assert status[latest] == {"current": 2, "latest": 2, "missing": False}
+    assert status[missing] == {"current": None,
+                               "latest": None,
+                               "missing": True}
+    assert status[orphan]["missing"]
+
+    with io, lib:
+        assert reveries.lib.version_status([]) == {}
+
+
+def test_any_outdated():
+    collection, subsets, representations = _database()
+    io, lib = _patched(collection)
+
+    def containers(*keys):
+        return [{"objectName": "container%d" % index,
+                 "representation": str(representations[key])}
+                for index, key in enumerate(keys)]
+
+    host = mock.Mock()
+    registered = mock.patch("avalon.api.registered_host",
+                            return_value=host,
+                            create=True)
+
+    with io, lib, registered:
+        host.ls.return_value = containers((subsets[0], 3),
+                                          (subsets[1], 2))
+        assert not reveries.lib.any_outdated()
+
+        host.ls.return_value = containers((subsets[0], 3),
+                                          (subsets[1], 1))
+        assert reveries.lib.any_outdated()
+
+        # Missing representation is not outdated
+        host.ls.return_value = [{"objectName": "missing",
+                                 "representation": str(bson.ObjectId())}]
+        assert not reveries.lib.any_outdated()
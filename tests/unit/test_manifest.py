@@ -0,0 +1,74 @@
+import os
+import tempfile
+
+from reveries import manifest
+
+
+def _write(path, content):
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def test_frame_manifest():
+    wdir = tempfile.mkdtemp(prefix="test_manifest")
+    stage = os.path.join(wdir, "stage")
+    version_dir = os.path.join(wdir, "v001")
+
+    transfers = list()
+    for i in range(4):
+        src = os.path.join(stage, "beauty.%04d.exr" % i)
+        dst = os.path.join(version_dir, "exr", "beauty.%04d.exr" % i)
+        _write(src, "x" * i)
+        transfers.append((src, dst))
+
+    frames = manifest.FrameManifest(version_dir).load()
+    assert len(frames) == 0
+    assert frames.commit() is None
+
+    for src, dst in transfers[:2]:
+        _write(dst, "x")
+        frames.record(dst, src)
+    frames.commit(step=2)
+
+    # Another run
+    frames = manifest.FrameManifest(version_dir).load()
+    for src, dst in transfers[2:]:
+        frames.record(dst, src)
+    frames.commit(step=2)
+
+    frames = manifest.FrameManifest(version_dir).load()
+    assert frames.progress() == 4
+    assert transfers[0][1] in frames
+    assert frames.integrated([dst for _, dst in transfers]) == \
+        set(dst for _, dst in transfers)
+    assert frames.outdated(transfers) == set()
+
+    # Re-rendered
+    _write(transfers[1][0], "changed")
+    assert frames.outdated(transfers) == {transfers[1][1]}
+
+    frames.remove([transfers[1][1]])
+    frames.commit()
+    frames = manifest.FrameManifest(version_dir).load()
+    assert transfers[1][1] not in frames
+    assert len(frames) == 3
+
+
+def test_frame_manifest_rebuild():
+    wdir = tempfile.mkdtemp(prefix="test_manifest")
+    version_dir = os.path.join(wdir, "v001")
+    for i in range(3):
+        _write(os.path.join(version_dir, "exr", "beauty.%04d.exr" % i), "x")
+    _write(os.path.join(version_dir, ".publish.lock"), "x")
+
+    frames = manifest.FrameManifest(version_dir)
+    frames.commit(step=5)
+    frames.rebuild()
+
+    frames = manifest.FrameManifest(version_dir).load()
+    assert frames.progress() == 5
+    assert sorted(frames.files) == ["exr/beauty.%04d.exr" % i
+                                    for i in range(3)]
+    assert len(os.listdir(frames.path)) == 1
@@ -0,0 +1,84 @@
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+from reveries import meshhash
+
+
+POINTS = [(0.0, 0.0, 0.0, 1.0),
+          (1.0, 0.0, 0.0, 1.0),
+          (0.0, 1.0, -0.5, 1.0)]
+NORMALS = [(0.0, 0.0, 1.0)] * 3
+U_VALUES = [0.0, 1.0, 0.0]
+V_VALUES = [0.0, 0.0, 1.0]
+
+
+def _legacy_reference():
+    """The original per-vertex implementation"""
+    points = normals = uvmap = 0
+    for i, (x, y, z, w) in enumerate(POINTS):
+        x = (x + 1) * 233
+        y = (y + x) * 239
+        z = (z + y) * 241
+        points += (x + y + z) * w + i
+    for i, (x, y, z) in enumerate(NORMALS):
+        x = (x + 1) * 383
+        y = (y + x) * 389
+        z = (z + y) * 397
+        normals += x + y + z + i
+    for i, (u, v) in enumerate(zip(U_VALUES, V_VALUES)):
+        u = (u + 1) * 547
+        v = (v + u) * 557
+        uvmap += u * v + i
+    return {"points": points, "normals": normals, "uvmap": uvmap}
+
+
+def _hash_all(version):
+    return meshhash.hash_mesh(points=POINTS,
+                              normals=NORMALS,
+                              uvs=(U_VALUES, V_VALUES),
+                              version=version)
+
+
+def test_mesh_hash_legacy_compatible():
+    hasher = meshhash.ArrayMeshHasher(version=meshhash.LEGACY_VERSION)
+    hasher.update_points(POINTS)
+    hasher.update_normals(NORMALS)
+    hasher.update_uvmap(U_VALUES, V_VALUES)
+
+    assert hasher._sums == _legacy_reference()
+
+    digest = hasher.digest()
+    assert "hashVersion" not in digest
+    assert meshhash.digest_version(digest) == meshhash.LEGACY_VERSION
+
+
+def test_mesh_hash_content():
+    digest = _hash_all(meshhash.DIGEST_VERSION)
+
+    assert digest["hashVersion"] == meshhash.DIGEST_VERSION
+    assert all(digest[key].startswith("c4") for key in meshhash.CHANNELS)
+
+    # Flat buffer and rows without `w` are the same content
+    flat = [v for point in POINTS for v in point[:3]]
+    assert meshhash.hash_mesh(points=flat)["points"] == digest["points"]
+
+    # Swapping two vertices gives different hash (legacy sum collides)
+    swapped = [POINTS[1], POINTS[0], POINTS[2]]
+    assert meshhash.hash_mesh(points=swapped)["points"] != digest["points"]
+
+    # Negative zero is zero
+    assert (meshhash.hash_mesh(points=[(-0.0, 0.0, 0.0)]) ==
+            meshhash.hash_mesh(points=[(0.0, 0.0, 0.0)]))
+
+
+def test_mesh_hash_without_numpy():
+    expected = _hash_all(meshhash.DIGEST_VERSION)
+
+    with mock.patch.object(meshhash, "numpy", None):
+        assert _hash_all(meshhash.DIGEST_VERSION) == expected
+
+        hasher = meshhash.ArrayMeshHasher(version=meshhash.LEGACY_VERSION)
+        hasher.update_points(POINTS)
+        assert hasher._sums["points"] == _legacy_reference()["points"]
@@ -0,0 +1,78 @@
+import time
+
+from reveries.tools.modeldiffer import engine
+
+
+def _profile(names, ids=None):
+    ids = ids or names
+    return dict((name, {"avalonId": id_, "points": "p",
+                        "uvmap": "uv", "hashVersion": 2})
+                for name, id_ in zip(names, ids))
+
+
+def test_related():
+    assert engine.related("|grp|body", "|grp|body")
+    assert engine.related("|root|grp|body", "|grp|body")
+    assert engine.related("body", "|root|grp|body")
+    assert not engine.related("|grp|abody", "body")
+    assert not engine.related("|a|body", "|b|body")
+
+
+def test_diff():
+    profile_a = _profile(["|root|body", "|root|head", "|root|eye",
+                          "|root|arm"],
+                         ids=["1", "2", "3", "4"])
+    profile_a["|root|arm"]["points"] = "changed"
+    profile_b = _profile(["|ns:root|ns:body",  # Same id and name
+                          "|top|root|head",  # Same id, related name
+                          "|other|eye",  # Only same shortName
+                          "|root|arm",  # Same name, new id
+                          "|root|leg"],  # New
+                         ids=["1", "2", "x", "y", "z"])
+
+    results = engine.diff(profile_a, profile_b)
+    by_a = dict((r[engine.SIDE_A_DATA]["fullPath"], r)
+                for r in results if r[engine.SIDE_A_DATA])
+
+    assert by_a["|root|body"]["matchMethod"] == 3
+    assert by_a["|root|body"]["points"] == 1
+    assert by_a["|root|arm"]["points"] == 0
+    assert by_a["|root|head"]["matchMethod"] == 3
+    assert by_a["|root|eye"][engine.SIDE_B_DATA]["fullPath"] == "|other|eye"
+    assert by_a["|root|eye"]["matchMethod"] == 0
+    assert by_a["|root|arm"]["matchMethod"] == 2
+
+    report = engine.report(results)
+    assert report["summary"] == {"unchanged": 3,
+                                 "changed": 1,
+                                 "added": 1,
+                                 "removed": 0}
+    added = [m for m in report["meshes"] if m[engine.SIDE_A] is None]
+    assert added[0][engine.SIDE_B] == "|root|leg"
+
+
+def test_match_order():
+    # First not yet matched row wins
+    rows = [{"name": "|a|body", "id": "1", "shortName": "body"},
+            {"name": "|b|body", "id": "1", "shortName": "body"}]
+    sides = engine.entries(_profile(["|b|body", "|c|body"], ids=["1", "1"]))
+    pairs, remains = engine.match(rows, sides)
+    assert [(p, d["fullPath"], s) for p, d, s in pairs] == [
+        (0, "|b|body", 1),
+        (1, "|c|body", 1),
+    ]
+    assert remains == []
+
+
+def test_diff_large():
+    names = ["|env|grp%d|mesh%d" % (i // 100, i) for i in range(50000)]
+    profile_a = _profile(names)
+    profile_b = _profile(["|set" + name for name in names],
+                         ids=["new%d" % i for i in range(50000)])
+
+    start = time.time()
+    report = engine.report(engine.diff(profile_a, profile_b))
+    assert time.time() - start < 30
+
+    assert report["summary"]["added"] == 0
+    assert all(m["matchMethod"] == 2 for m in report["meshes"])
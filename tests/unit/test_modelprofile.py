@@ -0,0 +1,96 @@
+from reveries import modelprofile
+
+
+class _Collection(object):
+    """Collection stand-in that matches by field equality"""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, filter, projection=None, sort=None):
+        docs = [doc for doc in self.docs
+                if all(doc.get(k) == v for k, v in filter.items())]
+        for key, direction in reversed(sort or []):
+            docs.sort(key=lambda doc: doc[key], reverse=direction < 0)
+        return iter(docs)
+
+    def find_one(self, filter, projection=None):
+        return next(self.find(filter), None)
+
+
+def _profile(*names):
+    return dict(("id" + name, [{"hierarchy": "|" + name,
+                                "points": "p" + name,
+                                "hashVersion": 2}])
+                for name in names)
+
+
+def test_documents():
+    profile = _profile("a", "b")
+    docs = modelprofile.documents(2, 1, profile, protected=["ida"])
+
+    assert len(docs) == 2
+    assert set(doc["version"] for doc in docs) == {2}
+    assert set(doc["subset"] for doc in docs) == {1}
+    assert [doc["avalonId"] for doc in docs if doc["protected"]] == ["ida"]
+    assert modelprofile.to_profile(docs) == profile
+
+
+def test_find_protected():
+    docs = (modelprofile.documents(1, 1, _profile("a", "b"), ["ida"])
+            + modelprofile.documents(2, 1, _profile("a", "b", "c"),
+                                     ["ida", "idc"])
+            + modelprofile.documents(3, 9, _profile("a"), ["ida"]))
+    collection = _Collection(docs)
+
+    assert modelprofile.find(2, collection=collection) == \
+        _profile("a", "b", "c")
+
+    version, ids = modelprofile.protected_ids(1, collection=collection)
+    assert version == 2
+    assert ids == {"ida", "idc"}
+
+    protected = modelprofile.find_protected(1, collection=collection)
+    assert sorted(protected) == ["|a", "|c"]
+    assert protected["|a"] == {"points": "pa", "hashVersion": 2}
+    # Stored documents are untouched
+    assert docs[0]["meshes"][0]["hierarchy"] == "|a"
+
+
+def test_set_protected_clears_legacy(monkeypatch):
+    import mongomock
+    from avalon import io
+
+    database = mongomock.MongoClient().db
+    monkeypatch.setattr(io, "find", database.avalon.find, raising=False)
+    monkeypatch.setattr(io, "update_many", database.avalon.update_many,
+                        raising=False)
+    collection = database[modelprofile.COLLECTION]
+
+    # Version 1 published before the store, version 2 after
+    database.avalon.insert_many([
+        {"_id": 1, "type": "version", "parent": 9, "name": 1},
+        {"_id": 2, "type": "version", "parent": 9, "name": 2},
+        {"type": "representation", "parent": 1,
+         "name": modelprofile.LEGACY_REPRESENTATION,
+         "data": {"modelProtected": ["ida"]}},
+    ])
+    collection.insert_many(modelprofile.documents(2, 9, _profile("a", "b")))
+    assert modelprofile.protected_ids(9, collection=collection) == \
+        (1, {"ida"})
+
+    modelprofile.set_protected(9, 2, ["idb"], collection=collection)
+    assert modelprofile.protected_ids(9, collection=collection) == \
+        (2, {"idb"})
+
+    # Unprotect all, legacy protection does not come back
+    modelprofile.set_protected(9, 2, [], collection=collection)
+    assert modelprofile.protected_ids(9, collection=collection) == \
+        (None, set())
+    assert modelprofile.find_protected(9, collection=collection) == {}
+
+    # Protect legacy version again, not shadowed by the store
+    modelprofile.set_protected(9, 2, ["ida"], collection=collection)
+    modelprofile.set_protected(9, 1, ["idb"], collection=collection)
+    assert modelprofile.protected_ids(9, collection=collection) == \
+        (1, {"idb"})
@@ -0,0 +1,75 @@
+import os
+import runpy
+
+import bson
+
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+
+PLUGINS = os.path.join(os.path.dirname(__file__), "..", "..", "plugins")
+
+
+def _plugin(path, name):
+    return runpy.run_path(os.path.join(PLUGINS, path))[name]
+
+
+def _find_cycle(graph, dependencies, subset):
+    """Run `find_cycle` on graph {(subset, version): [dependencies]}"""
+    import mongomock
+
+    plugin = _plugin("global/publish/validate_avalon_dependencies.py",
+                     "ValidateAvalonDependencies")()
+    collection = mongomock.MongoClient().db.project
+
+    ids = dict((key, bson.ObjectId()) for key in graph)
+    for key, depends in graph.items():
+        collection.insert_one({
+            "_id": ids[key],
+            "type": "version",
+            "parent": key[0],
+            "name": key[1],
+            "data": {"dependencies": dict((str(ids.get(dep, dep)), {})
+                                          for dep in depends)},
+        })
+
+    with mock.patch("avalon.io.ObjectId", bson.ObjectId, create=True):
+        chain = plugin.find_cycle([str(ids.get(dep, dep))
+                                   for dep in dependencies],
+                                  subset,
+                                  collection)
+    return [(version["parent"], version["name"]) for version in chain]
+
+
+def test_find_cycle_direct():
+    graph = {("model", 1): []}
+    assert _find_cycle(graph, [("model", 1)], "model") == [("model", 1)]
+
+
+def test_find_cycle_indirect():
+    graph = {
+        ("rig", 2): [("look", 1)],
+        ("look", 1): [("model", 3)],
+        ("model", 3): [],
+        ("other", 1): [],
+    }
+    assert _find_cycle(graph, [("other", 1), ("rig", 2)], "model") == [
+        ("rig", 2), ("look", 1), ("model", 3)]
+
+
+def test_find_cycle_diamond():
+    # Shared dependency is not a cycle, and visited once
+    graph = {
+        ("rig", 1): [("model", 1), ("look", 1)],
+        ("look", 1): [("model", 1)],
+        ("model", 1): [],
+    }
+    assert _find_cycle(graph, [("rig", 1), ("look", 1)], "anim") == []
+
+
+def test_find_cycle_missing():
+    # Dependency of a removed version
+    graph = {("rig", 1): [bson.ObjectId()]}
+    assert _find_cycle(graph, [("rig", 1), bson.ObjectId()], "model") == []
@@ -0,0 +1,94 @@
+import os
+import time
+import tempfile
+
+from reveries import publishqueue, sequences
+
+
+def _submission(dump, frames, job_id="job"):
+    files = ["/render/beauty.%04d.exr" % f for f in frames]
+    return publishqueue.make_submission(dump, files, len(frames), job_id,
+                                        environment={})
+
+
+def test_publish_worker_coalesce():
+    published = list()
+
+    def publish(submission):
+        published.append(submission)
+        return submission["dump"] != "bad.dump"
+
+    queue = publishqueue.MemoryQueue()
+    queue.put(_submission("a.dump", [1, 2]))
+    queue.put(_submission("b.dump", [1]))
+    queue.put(_submission("a.dump", [2, 3]))
+    queue.put(_submission("bad.dump", [1]))
+
+    worker = publishqueue.Worker(queue, publish=publish, window=0)
+    assert worker.run_once()
+    assert not worker.run_once()
+
+    assert [s["dump"] for s in published] == ["a.dump", "b.dump", "bad.dump"]
+    assert published[0]["frames"] == 4
+    assert published[0]["files"] == ["/render/beauty.%04d.exr" % f
+                                     for f in (1, 2, 3)]
+    assert worker.published == 2
+    assert worker.failed == 1
+    assert len(queue.failed) == 1
+
+
+def test_spool_queue():
+    path = tempfile.mkdtemp(prefix="test_publishqueue")
+    queue = publishqueue.SpoolQueue(path)
+    queue.put(_submission("a.dump", [1]))
+    queue.put(_submission("a.dump", [2]))
+
+    items = queue.take()
+    assert [s["frames"] for _, s in items] == [1, 1]
+    queue.done(items[0][0])
+
+    # Claims of a live owner are left alone
+    other = publishqueue.SpoolQueue(path, owner="other")
+    assert other.take() == []
+
+    # Unfinished claimed submission is taken again after owner stopped
+    # beating
+    stale = time.time() - publishqueue.HEARTBEAT_TIMEOUT - 1
+    os.utime(os.path.join(path, "claimed", queue.owner), (stale, stale))
+    assert [id_ for id_, _ in other.take()] == [items[1][0]]
+    assert other.take() == []
+    assert not os.path.exists(os.path.join(path, "claimed", queue.owner))
+
+
+def test_acquire_heartbeat():
+    path = tempfile.mkdtemp(prefix="test_publishqueue")
+    heartbeat = os.path.join(path, publishqueue.HEARTBEAT)
+
+    assert publishqueue.acquire(heartbeat)
+    assert not publishqueue.acquire(heartbeat)
+    assert publishqueue.is_worker_alive(path)
+
+    # Left by crashed worker
+    stale = time.time() - publishqueue.HEARTBEAT_TIMEOUT - 1
+    os.utime(heartbeat, (stale, stale))
+    assert not publishqueue.is_worker_alive(path)
+    assert publishqueue.acquire(heartbeat)
+    assert publishqueue.is_worker_alive(path)
+
+
+def test_coalesce_framesets():
+    def frames(start, end):
+        return sequences.FrameSet("/render/beauty.%04d.exr",
+                                  [(start, end, 1)])
+
+    items = [
+        ("1", publishqueue.make_submission("a.dump", [frames(1, 10)], 10,
+                                           "job", environment={})),
+        ("2", publishqueue.make_submission("a.dump", [frames(11, 20)], 10,
+                                           "job", environment={})),
+    ]
+    (ids, merged), = publishqueue.coalesce(items)
+
+    assert ids == ["1", "2"]
+    assert merged["files"] == ["/render/beauty.%04d.exr@1-20"]
+    assert list(sequences.expand(merged["files"])) == list(frames(1, 20))
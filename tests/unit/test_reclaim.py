@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+
+from reveries import reclaim
+
+
+def _make_tree(root, count):
+    os.makedirs(os.path.join(root, "sub"))
+    for i in range(count):
+        with open(os.path.join(root, "sub", "f.%04d" % i), "w") as f:
+            f.write("x" * 10)
+    with open(os.path.join(root, "top"), "w") as f:
+        f.write("x" * 5)
+
+
+def test_reclaimer():
+    wdir = tempfile.mkdtemp(prefix="test_reclaim")
+    version_dir = os.path.join(wdir, "v001")
+    _make_tree(version_dir, 10)
+
+    trash = reclaim.trash_dir_of(os.path.join(version_dir, "sub"))
+
+    # Leftover from crashed process on this host
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    leftover = os.path.join(trash, "%d-%s-%s" % (dead.pid,
+                                                 reclaim._host(),
+                                                 "leftover"))
+    # Left by other host long ago
+    old = os.path.join(trash, "1-otherhost-old")
+    # Being filled by a live process
+    live = os.path.join(trash, "%d-%s-%s" % (os.getpid(),
+                                             reclaim._host(),
+                                             "live"))
+    for path in (leftover, old, live):
+        os.makedirs(path)
+        with open(os.path.join(path, "file"), "w") as f:
+            f.write("x" * 20)
+    past = time.time() - reclaim.RECOVER_AGE - 1
+    os.utime(old, (past, past))
+
+    reclaimer = reclaim.Reclaimer(workers=2)
+    reclaimer.discard([os.path.join(version_dir, "sub"),
+                       os.path.join(version_dir, "top"),
+                       os.path.join(version_dir, "not_exists")])
+
+    # Renamed right away
+    assert not set(os.listdir(version_dir)) - set([reclaim.TRASH])
+
+    reclaimer.wait()
+    assert reclaimer.reclaimed == 10 * 10 + 5 + 20 * 2
+    assert os.listdir(trash) == [os.path.basename(live)]
+
+    # Trash dir removed when empty
+    shutil.rmtree(live)
+    with open(os.path.join(version_dir, "top"), "w") as f:
+        f.write("x" * 5)
+    reclaimer.discard([os.path.join(version_dir, "top")])
+    reclaimer.wait()
+    assert reclaimer.reclaimed == 10 * 10 + 5 * 2 + 20 * 2
+    assert not os.path.exists(trash)
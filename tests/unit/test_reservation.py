@@ -0,0 +1,85 @@
+import os
+import json
+import tempfile
+
+from reveries import reservation
+
+
+def test_lockfile_reservation():
+    root = tempfile.mkdtemp(prefix="test_reservation")
+
+    def version_dir(num):
+        return os.path.join(root, "v%03d" % num)
+
+    a = reservation.LockFileReservation(version_dir, "subset", owner="A")
+    b = reservation.LockFileReservation(version_dir, "subset", owner="B")
+
+    assert a.reserve(1) == 1
+    assert b.reserve(1) == 2
+    # Same owner takes back its own reservation
+    assert a.reserve(1) == 1
+    # Pinned
+    assert b.reserve(1, pin=1) == 1
+    assert a.reserve(1) == 3
+
+    # Lock written by previous version, only has user name
+    os.makedirs(version_dir(4))
+    with open(os.path.join(version_dir(4), reservation.LOCK), "w") as f:
+        f.write("someone")
+    assert reservation.LockFileReservation(version_dir, "subset",
+                                           owner="C").reserve(4) == 5
+
+    # Expired
+    lock = os.path.join(version_dir(5), reservation.LOCK)
+    with open(lock, "w") as f:
+        f.write(json.dumps({"owner": "C", "expires": 0}))
+    assert reservation.LockFileReservation(version_dir, "subset",
+                                           owner="D").reserve(5) == 5
+
+    # Released only if still owned
+    data = a.data()
+    reservation.release(b.data())
+    assert os.path.isfile(data["path"])
+    reservation.release(data)
+    assert not os.path.isfile(data["path"])
+
+
+def test_database_reservation():
+    import mongomock
+
+    collection = mongomock.MongoClient().db[reservation.COLLECTION]
+
+    def reserver(owner, ttl=reservation.DEFAULT_TTL):
+        return reservation.DatabaseReservation(collection, "subset",
+                                               owner=owner, ttl=ttl)
+
+    a = reserver("A")
+    b = reserver("B")
+
+    # Concurrent publishes of the same subset get different versions
+    assert a.reserve(3) == 3
+    assert b.reserve(3) == 4
+    # Same owner takes back its own reservation
+    assert a.reserve(3) == 3
+    # Default owner is unique to each reservation
+    assert reserver(None).reserve(3) == 5
+    assert reserver(None).reserve(3) == 6
+
+    # Pinned, taken regardless of others, and counter moves past it
+    assert reserver("C").reserve(3, pin=9) == 9
+    assert reserver("D").reserve(3) == 10
+
+    # Expired reservation is taken by others
+    expired = reserver("E", ttl=-1)
+    assert expired.reserve(3) == 11
+    assert reserver("F").reserve(3) == 11
+
+    # Released only if still owned
+    reservation.release(expired.data(), collection)
+    assert collection.find_one({"key": "subset", "version": 11})
+    reservation.release(b.data(), collection)
+    assert collection.find_one({"key": "subset", "version": 4}) is None
+
+    # Reservations below floor have been registered, counter follows
+    assert reserver("G").reserve(20) == 20
+    assert collection.find_one({"key": "subset", "version": 11}) is None
@@ -0,0 +1,61 @@
+import os
+import time
+import tempfile
+
+from reveries.tools.seqparser import discovery
+
+
+def _touch(path):
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    open(path, "w").close()
+
+
+def _make_render(root):
+    for layer in ["bg", "chr"]:
+        for aov in ["beauty", "diff", "spec"]:
+            for frame in range(1, 6):
+                _touch(os.path.join(root, layer, aov,
+                                    "%s.%04d.exr" % (aov, frame)))
+
+
+def test_discovery():
+    root = tempfile.mkdtemp(prefix="test_seqparser")
+    _make_render(root)
+    _touch(os.path.join(root, "readme.txt"))
+
+    scan = discovery.Discovery(root, workers=4)
+    found = sorted(item["fpattern"] for item in scan)
+
+    assert len(found) == 6
+    assert "bg/beauty/beauty.%04d.exr" in found
+    assert scan.scanned == 9  # root, 2 layers, 6 aovs
+    assert os.path.isfile(os.path.join(root,
+                                       discovery.SCAN_CACHE_DIR_NAME,
+                                       discovery.SCAN_CACHE_FILE_NAME))
+
+    # Rescan, only changed dir is listed again
+    time.sleep(0.01)
+    _touch(os.path.join(root, "chr", "spec", "spec.0006.exr"))
+    os.utime(os.path.join(root, "chr", "spec"), (time.time() + 10,) * 2)
+
+    scan = discovery.Discovery(root, workers=4)
+    items = dict((item["fpattern"], item) for item in scan)
+
+    assert items["chr/spec/spec.%04d.exr"]["end"] == 6
+    assert items["bg/spec/spec.%04d.exr"]["end"] == 5
+    # Only "chr/spec", saving cache does not touch root
+    assert scan.scanned == 1
+    assert scan.reused == 8
+
+
+def test_discovery_cancel():
+    root = tempfile.mkdtemp(prefix="test_seqparser")
+    _make_render(root)
+
+    scan = discovery.Discovery(root, workers=2, cache=False)
+    scan.start()
+    scan.cancel()
+
+    assert scan.done
+    assert scan.scanned < 9
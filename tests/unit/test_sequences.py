@@ -0,0 +1,84 @@
+import os
+import tempfile
+
+from reveries import sequences
+
+
+def _touch(path):
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    open(path, "w").close()
+
+
+def test_split_pattern():
+    assert sequences.split_pattern("beauty.%04d.exr") == \
+        ("beauty.", "%04d", ".exr")
+    assert sequences.split_pattern("a_%d") == ("a_", "%d", "")
+
+
+def test_sequence_index_report():
+    root = tempfile.mkdtemp(prefix="test_sequences")
+    for frame in [1, 2, 4, 9]:
+        _touch(os.path.join(root, "beauty", "beauty.%04d.exr" % frame))
+    _touch(os.path.join(root, "beauty", "beauty.03.exr"))  # Bad padding
+    _touch(os.path.join(root, "beauty", "beauty.0005.exr.tmp"))
+    for side in ["Left", "Right"]:
+        _touch(os.path.join(root, "diff", "diff_%s.0001.exr" % side))
+
+    index = sequences.SequenceIndex(root)
+    report = index.report({"beauty": "beauty/beauty.%04d.exr",
+                           ("diff", "Left"): "diff/diff_Left.%04d.exr",
+                           ("diff", "Right"): "diff/diff_Right.%04d.exr",
+                           "spec": "spec/spec.%04d.exr"},
+                          start=1,
+                          end=4)
+
+    assert report["beauty"] == {"present": [1, 2, 4],
+                                "missing": [3],
+                                "unexpected": [9]}
+    assert report[("diff", "Left")]["present"] == [1]
+    assert report[("diff", "Right")]["missing"] == [2, 3, 4]
+    assert report["spec"]["missing"] == [1, 2, 3, 4]
+    # Each dir listed once
+    assert len(index._listings) == 3
+
+
+def test_frameset():
+    frames = sequences.FrameSet.from_frames("beauty.%04d.exr",
+                                            [1, 2, 3, 5, 10, 20, 30, 40])
+    assert frames.ranges == [(1, 3, 1), (5, 5, 1), (10, 40, 10)]
+    assert len(frames) == 8
+    assert str(frames) == "beauty.%04d.exr@1-3,5,10-40x10"
+    assert list(frames)[:2] == ["beauty.0001.exr", "beauty.0002.exr"]
+    assert 20 in frames and 21 not in frames
+    assert "beauty.0030.exr" in frames
+    assert "beauty.030.exr" not in frames
+
+    parsed = sequences.FrameSet.parse(str(frames))
+    assert parsed == frames
+    assert sequences.FrameSet.parse("/some/file@3.exr") is None
+    assert sequences.FrameSet.from_data(frames.to_data()) == frames
+
+    other = sequences.FrameSet("beauty.%04d.exr", [(1, 10, 1)])
+    assert list((frames | other).frames()) == \
+        list(range(1, 11)) + [20, 30, 40]
+    assert list((frames - other).frames()) == [20, 30, 40]
+    assert frames.map(lambda p: "/root/" + p).pattern == \
+        "/root/beauty.%04d.exr"
+
+
+def test_collapse_expand():
+    paths = ["/c/a.%04d.vdb" % f for f in range(1, 51)]
+    paths += ["/c/b.%d.vdb" % f for f in range(8, 12)]
+    paths += ["/c/single.0001.abc", "/c/readme.txt"]
+
+    items = sequences.collapse(paths)
+    assert sum(isinstance(i, sequences.FrameSet) for i in items) == 2
+    assert sorted(sequences.expand(items)) == sorted(paths)
+    assert sorted(sequences.expand([str(i) for i in items])) == \
+        sorted(paths)
+
+    merged = sequences.merge(["/c/x.%04d.exr@1-5", "/c/x.%04d.exr@6-9",
+                              "/c/readme.txt", "/c/readme.txt"])
+    assert [str(i) for i in merged] == ["/c/x.%04d.exr@1-9",
+                                        "/c/readme.txt"]
@@ -0,0 +1,115 @@
+import os
+import errno
+import tempfile
+
+from reveries import transfer
+
+
+def _make_files(count):
+    wdir = tempfile.mkdtemp(prefix="test_transfer")
+    files = list()
+    for i in range(count):
+        path = os.path.join(wdir, "file.%04d.txt" % i)
+        with open(path, "w") as f:
+            f.write(str(i))
+        files.append(path)
+    return wdir, files
+
+
+def test_transfer_plan():
+    wdir, files = _make_files(3)
+
+    plan = transfer.TransferPlan()
+    for i, src in enumerate(files):
+        dst = os.path.join(wdir, "out", str(i % 2), os.path.basename(src))
+        assert plan.add("files", src, dst)
+
+    # Same destination again
+    assert not plan.add("hardlinks", files[0], dst)
+    # Source is destination
+    assert not plan.add("files", files[0], files[0])
+
+    assert len(plan) == 3
+    assert len(plan.duplicated) == 1
+    assert len(plan.skipped) == 1
+    assert plan.directories() == [os.path.join(wdir, "out", "0"),
+                                  os.path.join(wdir, "out", "1")]
+
+
+def test_transfer_engine_retry():
+    wdir, files = _make_files(20)
+
+    plan = transfer.TransferPlan()
+    for src in files:
+        plan.add("files", src,
+                 os.path.join(wdir, "out", os.path.basename(src)))
+
+    failed = set()
+
+    class FlakyEngine(transfer.TransferEngine):
+        def copy_file(self, src, dst):
+            if src not in failed:
+                failed.add(src)
+                raise IOError(errno.EIO, "Flaky network")
+            super(FlakyEngine, self).copy_file(src, dst)
+
+    engine = FlakyEngine(workers=4, backoff=0)
+    engine.run(plan)
+
+    assert engine.done == 20
+    assert engine.retried == 20
+    for src in files:
+        assert os.path.isfile(os.path.join(wdir, "out",
+                                           os.path.basename(src)))
+
+    # Non-transient error is raised
+    class BrokenEngine(transfer.TransferEngine):
+        def copy_file(self, src, dst):
+            raise IOError(errno.EACCES, "Permission denied")
+
+    try:
+        BrokenEngine(workers=4, backoff=0).run(plan)
+    except IOError as e:
+        assert e.errno == errno.EACCES
+    else:
+        assert False, "Should have raised."
+
+
+def test_transfer_journal():
+    wdir, files = _make_files(4)
+    journal_path = os.path.join(wdir, transfer.JOURNAL)
+
+    plan = transfer.TransferPlan()
+    for src in files:
+        plan.add("files", src,
+                 os.path.join(wdir, "out", os.path.basename(src)))
+
+    # Interrupted after two files
+    journal = transfer.TransferJournal(journal_path, key="dump.json")
+    engine = transfer.TransferEngine(workers=1, on_done=journal.record)
+
+    partial = transfer.TransferPlan()
+    for job, src, dst in plan.items[:2]:
+        partial.add(job, src, dst)
+    engine.run(partial)
+    journal.close()
+
+    # Same publish resumes
+    journal = transfer.TransferJournal(journal_path, key="dump.json")
+    done = [item for item in plan if journal.is_done(item[1], item[2])]
+    assert done == plan.items[:2]
+
+    # Changed source is not skipped
+    with open(plan.items[0][1], "w") as f:
+        f.write("changed")
+    assert not journal.is_done(plan.items[0][1], plan.items[0][2])
+
+    # Other publish does not resume
+    journal = transfer.TransferJournal(journal_path, key="other.json")
+    assert not journal.entries
+
+    # Not resumable publish does not write
+    journal = transfer.TransferJournal(journal_path, key=None)
+    journal.record("files", plan.items[2][1], plan.items[2][2])
+    journal.close()
+    assert transfer.TransferJournal(journal_path, key="dump.json").entries
@@ -212,3 +212,179 @@ def test_get_representation_path_(registered_root):
 
     assert path == ("ROOT/Blockbuster/Maya/Asset/Hero/publish/"
                     "modelDefault/v005/MayaBinary")
+
+
+def test_asset_hasher_tree():
+
+    def make_tree(files):
+        wdir = tempfile.mkdtemp(prefix="test_hash_tree")
+        for rel_path, data in files:
+            path = os.path.join(wdir, rel_path)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, "w") as f:
+                f.write(data)
+        return wdir
+
+    files = [("a.txt", "a"), ("sub/b.txt", "b"), ("sub/deep/c.txt", "c")]
+
+    # Same content in different creation order gives the same ID
+    dir_a = make_tree(files)
+    dir_b = make_tree(list(reversed(files)))
+
+    hash_a = reveries.utils.hash_dir(dir_a)
+    assert hash_a.startswith("c4")
+    assert hash_a == reveries.utils.hash_dir(dir_b, workers=1)
+
+    hasher = reveries.utils.AssetHasher()
+    hasher.add_tree(dir_a)
+    assert hasher.digest().startswith("c4")
+
+    # Content and path changes are both detected
+    dir_c = make_tree(files[:-1] + [("sub/deep/c.txt", "C")])
+    assert hash_a != reveries.utils.hash_dir(dir_c)
+
+    dir_d = make_tree(files[:-1] + [("sub/c.txt", "c")])
+    assert hash_a != reveries.utils.hash_dir(dir_d)
+
+    # Non-recursive only counts top level files
+    assert (reveries.utils.hash_dir(dir_a, recursive=False) ==
+            reveries.utils.hash_dir(make_tree(files[:1])))
+
+
+def test_hash_cache():
+    import time
+    import sqlite3
+    from contextlib import closing
+    from reveries import hashcache
+
+    wdir = tempfile.mkdtemp(prefix="test_hash_cache")
+    file_path = os.path.join(wdir, "foo.bar")
+    with open(file_path, "w") as foo:
+        foo.write("foo")
+
+    # Backdate mtime, or the file is too new to be trusted
+    past = time.time() - 60
+    os.utime(file_path, (past, past))
+
+    cache = hashcache.HashCache(os.path.join(wdir, "cache.sqlite"),
+                                max_entries=1)
+    assert cache.get(file_path) is None
+    assert cache.put(file_path, b"digest")
+    assert cache.get(file_path) == b"digest"
+
+    # Modified file invalidates the entry
+    os.utime(file_path, (past + 1, past + 1))
+    assert cache.get(file_path) is None
+    assert len(cache) == 0
+
+    # Recently modified file is not cached
+    os.utime(file_path, None)
+    assert not cache.put(file_path, b"digest")
+
+    # LRU eviction
+    other_path = os.path.join(wdir, "other.bar")
+    with open(other_path, "w") as other:
+        other.write("other")
+    os.utime(file_path, (past, past))
+    os.utime(other_path, (past, past))
+    cache.put(file_path, b"digest")
+    time.sleep(0.1)
+    cache.put(other_path, b"other")
+    cache.evict()
+    assert len(cache) == 1
+    assert cache.get(other_path) == b"other"
+
+    # Cache hit access time is written on flush, and counts for eviction
+    def atime_of(path):
+        with closing(sqlite3.connect(cache.db_path)) as conn:
+            return conn.execute("SELECT atime FROM digests WHERE path=?",
+                                (os.path.realpath(path),)).fetchone()[0]
+
+    cache.max_entries = 2
+    cache.put(file_path, b"digest")
+    stored = atime_of(other_path)
+    time.sleep(0.1)
+    assert cache.get(other_path) == b"other"
+    assert atime_of(other_path) == stored
+    cache.flush()
+    assert atime_of(other_path) > stored
+
+    time.sleep(0.1)
+    assert cache.get(file_path) == b"digest"
+    cache.max_entries = 1
+    cache.evict()
+    assert cache.get(file_path) == b"digest"
+    assert cache.get(other_path) is None
+
+    cache.close()
+
+
+@mock.patch.dict('os.environ', {"REVERIES_HASH_CACHE": "0"})
+def test_hash_file_cached():
+    wdir = tempfile.mkdtemp(prefix="test_hash_cache")
+    file_path = os.path.join(wdir, "foo.bar")
+    with open(file_path, "w") as foo:
+        foo.write("foo")
+
+    uncached = reveries.utils.hash_file(file_path)
+
+    env = {"REVERIES_HASH_CACHE": "1", "REVERIES_HASH_CACHE_DIR": wdir}
+    with mock.patch.dict('os.environ', env):
+        assert reveries.utils.hash_file(file_path) == uncached
+
+        # Same value as hashing multiple files through one hasher
+        hasher = reveries.utils.AssetHasher()
+        hasher.add_file(file_path)
+        assert hasher.digest() == uncached
+        hasher.add_file(file_path)
+        assert hasher.digest() != uncached
+
+
+def test_source_key():
+    from reveries.utils import source_key
+
+    published = "{root}/Proj/Assets/boy/work/Model/maya/scenes/Boy_v01.ma"
+    local = "P:\\Proj\\Assets\\boy\\work\\Model\\maya\\scenes\\Boy_v01.ma"
+
+    key = source_key(published, "Proj")
+    assert key == "/assets/boy/work/model/maya/scenes/boy_v01.ma"
+    assert source_key(local, "Proj") == key
+    assert source_key("/other/scene.ma", "Proj") is None
+
+
+def test_get_versions_from_sourcefile():
+    import mongomock
+    from reveries.utils import get_versions_from_sourcefile
+
+    collection = mongomock.MongoClient().db.avalon
+    source = "{root}/Proj/Assets/boy/work/Model/maya/scenes/Boy_v01.ma"
+    collection.insert_many([
+        {"type": "version", "parent": 1, "name": 1,
+         "data": {"source": source,
+                  "sourceKey": reveries.utils.source_key(source, "Proj")}},
+        {"type": "version", "parent": 1, "name": 2,
+         "data": {"source": source,
+                  "sourceKey": reveries.utils.source_key(source, "Proj")}},
+    ])
+    local = "P:\\Proj\\Assets\\boy\\work\\Model\\maya\\scenes\\Boy_v01.ma"
+    other = "P:\\Proj\\Assets\\boy\\work\\Model\\maya\\scenes\\Boy_v02.ma"
+
+    with mock.patch.object(reveries.utils, "io", collection), \
+            mock.patch.dict(reveries.utils._unmigrated, clear=True):
+        versions = list(get_versions_from_sourcefile(local, "Proj"))
+        assert [v["name"] for v in versions] == [2]  # Latest of subset
+
+        # All migrated, no regex fallback
+        with mock.patch.object(collection, "find",
+                               wraps=collection.find) as find:
+            assert list(get_versions_from_sourcefile(other, "Proj")) == []
+            assert not any("data.source" in call[0][0]
+                           for call in find.call_args_list)
+
+    # Not migrated, matched by source path
+    collection.update_many({}, {"$unset": {"data.sourceKey": ""}})
+    with mock.patch.object(reveries.utils, "io", collection), \
+            mock.patch.dict(reveries.utils._unmigrated, clear=True):
+        versions = list(get_versions_from_sourcefile(local, "Proj"))
+        assert [v["name"] for v in versions] == [2]